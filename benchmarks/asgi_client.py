@@ -0,0 +1,123 @@
+"""
+Client ASGI minimal untuk memanggil app secara in-process tanpa server dan
+tanpa dependency tambahan (httpx / TestClient tidak dibutuhkan).
+"""
+import json
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+
+class ASGIResponse:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ASGIClient:
+    def __init__(self, app, lifespan: bool = True):
+        self.app = app
+        self.lifespan = lifespan
+        self._lifespan_queue = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        json_body=None,
+        form: Optional[dict] = None
+    ) -> ASGIResponse:
+        path, _, query = path.partition("?")
+        raw_headers = [(b"host", b"benchmark")]
+        body = b""
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            raw_headers.append((b"content-type", b"application/json"))
+        elif form is not None:
+            body = urlencode(form).encode()
+            raw_headers.append((b"content-type", b"application/x-www-form-urlencoded"))
+        if body:
+            raw_headers.append((b"content-length", str(len(body)).encode()))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode(), value.encode()))
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("benchmark", 80),
+        }
+
+        request_sent = False
+        status = 500
+        response_headers = {}
+        chunks = []
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update(
+                    (key.decode().lower(), value.decode()) for key, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return ASGIResponse(status, response_headers, b"".join(chunks))
+
+    async def startup(self):
+        await self._lifespan("startup")
+
+    async def shutdown(self):
+        await self._lifespan("shutdown")
+
+    async def _lifespan(self, phase: str):
+        """Jalankan satu fase lifespan (startup/shutdown) lewat protokol ASGI"""
+        if not self.lifespan:
+            return
+
+        if phase == "startup":
+            self._lifespan_queue = asyncio.Queue()
+            self._lifespan_events = asyncio.Queue()
+            queue, events = self._lifespan_queue, self._lifespan_events
+
+            async def receive():
+                return await queue.get()
+
+            async def send(message):
+                await events.put(message)
+
+            self._lifespan_task = asyncio.ensure_future(
+                self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+            )
+
+        if self._lifespan_queue is None:
+            return
+
+        await self._lifespan_queue.put({"type": f"lifespan.{phase}"})
+        message = await self._lifespan_events.get()
+        if message["type"].endswith(".failed"):
+            raise RuntimeError(f"Lifespan {phase} gagal: {message.get('message')}")
+        if phase == "shutdown":
+            await self._lifespan_task
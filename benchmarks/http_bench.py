@@ -0,0 +1,237 @@
+"""
+Benchmark HTTP in-process: app ASGI dipanggil langsung (tanpa network) secara
+concurrent terhadap database hasil benchmarks/seed.py, lalu throughput dan
+latency p50/p95/p99 per skenario dibandingkan dengan baseline.
+
+Contoh:
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.seed
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.http_bench --requests 300 --concurrency 8
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.http_bench --save-baseline
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.http_bench --scenario kelas_public_all --threshold 0.1
+
+Exit code 1 jika ada skenario yang regresi melebihi threshold terhadap baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+if os.getenv("BENCH_DB_NAME"):
+    os.environ["DB_NAME"] = os.environ["BENCH_DB_NAME"]
+# Log per request di level INFO ikut terukur; benchmark default pakai WARNING
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.asgi_client import ASGIClient
+from benchmarks.seed import BENCH_ADMIN, BENCH_USER_PREFIX, BENCH_USER_PASSWORD
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name, method, path (boleh memuat {kelas_id}/{barang_id}), auth (None/"user"/"admin")
+SCENARIOS = [
+    ("healthz", "GET", "/healthz", None),
+    ("kelas_public_all", "GET", "/kelas/public/all", None),
+    ("kelas_public_detail", "GET", "/kelas/{kelas_id}/public", None),
+    ("kelas_list", "GET", "/kelas/", None),
+    ("kelas_detail", "GET", "/kelas/{kelas_id}", None),
+    ("tim_public", "GET", "/tim/public", None),
+    ("slider_public", "GET", "/slider/public", None),
+    ("barang_stok", "GET", "/barang/{barang_id}/stok", None),
+    ("login", "POST", "/login", "login"),
+    ("profile", "GET", "/profile", "user"),
+    ("riwayat", "GET", "/home/riwayat", "user"),
+    ("admin_stats", "GET", "/admin/stats", "admin"),
+    ("admin_tim", "GET", "/admin/tim", "admin"),
+    ("admin_slider", "GET", "/admin/slider", "admin"),
+]
+
+
+def percentile(sorted_values, percent: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percent / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def load_id_ranges() -> dict:
+    from config.database import db
+    connection = db.get_connection()
+    cursor = connection.cursor()
+    try:
+        ranges = {}
+        for key, table in (("kelas_id", "kelas"), ("barang_id", "items")):
+            cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+            low, high = cursor.fetchone()
+            ranges[key] = (low or 1, high or 1)
+        cursor.execute("SELECT COUNT(*) FROM users WHERE username LIKE %s", (f"{BENCH_USER_PREFIX}%",))
+        ranges["users"] = cursor.fetchone()[0]
+        return ranges
+    finally:
+        cursor.close()
+        connection.close()
+
+
+async def login(client: ASGIClient, username: str, password: str) -> str:
+    response = await client.request("POST", "/login", form={"username": username, "password": password})
+    if response.status != 200:
+        raise RuntimeError(f"Login {username} gagal ({response.status}): {response.body[:200]!r}")
+    return response.json()["access_token"]
+
+
+async def run_scenario(client, scenario, args, ranges, tokens, rng) -> dict:
+    name, method, path_template, auth = scenario
+    user_count = max(ranges["users"], 1)
+
+    def build_request():
+        path = path_template.format(
+            kelas_id=rng.randint(*ranges["kelas_id"]),
+            barang_id=rng.randint(*ranges["barang_id"])
+        )
+        kwargs = {}
+        if auth == "login":
+            kwargs["form"] = {"username": f"{BENCH_USER_PREFIX}{rng.randint(1, user_count)}", "password": BENCH_USER_PASSWORD}
+        elif auth:
+            kwargs["headers"] = {"Authorization": f"Bearer {rng.choice(tokens[auth])}"}
+        return path, kwargs
+
+    for _ in range(args.warmup):
+        path, kwargs = build_request()
+        await client.request(method, path, **kwargs)
+
+    latencies = []
+    statuses = {}
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            path, kwargs = build_request()
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status >= 500)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0
+    }
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """Regresi = p95 naik atau throughput turun lebih dari threshold (relatif)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if base["p95_ms"] > 0 and result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if base["throughput_rps"] > 0 and result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {result['throughput_rps']} rps")
+        if result["errors"] and not base.get("errors"):
+            regressions.append(f"{name}: {result['errors']} error 5xx")
+    return regressions
+
+
+async def run(args) -> dict:
+    from main import app
+
+    client = ASGIClient(app)
+    await client.startup()
+    try:
+        ranges = load_id_ranges()
+        rng = random.Random(args.seed)
+        tokens = {
+            "admin": [await login(client, *BENCH_ADMIN)],
+            "user": [
+                await login(client, f"{BENCH_USER_PREFIX}{i}", BENCH_USER_PASSWORD)
+                for i in range(1, min(ranges["users"], 20) + 1)
+            ]
+        }
+
+        selected = [scenario for scenario in SCENARIOS if not args.scenario or scenario[0] in args.scenario]
+        results = {}
+        for scenario in selected:
+            result = await run_scenario(client, scenario, args, ranges, tokens, rng)
+            results[scenario[0]] = result
+            print(
+                f"{scenario[0]:<22} {result['throughput_rps']:>8} rps  "
+                f"p50 {result['p50_ms']:>8}ms  p95 {result['p95_ms']:>8}ms  p99 {result['p99_ms']:>8}ms  "
+                f"status {result['statuses']}",
+                flush=True
+            )
+        return results
+    finally:
+        await client.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP in-process")
+    parser.add_argument("--requests", type=int, default=200, help="Jumlah request per skenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--scenario", action="append", help="Jalankan skenario tertentu (bisa berulang)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.15, help="Toleransi regresi relatif (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Simpan hasil sebagai baseline baru")
+    parser.add_argument("--output", help="Tulis hasil lengkap ke file JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": results
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline disimpan ke {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("⚠️  Baseline belum ada, jalankan dengan --save-baseline")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"❌ Regresi melebihi {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        sys.exit(1)
+    print(f"✅ Tidak ada regresi melebihi {args.threshold:.0%} dibanding baseline")
+
+
+if __name__ == "__main__":
+    main()
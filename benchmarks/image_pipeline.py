@@ -0,0 +1,227 @@
+"""
+Micro-benchmark pipeline gambar (slider, layanan, tim) terhadap korpus gambar
+sintetis dengan ukuran, mode (RGB, RGBA, P, L, CMYK) dan orientasi bervariasi.
+
+Per kombinasi fungsi x gambar dilaporkan: waktu per gambar (median dari
+--repeat), peak RSS delta (butuh psutil), peak tracemalloc (alokasi Python;
+buffer C milik Pillow tidak terhitung di sini) dan ukuran file output.
+
+Contoh:
+    python -m benchmarks.image_pipeline
+    python -m benchmarks.image_pipeline --repeat 5 --only slider_smart --output image_bench.json
+    python -m benchmarks.image_pipeline --baseline image_baseline.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from PIL import Image, ImageDraw
+
+from routes import slider, layanan, tim
+
+# (nama, lebar, tinggi, mode, format)
+CORPUS = [
+    ("landscape_hd_rgb", 1920, 1080, "RGB", "JPEG"),
+    ("landscape_4k_rgb", 3840, 2160, "RGB", "JPEG"),
+    ("landscape_wide_rgb", 3000, 1000, "RGB", "JPEG"),
+    ("slider_ratio_rgb", 2400, 1200, "RGB", "JPEG"),
+    ("portrait_phone_rgb", 1080, 1920, "RGB", "JPEG"),
+    ("portrait_12mp_rgb", 3000, 4000, "RGB", "JPEG"),
+    ("square_rgb", 1500, 1500, "RGB", "JPEG"),
+    ("small_rgb", 320, 240, "RGB", "JPEG"),
+    ("landscape_rgba", 1920, 1080, "RGBA", "PNG"),
+    ("portrait_rgba", 1200, 1800, "RGBA", "PNG"),
+    ("landscape_palette", 1600, 900, "P", "PNG"),
+    ("portrait_palette", 900, 1600, "P", "PNG"),
+    ("landscape_gray", 1920, 1080, "L", "JPEG"),
+    ("landscape_cmyk", 2000, 1333, "CMYK", "JPEG"),
+    ("portrait_cmyk", 1333, 2000, "CMYK", "JPEG"),
+]
+
+TARGETS = {
+    "slider_smart": lambda path: slider.process_slider_image(path, "smart"),
+    "slider_crop": lambda path: slider.process_slider_image(path, "crop"),
+    "slider_fit": lambda path: slider.process_slider_image(path, "fit"),
+    "slider_fill": lambda path: slider.process_slider_image(path, "fill"),
+    "slider_auto_crop": lambda path: slider.auto_crop_to_slider_ratio(path),
+    "layanan_smart": lambda path: layanan.process_slider_image(path, "smart"),
+    "tim_square": lambda path: tim.process_tim_image(path),
+}
+
+
+def generate_image(path: str, width: int, height: int, mode: str, image_format: str):
+    """Gradien + noise + bentuk agar ukuran hasil kompresi mendekati foto asli"""
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    rgb = Image.merge("RGB", (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    draw = ImageDraw.Draw(rgb)
+    step = max(min(width, height) // 8, 1)
+    for index in range(0, min(width, height), step):
+        draw.ellipse((index, index // 2, index + step * 2, index // 2 + step * 2), outline=(255, 200 - index % 200, 40), width=4)
+
+    if mode == "RGBA":
+        image = rgb.convert("RGBA")
+        image.putalpha(Image.linear_gradient("L").resize((width, height)))
+    elif mode == "P":
+        image = rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=128)
+    else:
+        image = rgb.convert(mode)
+
+    save_kwargs = {"quality": 92} if image_format == "JPEG" else {}
+    image.save(path, image_format, **save_kwargs)
+
+
+def build_corpus(directory: str) -> list:
+    os.makedirs(directory, exist_ok=True)
+    corpus = []
+    for name, width, height, mode, image_format in CORPUS:
+        extension = "jpg" if image_format == "JPEG" else "png"
+        path = os.path.join(directory, f"{name}_{width}x{height}.{extension}")
+        if not os.path.exists(path):
+            generate_image(path, width, height, mode, image_format)
+        corpus.append({"name": name, "path": path, "size": (width, height), "mode": mode, "bytes": os.path.getsize(path)})
+    return corpus
+
+
+class _RSSPeakSampler:
+    """Polling RSS di thread terpisah selama satu pemanggilan fungsi"""
+
+    def __init__(self, interval: float = 0.002):
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self._process is not None:
+            self.baseline = self.peak = self._process.memory_info().rss
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, self._process.memory_info().rss)
+        return False
+
+    @property
+    def delta_mb(self):
+        if self._process is None:
+            return None
+        return round((self.peak - self.baseline) / (1024 ** 2), 2)
+
+
+def run_case(function, source: str, work_dir: str, repeat: int) -> dict:
+    work_path = os.path.join(work_dir, "work" + os.path.splitext(source)[1])
+    timings = []
+    result = None
+
+    for _ in range(repeat):
+        shutil.copyfile(source, work_path)
+        started = time.perf_counter()
+        result = function(work_path)
+        timings.append(time.perf_counter() - started)
+
+    output_bytes = os.path.getsize(work_path)
+
+    # Pass terpisah untuk memori agar overhead tracemalloc tidak masuk timing
+    shutil.copyfile(source, work_path)
+    tracemalloc.start()
+    with _RSSPeakSampler() as rss:
+        function(work_path)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    failed = result is None or (isinstance(result, dict) and (result.get("action") == "error" or result.get("success") is False))
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "min_ms": round(min(timings) * 1000, 2),
+        "peak_rss_delta_mb": rss.delta_mb,
+        "tracemalloc_peak_kb": round(traced_peak / 1024, 1),
+        "output_bytes": output_bytes,
+        "action": result.get("action") if isinstance(result, dict) else None,
+        "error": failed
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get("cases", {}).get(key)
+        if base and base["median_ms"] > 0 and result["median_ms"] > base["median_ms"] * (1 + threshold):
+            regressions.append(f"{key}: {base['median_ms']}ms -> {result['median_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline gambar")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", choices=sorted(TARGETS), help="Jalankan target tertentu (bisa berulang)")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "gastronomi_image_corpus"))
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus_dir)
+    targets = {name: TARGETS[name] for name in (args.only or sorted(TARGETS))}
+    work_dir = tempfile.mkdtemp(prefix="image_bench_")
+    results = {}
+
+    try:
+        for target_name, function in targets.items():
+            print(f"⏳ {target_name}", flush=True)
+            total_ms = 0.0
+            for image in corpus:
+                case = run_case(function, image["path"], work_dir, max(args.repeat, 1))
+                case.update({"input_bytes": image["bytes"], "input_mode": image["mode"], "input_size": image["size"]})
+                results[f"{target_name}/{image['name']}"] = case
+                total_ms += case["median_ms"]
+                flag = " ❌" if case["error"] else ""
+                print(
+                    f"   {image['name']:<22} {case['median_ms']:>9}ms  rss +{case['peak_rss_delta_mb']}MB  "
+                    f"py {case['tracemalloc_peak_kb']}KB  out {case['output_bytes']}B{flag}",
+                    flush=True
+                )
+            print(f"   total {total_ms:.1f}ms untuk {len(corpus)} gambar ({total_ms / len(corpus):.1f}ms/gambar)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"repeat": args.repeat, "corpus": [image["name"] for image in corpus], "cases": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ Regresi melebihi {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"✅ Tidak ada regresi melebihi {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
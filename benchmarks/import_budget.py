@@ -0,0 +1,122 @@
+"""
+Cek budget waktu import `main` dan pastikan import bebas efek samping.
+
+Setiap percobaan meng-import `main` di proses Python baru dengan cwd folder
+sementara, lalu memeriksa:
+- median waktu import <= --budget-ms
+- tidak ada koneksi MySQL yang dibuka saat import
+- tidak ada file/folder yang dibuat selain log
+- modul berat (Pillow, psutil) belum ter-load
+
+Exit code 1 jika ada yang dilanggar, jadi bisa dipasang di CI / sebelum deploy.
+
+Contoh:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 800 --runs 7 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1000))
+LAZY_MODULES = ("PIL", "PIL.Image", "psutil")
+
+# Dijalankan di proses anak: koneksi MySQL dicatat dan ditolak agar ketahuan
+CHILD_CODE = """
+import time
+started = time.perf_counter()
+import json, sys
+sys.path.insert(0, {base_dir!r})
+import mysql.connector
+attempts = []
+def refuse(**kwargs):
+    attempts.append(kwargs.get("host"))
+    raise mysql.connector.Error("koneksi DB saat import")
+mysql.connector.connect = refuse
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "db_connections": len(attempts),
+    "lazy_loaded": [name for name in {lazy_modules!r} if name in sys.modules]
+}}))
+"""
+
+
+def run_once(importtime: bool = False) -> dict:
+    with tempfile.TemporaryDirectory(prefix="import_budget_") as workdir:
+        env = dict(os.environ, LOG_FILE=os.path.join(workdir, "app.log"), PYTHONDONTWRITEBYTECODE="1")
+        command = [sys.executable]
+        if importtime:
+            command += ["-X", "importtime"]
+        command += ["-c", CHILD_CODE.format(base_dir=BASE_DIR, lazy_modules=LAZY_MODULES)]
+        process = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise RuntimeError(f"Import main gagal:\n{process.stderr[-3000:]}")
+
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result["created"] = sorted(os.listdir(workdir))
+        if importtime:
+            result["importtime"] = process.stderr
+        return result
+
+
+def slowest_imports(importtime_output: str, top: int) -> list:
+    """Modul dengan waktu import kumulatif terbesar dari output -X importtime"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line.split(":", 1)[1].split("|")
+            rows.append((int(cumulative), name.rstrip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget waktu import main + cek efek samping import")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="Tampilkan N modul paling lambat (-X importtime)")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    timings = [result["import_ms"] for result in results]
+    median_ms = statistics.median(timings)
+    print(f"⏱️  Import main: median {median_ms:.0f}ms, min {min(timings):.0f}ms, max {max(timings):.0f}ms "
+          f"({args.runs}x, budget {args.budget_ms:.0f}ms)")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median {median_ms:.0f}ms melebihi budget {args.budget_ms:.0f}ms")
+    if any(result["db_connections"] for result in results):
+        failures.append("koneksi MySQL dibuka saat import (pindahkan ke lifespan / utils.startup.on_startup)")
+    created = sorted({name for result in results for name in result["created"]})
+    if created:
+        failures.append(f"file/folder dibuat saat import: {created} (pakai utils.startup.register_upload_dirs)")
+    lazy_loaded = sorted({name for result in results for name in result["lazy_loaded"]})
+    if lazy_loaded:
+        failures.append(f"modul berat ter-import saat load: {lazy_loaded} (import di dalam fungsi)")
+
+    if args.top:
+        print(f"🐢 {args.top} import paling lambat (kumulatif):")
+        for cumulative_us, name in slowest_imports(run_once(importtime=True)["importtime"], args.top):
+            print(f"   {cumulative_us / 1000:>8.1f}ms  {name}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Import main dalam budget dan bebas efek samping")
+
+
+if __name__ == "__main__":
+    main()
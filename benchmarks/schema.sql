@@ -0,0 +1,158 @@
+-- Skema minimal untuk database benchmark (dipakai benchmarks/seed.py).
+-- Kolom mengikuti query di routes/*; tabel yang sudah ada tidak diubah.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(100) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    nama_lengkap VARCHAR(150),
+    email VARCHAR(150),
+    no_telepon VARCHAR(30),
+    alamat TEXT,
+    role VARCHAR(20) NOT NULL DEFAULT 'user',
+    foto_profil VARCHAR(255),
+    last_login DATETIME NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    nama VARCHAR(100) NOT NULL UNIQUE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS kelas (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    nama_kelas VARCHAR(255) NOT NULL,
+    kategori_id INT,
+    deskripsi TEXT,
+    jadwal VARCHAR(255),
+    ruangan VARCHAR(255),
+    biaya DECIMAL(12, 2) DEFAULT 0,
+    total_peserta INT DEFAULT 0,
+    metode_pembayaran VARCHAR(255),
+    foto VARCHAR(255),
+    gambaran_event TEXT,
+    link_navigasi VARCHAR(500) DEFAULT '',
+    is_link_eksternal BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_kategori (kategori_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS tiket_kategori (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kelas_id INT NOT NULL,
+    nama_kategori VARCHAR(100) NOT NULL,
+    deskripsi TEXT,
+    harga DECIMAL(12, 2) DEFAULT 0,
+    manfaat TEXT,
+    is_populer BOOLEAN DEFAULT FALSE,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_kelas (kelas_id),
+    INDEX idx_tiket_kelas_active_harga (kelas_id, is_active, harga)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS kelas_peserta (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    kelas_id INT NOT NULL,
+    user_id INT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_kelas (kelas_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS tentang_kami_tim (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    nama VARCHAR(100) NOT NULL,
+    jabatan VARCHAR(100) NOT NULL,
+    deskripsi TEXT,
+    foto VARCHAR(255),
+    urutan INT DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_urutan (urutan),
+    INDEX idx_active (is_active)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS tentang_kami_tim_keahlian (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    tim_id INT NOT NULL,
+    keahlian VARCHAR(100) NOT NULL,
+    urutan INT DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (tim_id) REFERENCES tentang_kami_tim(id) ON DELETE CASCADE,
+    INDEX idx_tim_id (tim_id),
+    INDEX idx_urutan (urutan)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS event_slider (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    filename VARCHAR(255) NOT NULL,
+    original_name VARCHAR(255) NOT NULL,
+    description TEXT,
+    order_position INT DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    orientation VARCHAR(20),
+    image_width INT,
+    image_height INT,
+    crop_mode VARCHAR(20) DEFAULT 'smart',
+    processed BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS items (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    nama_barang VARCHAR(255) NOT NULL,
+    kategori_id INT,
+    tahun_perolehan INT,
+    deskripsi TEXT,
+    foto VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_kategori (kategori_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS item_units (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    barang_id INT NOT NULL,
+    kode VARCHAR(50) NOT NULL,
+    kondisi VARCHAR(30) DEFAULT 'Baik',
+    status VARCHAR(30) DEFAULT 'Tersedia',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uniq_barang_kode (barang_id, kode),
+    INDEX idx_barang_status (barang_id, status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS borrowings (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id INT,
+    barang_id INT,
+    nama_peminjam VARCHAR(150),
+    unit VARCHAR(50),
+    jumlah INT DEFAULT 1,
+    tanggal_pinjam DATE,
+    tanggal_kembali DATE,
+    keperluan TEXT,
+    status VARCHAR(30) DEFAULT 'Menunggu',
+    alasan_penolakan VARCHAR(500),
+    tanggal_verifikasi DATE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    deleted_at DATETIME NULL,
+    INDEX idx_user (user_id),
+    INDEX idx_barang (barang_id),
+    INDEX idx_user_deleted_created (user_id, deleted_at, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS returns (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    borrowing_id VARCHAR(36) NOT NULL,
+    tanggal_pengembalian DATE,
+    kondisi_barang VARCHAR(30),
+    catatan TEXT,
+    foto VARCHAR(255),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_borrowing (borrowing_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
@@ -0,0 +1,227 @@
+"""
+Isi database benchmark dengan data sintetis yang deterministik.
+
+Database target diambil dari env DB_* (atau BENCH_DB_NAME untuk override DB_NAME).
+Karena semua tabel yang di-seed dikosongkan dulu, script menolak jalan jika
+nama database tidak mengandung "bench" kecuali diberi --force.
+
+Contoh:
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.seed
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.seed --kelas 1000 --borrowings 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+if os.getenv("BENCH_DB_NAME"):
+    os.environ["DB_NAME"] = os.environ["BENCH_DB_NAME"]
+
+from config.database import db
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+CHUNK_SIZE = 1000
+
+BENCH_ADMIN = ("bench_admin", "bench_password")
+BENCH_USER_PREFIX = "bench_user_"
+BENCH_USER_PASSWORD = "bench_password"
+
+SEEDED_TABLES = [
+    "returns", "borrowings", "item_units", "items", "kelas_peserta", "tiket_kategori",
+    "kelas", "tentang_kami_tim_keahlian", "tentang_kami_tim", "event_slider", "categories", "users"
+]
+
+KATEGORI = ["Kuliner Nusantara", "Pastry", "Barista", "Plating", "Fermentasi", "Olahraga", "Aksesoris", "Elektronik"]
+KOTA = ["Bandung", "Jakarta", "Yogyakarta", "Surabaya", "Medan", "Makassar"]
+KEAHLIAN = ["Masakan Sunda", "Pastry", "Food Styling", "Manajemen Dapur", "Kopi", "Fotografi", "Nutrisi"]
+KONDISI = ["Baik", "Baik", "Baik", "Rusak Ringan", "Rusak Berat"]
+STATUS_UNIT = ["Tersedia", "Tersedia", "Tersedia", "Dipinjam", "Rusak"]
+STATUS_PEMINJAMAN = ["Menunggu", "Disetujui", "Ditolak", "Selesai", "Selesai"]
+
+
+def apply_schema(cursor):
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        statements = [statement.strip() for statement in f.read().split(";")]
+    for statement in statements:
+        lines = [line for line in statement.splitlines() if not line.strip().startswith("--")]
+        if "".join(lines).strip():
+            cursor.execute("\n".join(lines))
+
+
+def insert_chunked(connection, cursor, sql, rows):
+    """executemany per CHUNK_SIZE baris, commit per chunk"""
+    for start in range(0, len(rows), CHUNK_SIZE):
+        cursor.executemany(sql, rows[start:start + CHUNK_SIZE])
+        connection.commit()
+    return len(rows)
+
+
+def seed(args):
+    rng = random.Random(args.seed)
+    now = datetime.now().replace(microsecond=0)
+    connection = db.get_connection()
+    cursor = connection.cursor()
+    counts = {}
+
+    try:
+        apply_schema(cursor)
+
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        for table in SEEDED_TABLES:
+            cursor.execute(f"TRUNCATE TABLE `{table}`")
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+        connection.commit()
+
+        # Users (1 admin + N user)
+        users = [(BENCH_ADMIN[0], BENCH_ADMIN[1], "Bench Admin", "admin@bench.local", "0800000000", "Bandung", "admin", now)]
+        for i in range(1, args.users + 1):
+            users.append((
+                f"{BENCH_USER_PREFIX}{i}", BENCH_USER_PASSWORD, f"User Benchmark {i}", f"user{i}@bench.local",
+                f"08{i:010d}", rng.choice(KOTA), "user", now - timedelta(days=rng.randint(0, 365))
+            ))
+        counts["users"] = insert_chunked(connection, cursor, """
+            INSERT INTO users (username, password, nama_lengkap, email, no_telepon, alamat, role, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, users)
+
+        counts["categories"] = insert_chunked(connection, cursor,
+            "INSERT INTO categories (nama) VALUES (%s)", [(nama,) for nama in KATEGORI])
+        category_ids = list(range(1, len(KATEGORI) + 1))
+
+        # Kelas + tiket kategori + peserta
+        kelas_rows = []
+        for i in range(1, args.kelas + 1):
+            kelas_rows.append((
+                f"Kelas {rng.choice(KATEGORI)} {i}", rng.choice(category_ids),
+                f"Deskripsi kelas benchmark nomor {i}. " * rng.randint(1, 5),
+                (now + timedelta(days=rng.randint(-60, 120))).strftime("%Y-%m-%d %H:%M"),
+                f"Ruang {rng.randint(1, 20)}, {rng.choice(KOTA)}", rng.randint(50, 2000) * 1000,
+                rng.randint(10, 200), f"kelas_{i}.jpg", "[]", "", False
+            ))
+        counts["kelas"] = insert_chunked(connection, cursor, """
+            INSERT INTO kelas (nama_kelas, kategori_id, deskripsi, jadwal, ruangan, biaya,
+                               total_peserta, foto, gambaran_event, link_navigasi, is_link_eksternal)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, kelas_rows)
+
+        tiket_rows = []
+        peserta_rows = []
+        for kelas_id in range(1, args.kelas + 1):
+            for index, nama in enumerate(["Reguler", "VIP", "VVIP"][:args.tiket_per_kelas]):
+                tiket_rows.append((
+                    kelas_id, nama, f"Tiket {nama}", (index + 1) * rng.randint(50, 500) * 1000,
+                    '["Sertifikat", "Snack"]', index == 1, True
+                ))
+            for _ in range(rng.randint(0, args.peserta_per_kelas)):
+                peserta_rows.append((kelas_id, rng.randint(2, args.users + 1)))
+        counts["tiket_kategori"] = insert_chunked(connection, cursor, """
+            INSERT INTO tiket_kategori (kelas_id, nama_kategori, deskripsi, harga, manfaat, is_populer, is_active)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, tiket_rows)
+        counts["kelas_peserta"] = insert_chunked(connection, cursor,
+            "INSERT INTO kelas_peserta (kelas_id, user_id) VALUES (%s, %s)", peserta_rows)
+
+        # Tim + keahlian
+        tim_rows = [(f"Anggota Tim {i}", rng.choice(["Chef", "Instruktur", "Koordinator"]), f"Profil anggota {i}", None, i, True)
+                    for i in range(1, args.tim + 1)]
+        counts["tentang_kami_tim"] = insert_chunked(connection, cursor, """
+            INSERT INTO tentang_kami_tim (nama, jabatan, deskripsi, foto, urutan, is_active)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, tim_rows)
+        keahlian_rows = [(tim_id, keahlian, urutan)
+                         for tim_id in range(1, args.tim + 1)
+                         for urutan, keahlian in enumerate(rng.sample(KEAHLIAN, 3))]
+        counts["tentang_kami_tim_keahlian"] = insert_chunked(connection, cursor,
+            "INSERT INTO tentang_kami_tim_keahlian (tim_id, keahlian, urutan) VALUES (%s, %s, %s)", keahlian_rows)
+
+        # Slider
+        slider_rows = [(f"slider_{i}.jpg", f"slider_{i}.jpg", f"Slide {i}", i, True, "landscape", 1200, 600, "smart", True)
+                       for i in range(1, args.sliders + 1)]
+        counts["event_slider"] = insert_chunked(connection, cursor, """
+            INSERT INTO event_slider (filename, original_name, description, order_position, is_active,
+                                      orientation, image_width, image_height, crop_mode, processed)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, slider_rows)
+
+        # Barang + unit
+        item_rows = [(f"Barang {i}", rng.choice(category_ids), rng.randint(2015, 2025), f"Deskripsi barang {i}", f"barang_{i}.jpg")
+                     for i in range(1, args.items + 1)]
+        counts["items"] = insert_chunked(connection, cursor, """
+            INSERT INTO items (nama_barang, kategori_id, tahun_perolehan, deskripsi, foto)
+            VALUES (%s, %s, %s, %s, %s)
+        """, item_rows)
+        unit_rows = [(item_id, f"BRG{item_id}-{n:03d}", rng.choice(KONDISI), rng.choice(STATUS_UNIT))
+                     for item_id in range(1, args.items + 1)
+                     for n in range(1, args.units_per_item + 1)]
+        counts["item_units"] = insert_chunked(connection, cursor,
+            "INSERT INTO item_units (barang_id, kode, kondisi, status) VALUES (%s, %s, %s, %s)", unit_rows)
+
+        # Peminjaman + pengembalian
+        borrowing_rows = []
+        return_rows = []
+        for _ in range(args.borrowings):
+            borrowing_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            user_id = rng.randint(2, args.users + 1)
+            barang_id = rng.randint(1, args.items)
+            created_at = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+            status = rng.choice(STATUS_PEMINJAMAN)
+            deleted_at = created_at + timedelta(days=30) if rng.random() < 0.05 else None
+            borrowing_rows.append((
+                borrowing_id, user_id, barang_id, f"User Benchmark {user_id - 1}",
+                f"BRG{barang_id}-{rng.randint(1, args.units_per_item):03d}", 1,
+                created_at.date(), (created_at + timedelta(days=7)).date(), "Benchmark",
+                status, created_at, deleted_at
+            ))
+            if status == "Selesai":
+                return_rows.append((borrowing_id, (created_at + timedelta(days=6)).date(), "Baik", "Kondisi baik", None))
+        counts["borrowings"] = insert_chunked(connection, cursor, """
+            INSERT INTO borrowings (id, user_id, barang_id, nama_peminjam, unit, jumlah, tanggal_pinjam,
+                                    tanggal_kembali, keperluan, status, created_at, deleted_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, borrowing_rows)
+        counts["returns"] = insert_chunked(connection, cursor, """
+            INSERT INTO returns (borrowing_id, tanggal_pengembalian, kondisi_barang, catatan, foto)
+            VALUES (%s, %s, %s, %s, %s)
+        """, return_rows)
+
+        return counts
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed database benchmark")
+    parser.add_argument("--kelas", type=int, default=200)
+    parser.add_argument("--tiket-per-kelas", type=int, default=3, choices=[1, 2, 3])
+    parser.add_argument("--peserta-per-kelas", type=int, default=20)
+    parser.add_argument("--tim", type=int, default=30)
+    parser.add_argument("--sliders", type=int, default=20)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--units-per-item", type=int, default=20)
+    parser.add_argument("--borrowings", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42, help="Seed random agar data bisa direproduksi")
+    parser.add_argument("--force", action="store_true", help="Izinkan seed ke database yang namanya tidak mengandung 'bench'")
+    args = parser.parse_args()
+
+    database = db.config["database"]
+    if "bench" not in database and not args.force:
+        print(f"❌ Database '{database}' bukan database benchmark. Set BENCH_DB_NAME atau gunakan --force.")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    print(f"⏳ Seeding database {database}...")
+    counts = seed(args)
+    for table, count in counts.items():
+        print(f"✅ {table}: {count} rows")
+    print(f"✅ Seed selesai dalam {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Bandingkan jalur deploy Passenger (a2wsgi di atas server WSGI berthread) dengan
+launcher serve.py (worker uvicorn preload + fork) lewat HTTP sungguhan.
+
+Setiap target dijalankan sebagai subprocess di port lokal, lalu dibebani
+request GET concurrent (koneksi keep-alive jika server mendukung). Dilaporkan
+throughput, latency p50/p95/p99, error, dan total RSS proses server (psutil).
+
+Server WSGI di sini (wsgiref + thread per request) adalah pendekatan untuk
+Passenger; angka absolutnya berbeda dengan Passenger asli, tapi overhead
+jembatan a2wsgi (thread WSGI + event loop background) ikut terukur.
+
+Contoh:
+    BENCH_DB_NAME=gastronomi_bench python -m benchmarks.server_bench
+    python -m benchmarks.server_bench --workers 4 --concurrency 64 --duration 15 --path /healthz --path /kelas/public/all
+    python -m benchmarks.server_bench --target serve --output server_bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+if os.getenv("BENCH_DB_NAME"):
+    os.environ["DB_NAME"] = os.environ["BENCH_DB_NAME"]
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.http_bench import percentile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATHS = ["/healthz", "/kelas/public/all", "/tim/public", "/kelas/"]
+
+
+def serve_wsgi(port: int):
+    """Mode internal: passenger_wsgi.application di server WSGI berthread"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    from passenger_wsgi import application
+    server = make_server("127.0.0.1", port, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    server.serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_target(target: str, port: int, workers: int) -> subprocess.Popen:
+    if target == "a2wsgi":
+        command = [sys.executable, "-m", "benchmarks.server_bench", "--serve-wsgi", str(port)]
+    else:
+        command = [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(workers), "--max-requests", "0"]
+    return subprocess.Popen(command, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def wait_ready(port: int, process: subprocess.Popen, timeout: float = 30) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server keluar ({process.returncode}): {process.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1) as sock:
+                sock.sendall(b"GET /healthz HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n")
+                if sock.recv(16).startswith(b"HTTP/"):
+                    return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server tidak siap dalam {timeout}s")
+
+
+def stop_target(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def tree_rss_mb(pid: int):
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        parent = psutil.Process(pid)
+        processes = [parent] + parent.children(recursive=True)
+        # USS = memori privat; total RSS menghitung halaman bersama (copy-on-write) berkali-kali
+        rss = sum(p.memory_info().rss for p in processes)
+        try:
+            uss = sum(p.memory_full_info().uss for p in processes)
+        except (psutil.AccessDenied, AttributeError):
+            uss = None
+        return {
+            "processes": len(processes),
+            "rss_mb": round(rss / 1024 ** 2, 1),
+            "uss_mb": round(uss / 1024 ** 2, 1) if uss is not None else None
+        }
+    except psutil.NoSuchProcess:
+        return None
+
+
+class HTTPConnection:
+    """Client HTTP/1.1 minimal di atas asyncio stream (keep-alive jika server mengizinkan)"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path: str) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        version, status = lines[0].split(" ", 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).strip() or b"0", 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.read()
+            await self.close()
+
+        if version == "HTTP/1.0" or headers.get("connection", "").lower() == "close":
+            await self.close()
+        return int(status)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+
+async def load(port: int, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        connection = HTTPConnection(port)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = await connection.get(path)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    status = 0
+                    await connection.close()
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status == 0 or status >= 500),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2)
+    }
+
+
+def run_target(target: str, args) -> dict:
+    port = free_port()
+    process = start_target(target, port, args.workers)
+    try:
+        startup_seconds = wait_ready(port, process)
+        print(f"⏳ {target} siap dalam {startup_seconds:.2f}s (port {port})", flush=True)
+        results = {"startup_seconds": round(startup_seconds, 2), "paths": {}}
+        for path in args.path or DEFAULT_PATHS:
+            asyncio.run(load(port, path, args.concurrency, min(args.warmup, args.duration)))
+            result = asyncio.run(load(port, path, args.concurrency, args.duration))
+            results["paths"][path] = result
+            print(
+                f"   {path:<24} {result['throughput_rps']:>9} rps  p50 {result['p50_ms']:>8}ms  "
+                f"p95 {result['p95_ms']:>8}ms  p99 {result['p99_ms']:>8}ms  status {result['statuses']}",
+                flush=True
+            )
+        results["memory"] = tree_rss_mb(process.pid)
+        if results["memory"]:
+            print(f"   memori: {results['memory']}", flush=True)
+        return results
+    finally:
+        stop_target(process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Passenger/a2wsgi vs serve.py (uvicorn multi-worker)")
+    parser.add_argument("--target", action="append", choices=["a2wsgi", "serve"], help="Default: keduanya")
+    parser.add_argument("--path", action="append", help="Path yang dibebani (bisa berulang)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Jumlah worker serve.py")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10, help="Detik per path")
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--output", help="Tulis hasil ke file JSON")
+    parser.add_argument("--serve-wsgi", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_wsgi:
+        serve_wsgi(args.serve_wsgi)
+        return
+
+    report = {"workers": args.workers, "concurrency": args.concurrency, "duration": args.duration, "targets": {}}
+    for target in args.target or ["a2wsgi", "serve"]:
+        report["targets"][target] = run_target(target, args)
+
+    targets = report["targets"]
+    if "a2wsgi" in targets and "serve" in targets:
+        print("📊 serve.py dibanding a2wsgi:")
+        for path, result in targets["serve"]["paths"].items():
+            base = targets["a2wsgi"]["paths"].get(path)
+            if base and base["throughput_rps"]:
+                print(f"   {path:<24} throughput x{result['throughput_rps'] / base['throughput_rps']:.2f}  "
+                      f"p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
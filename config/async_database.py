@@ -0,0 +1,207 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from anyio import to_thread
+from config.database import db
+from utils.metrics import registry, DB_CONNECTIONS, DB_CONNECTION_ERRORS, DB_CONNECT_DURATION
+from utils.query_stats import QUERY_INSTRUMENTATION, record_query
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiomysql
+except ImportError:  # pragma: no cover - fallback ke threadpool jika aiomysql belum terpasang
+    aiomysql = None
+
+ASYNC_DB_ENABLED = os.getenv("ASYNC_DB_ENABLED", "true").lower() == "true"
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", 1))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", 20))
+# Koneksi idle lebih lama dari ini dibuat ulang (harus < wait_timeout MySQL)
+ASYNC_DB_POOL_RECYCLE = int(os.getenv("ASYNC_DB_POOL_RECYCLE", 1800))
+
+
+class AsyncCursor:
+    """Cursor async dengan row dict (sama seperti cursor(dictionary=True)) dan statistik query"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _count_rows(self, rows: int):
+        if self._entry is not None and rows > 0:
+            self._entry["rows"] += rows
+
+    async def execute(self, operation, params=None):
+        started = time.perf_counter()
+        try:
+            return await self._cursor.execute(operation, params)
+        finally:
+            if QUERY_INSTRUMENTATION:
+                self._entry = record_query(operation, time.perf_counter() - started)
+
+    async def fetchone(self):
+        row = await self._cursor.fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+
+    async def fetchall(self):
+        rows = await self._cursor.fetchall()
+        self._count_rows(len(rows))
+        return list(rows)
+
+
+class _ThreadCursor:
+    """
+    Fallback tanpa aiomysql: query dijalankan dengan koneksi sinkron di
+    threadpool, interface tetap sama dengan AsyncCursor.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def execute(self, operation, params=None):
+        return await to_thread.run_sync(self._cursor.execute, operation, params)
+
+    async def fetchone(self):
+        return await to_thread.run_sync(self._cursor.fetchone)
+
+    async def fetchall(self):
+        # Cursor tidak buffered: fetch juga membaca socket, jadi ikut di threadpool
+        return await to_thread.run_sync(self._cursor.fetchall)
+
+
+class AsyncDatabase:
+    """
+    Pool koneksi MySQL async (aiomysql) untuk endpoint `async def`.
+    Pool dibuat lazy per event loop dan per proses (aman setelah fork worker).
+    """
+
+    def __init__(self):
+        self.config = db.config
+        self._pool = None
+        self._pool_loop = None
+        self._pool_pid = None
+        self._lock = None
+        self._lock_loop = None
+
+    @property
+    def available(self) -> bool:
+        return aiomysql is not None and ASYNC_DB_ENABLED
+
+    async def get_pool(self):
+        loop = asyncio.get_running_loop()
+        if self._pool is not None and self._pool_loop is loop and self._pool_pid == os.getpid():
+            return self._pool
+
+        # asyncio.Lock terikat ke event loop; pool dari loop/proses lain tidak dipakai ulang
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            if self._pool is None or self._pool_loop is not loop or self._pool_pid != os.getpid():
+                started = time.perf_counter()
+                try:
+                    self._pool = await aiomysql.create_pool(
+                        host=self.config["host"],
+                        port=self.config["port"],
+                        user=self.config["user"],
+                        password=self.config["password"],
+                        db=self.config["database"],
+                        charset=self.config["charset"],
+                        connect_timeout=self.config["connection_timeout"],
+                        autocommit=True,
+                        minsize=ASYNC_DB_POOL_MIN,
+                        maxsize=ASYNC_DB_POOL_MAX,
+                        pool_recycle=ASYNC_DB_POOL_RECYCLE,
+                        cursorclass=aiomysql.DictCursor
+                    )
+                except Exception as e:
+                    DB_CONNECTION_ERRORS.inc()
+                    logger.error(f"Error creating async MySQL pool: {e}")
+                    raise Exception(f"Database connection failed: {e}")
+                DB_CONNECT_DURATION.observe(value=time.perf_counter() - started)
+                DB_CONNECTIONS.inc()
+                self._pool_loop = loop
+                self._pool_pid = os.getpid()
+                logger.info(f"Async MySQL pool ready (min={ASYNC_DB_POOL_MIN}, max={ASYNC_DB_POOL_MAX})")
+        return self._pool
+
+    @asynccontextmanager
+    async def cursor(self):
+        """
+        async with async_db.cursor() as cursor:
+            await cursor.execute("SELECT ...", (param,))
+            rows = await cursor.fetchall()
+        """
+        if not self.available:
+            connection = await to_thread.run_sync(db.get_connection)
+            cursor = connection.cursor(dictionary=True)
+            try:
+                yield _ThreadCursor(cursor)
+            finally:
+                cursor.close()
+                connection.close()
+            return
+
+        pool = await self.get_pool()
+        async with pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                yield AsyncCursor(cursor)
+
+    async def fetch_all(self, query: str, params=None) -> list:
+        async with self.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchall()
+
+    async def fetch_one(self, query: str, params=None) -> Optional[dict]:
+        async with self.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+    async def close(self):
+        pool, self._pool = self._pool, None
+        if pool is not None and self._pool_pid == os.getpid():
+            pool.close()
+            await pool.wait_closed()
+            logger.info("Async MySQL pool closed")
+
+    def pool_stats(self):
+        pool = self._pool
+        if pool is None or self._pool_pid != os.getpid():
+            return
+        yield ("db_async_pool_size", "Koneksi di pool MySQL async", {}, pool.size)
+        yield ("db_async_pool_free", "Koneksi idle di pool MySQL async", {}, pool.freesize)
+
+
+_ensured_schema = set()
+
+
+async def ensure_schema(*functions):
+    """
+    Jalankan helper DDL sinkron (create_*_table / update_*_structure) sekali
+    per proses di threadpool, agar endpoint async tidak memblok event loop
+    dengan CREATE TABLE IF NOT EXISTS di setiap request.
+    """
+    for function in functions:
+        if function not in _ensured_schema:
+            await to_thread.run_sync(function)
+            _ensured_schema.add(function)
+
+
+def ensure_schema_sync(*functions):
+    """Versi sinkron ensure_schema untuk endpoint `def` (sudah berjalan di threadpool)"""
+    for function in functions:
+        if function not in _ensured_schema:
+            function()
+            _ensured_schema.add(function)
+
+
+async_db = AsyncDatabase()
+registry.register_collector(async_db.pool_stats)
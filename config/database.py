@@ -3,6 +3,9 @@ from mysql.connector import Error
 import os
 from dotenv import load_dotenv
 import logging
+import time
+from utils.metrics import DB_CONNECTIONS, DB_CONNECTION_ERRORS, DB_CONNECT_DURATION
+from utils.query_stats import instrument_connection
 
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -21,10 +24,14 @@ class Database:
         }
     
     def get_connection(self):
+        started = time.perf_counter()
         try:
             connection = mysql.connector.connect(**self.config)
-            return connection
+            DB_CONNECT_DURATION.observe(value=time.perf_counter() - started)
+            DB_CONNECTIONS.inc()
+            return instrument_connection(connection)
         except Error as e:
+            DB_CONNECTION_ERRORS.inc()
             logger.error(f"Error connecting to MySQL: {e}")
             raise Exception(f"Database connection failed: {e}")
 
@@ -0,0 +1,50 @@
+"""
+Konfigurasi gunicorn + worker uvicorn (alternatif passenger_wsgi.py / serve.py).
+
+    gunicorn -c gunicorn.conf.py main:app
+
+App di-load sekali di master (preload_app) lalu gc.freeze() sebelum fork agar
+objek hasil import dibagi copy-on-write antar worker. Worker didaur ulang
+setelah MAX_REQUESTS (+ jitter) request dan dihentikan graceful saat SIGTERM.
+"""
+import gc
+import os
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv("BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+try:
+    import uvicorn_worker  # noqa: F401 - paket worker terpisah (uvicorn >= 0.30)
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = True
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+backlog = int(os.getenv("BACKLOG", 2048))
+
+# Log aplikasi sudah diatur setup_logging(); access log gunicorn dimatikan
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def when_ready(server):
+    if workers > 1 and not os.getenv("METRICS_DIR"):
+        server.log.warning("METRICS_DIR kosong: /metrics hanya akan berisi data satu worker")
+
+
+def pre_fork(server, worker):
+    # Objek hasil preload dipindah ke generasi permanen agar GC di worker
+    # tidak menyentuh (dan menyalin) halaman memori milik master
+    gc.collect()
+    gc.freeze()
+
@@ -1,36 +1,68 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 import logging
+from contextlib import asynccontextmanager
 from fastapi import HTTPException, status
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+from utils.logging_config import setup_logging
+
+# Setup logging (JSON + rotasi, ditulis oleh thread QueueListener)
+setup_logging()
 logger = logging.getLogger(__name__)
 
-# Buat folder uploads jika belum ada
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
+from utils.startup import (
+    startup_phase, record_phase, register_upload_dirs, ensure_upload_dirs, start_startup_tasks,
+    cancel_background_tasks, log_startup_report
+)
 
-# Buat subfolder uploads jika belum ada
+# Folder upload dibuat di lifespan startup, bukan saat import
 UPLOAD_SUBFOLDERS = ["slider", "tentang_kami", "tim", "kontak"]
-for folder in UPLOAD_SUBFOLDERS:
-    folder_path = os.path.join("uploads", folder)
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-        logger.info(f"Created upload folder: {folder_path}")
-
-# ✅ TAMBAHKAN FOLDER UNTUK PARTNER
 PARTNER_FOLDER = "static/uploads/partner"
-if not os.path.exists(PARTNER_FOLDER):
-    os.makedirs(PARTNER_FOLDER)
-    logger.info(f"Created partner folder: {PARTNER_FOLDER}")
+register_upload_dirs("uploads", *[os.path.join("uploads", folder) for folder in UPLOAD_SUBFOLDERS], PARTNER_FOLDER)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Semua inisialisasi filesystem/DB/background thread, dengan laporan waktu per fase"""
+    from utils.system_metrics import sampler
+    from utils.metrics import registry
+    from config.async_database import async_db
+
+    with startup_phase("filesystem"):
+        ensure_upload_dirs()
+    # Migrasi/inisialisasi DB (di background kecuali STARTUP_TASKS_IN_BACKGROUND=false)
+    await start_startup_tasks()
+    # Background sampler untuk /admin/system/info dan /admin/health
+    with startup_phase("background"):
+        sampler.ensure_started()
+        registry.ensure_started()
+    app.state.startup_report = log_startup_report()
+
+    yield
 
-app = FastAPI(title="Inventory Management API", version="1.0.0")
+    await cancel_background_tasks()
+    sampler.stop()
+    registry.stop()
+    # Pool MySQL async (endpoint public async def) ditutup saat worker berhenti
+    await async_db.close()
+
+
+from utils.json_response import FastJSONResponse, FastJSONRoute
+
+# Response JSON di-encode dengan orjson (Decimal/datetime native, tanpa jsonable_encoder)
+app = FastAPI(
+    title="Inventory Management API", version="1.0.0",
+    default_response_class=FastJSONResponse, lifespan=lifespan
+)
+app.router.route_class = FastJSONRoute
 
 
 def get_allowed_origins():
@@ -41,8 +73,21 @@ def get_allowed_origins():
     return [origin.strip() for origin in origins.split(",") if origin.strip()]
 
 # ✅ PERBAIKI: Mount static files untuk uploads dan static
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# check_dir=False: folder dibuat di lifespan, dicek saat request pertama
+app.mount("/uploads", StaticFiles(directory="uploads", check_dir=False), name="uploads")
+app.mount("/static", StaticFiles(directory="static", check_dir=False), name="static")
+
+# Metrics per route (request count, in-flight, latency) untuk /metrics
+# statistik query per request (slow query log + deteksi N+1) dan sampling profiler
+# Batas concurrency per kelompok route (export, upload, threadpool) + load shedding 503
+from utils.metrics import MetricsMiddleware
+from utils.query_stats import QueryStatsMiddleware
+from utils.profiler import ProfilerMiddleware
+from utils.concurrency import ConcurrencyLimitMiddleware
+app.add_middleware(ConcurrencyLimitMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # CORS Middleware
 app.add_middleware(
@@ -51,9 +96,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Import dan include semua routers yang sudah ada
+_routers_started = time.perf_counter()
 from routes.auth import router as auth_router
 from routes.kelas import router as kelas_router
 from routes.kategori import router as kategori_router
@@ -72,6 +119,8 @@ from routes.layanan import router as layanan_router
 from routes.tiket_kategori import router as tiket_kategori_router
 from routes.slider_events import router as slider_events_router
 from routes.partner import router as partner_router
+from routes.metrics import router as metrics_router
+from routes.profiler import router as profiler_router
 
 # Include semua routers yang sudah ada
 app.include_router(auth_router)
@@ -92,6 +141,12 @@ app.include_router(layanan_router)
 app.include_router(tiket_kategori_router)
 app.include_router(slider_events_router)
 app.include_router(partner_router)
+app.include_router(metrics_router)
+app.include_router(profiler_router)
+
+# Waktu import main (dependency + middleware, lalu router) masuk laporan startup
+record_phase("import:core", _routers_started - _import_started)
+record_phase("import:routers", time.perf_counter() - _routers_started)
 
 # Health check endpoints
 @app.get("/")
@@ -190,6 +245,9 @@ def debug_partner_images():
 def debug_barang(barang_id: int):
     """Endpoint untuk debugging status unit barang"""
     from config.database import db
+    from config.async_database import ensure_schema_sync
+    from utils.item_availability import create_item_availability_table
+    ensure_schema_sync(create_item_availability_table)
     connection = db.get_connection()
     cursor = connection.cursor(dictionary=True)
     
@@ -213,11 +271,16 @@ def debug_barang(barang_id: int):
         """, (barang_id,))
         status_count = cursor.fetchall()
         
+        # Ringkasan yang dipakai katalog, untuk dibandingkan dengan hitungan langsung di atas
+        cursor.execute("SELECT * FROM item_availability WHERE barang_id = %s", (barang_id,))
+        availability = cursor.fetchone()
+        
         return {
             "barang_id": barang_id,
             "nama_barang": barang['nama_barang'],
             "stok_units": stok_units,
-            "status_summary": status_count
+            "status_summary": status_count,
+            "availability": availability
         }
         
     except Exception as e:
@@ -1,71 +1,55 @@
-import json
-import mysql.connector
-from datetime import datetime
+"""
+Migrasi data JSON versi lama (kategori.json, barang.json, peminjaman.json,
+data/pengembalian/*.json) ke MySQL. Aman dijalankan ulang.
+
+Contoh:
+    python migrate_json_to_mysql.py
+    python migrate_json_to_mysql.py --source-dir /path/ke/instalasi-lama --batch-size 1000
+    python migrate_json_to_mysql.py --only barang,peminjaman
+"""
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from utils.json_import import JSON_IMPORT_BATCH_SIZE, SOURCES, JsonImportError, import_json_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi data JSON lama ke MySQL")
+    parser.add_argument("--source-dir", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Folder berisi kategori.json, barang.json, peminjaman.json dan data/pengembalian")
+    parser.add_argument("--batch-size", type=int, default=JSON_IMPORT_BATCH_SIZE, help="Jumlah record per batch/commit")
+    parser.add_argument("--only", help=f"Sumber yang di-import, pisahkan dengan koma ({','.join(SOURCES)})")
+    args = parser.parse_args()
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()] if args.only else None
+    unknown = sorted(set(only or []) - set(SOURCES))
+    if unknown:
+        parser.error(f"Sumber tidak dikenal: {', '.join(unknown)}")
+
+    def report(state):
+        rate = f"{state['records_per_second']:.0f} records/s" if state["records_per_second"] else "-"
+        print(f"⏳ {state['source']}: {state['records']} records, {state['rows']} rows, {state['batches']} batches, {rate}", flush=True)
 
-def migrate_data():
-    # Koneksi database
-    conn = mysql.connector.connect(
-        host='localhost',
-        user='your_username',
-        password='your_password',
-        database='inventory_db'
-    )
-    cursor = conn.cursor(dictionary=True)
-    
-    # Migrasi kategori
-    try:
-        with open('kategori.json', 'r', encoding='utf-8') as f:
-            categories = json.load(f)
-            
-        for cat in categories:
-            if isinstance(cat, dict):
-                category_name = cat.get('nama')
-            else:
-                category_name = cat
-                
-            cursor.execute("INSERT IGNORE INTO categories (nama) VALUES (%s)", (category_name,))
-        
-        conn.commit()
-        print("Kategori migrated successfully")
-    except FileNotFoundError:
-        print("kategori.json not found, skipping...")
-    
-    # Migrasi barang
     try:
-        with open('barang.json', 'r', encoding='utf-8') as f:
-            items = json.load(f)
-            
-        for item in items:
-            # Get kategori_id
-            cursor.execute("SELECT id FROM categories WHERE nama = %s", (item['kategori'],))
-            kategori_result = cursor.fetchone()
-            if not kategori_result:
-                cursor.execute("INSERT INTO categories (nama) VALUES (%s)", (item['kategori'],))
-                kategori_id = cursor.lastrowid
-            else:
-                kategori_id = kategori_result['id']
-            
-            # Insert item
-            cursor.execute("""
-                INSERT INTO items (id, nama_barang, kategori_id, tahun_perolehan, deskripsi, foto)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (item['id'], item['nama_barang'], kategori_id, item.get('tahun_perolehan', 2025), 
-                  item.get('deskripsi', ''), item.get('foto')))
-            
-            # Insert stock units
-            for unit in item.get('stok', []):
-                cursor.execute("""
-                    INSERT INTO stock_units (barang_id, kode, kondisi, status)
-                    VALUES (%s, %s, %s, %s)
-                """, (item['id'], unit['kode'], unit.get('kondisi', 'Baik'), unit.get('status', 'Tersedia')))
-        
-        conn.commit()
-        print("Barang migrated successfully")
-    except FileNotFoundError:
-        print("barang.json not found, skipping...")
-    
-    cursor.close()
-    conn.close()
+        summary = import_json_sources(args.source_dir, batch_size=args.batch_size, only=only, progress=report)
+    except JsonImportError as e:
+        print(f"❌ Migrasi gagal: {e}")
+        print(f"   Sudah di-commit: {e.summary['records']} records dalam {e.summary['batches']} batches")
+        sys.exit(1)
+
+    for source, counts in summary["sources"].items():
+        print(f"   {source}: {counts['records']} records -> {counts['rows']} rows ditulis")
+    if summary["returns_skipped"]:
+        print(f"⚠️  {summary['returns_skipped']} pengembalian dilewati karena peminjamannya tidak ada")
+    if summary["skipped_sources"]:
+        print(f"⚠️  File tidak ditemukan, dilewati: {', '.join(summary['skipped_sources'])}")
+    print(f"✅ Migrasi selesai: {summary['records']} records dalam {summary['duration_seconds']}s "
+          f"({summary['records_per_second']} records/s), {summary['categories_created']} kategori baru")
+
 
 if __name__ == "__main__":
-    migrate_data()
\ No newline at end of file
+    main()
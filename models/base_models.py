@@ -36,6 +36,13 @@ class PinjamRequest(BaseModel):
     tanggal_kembali: str
     keperluan: Optional[str] = None
 
+class BulkStokRequest(BaseModel):
+    tambah: int = Field(0, ge=0, le=1000, description="Jumlah unit baru yang dibuat")
+    kondisi_baru: str = Field("Baik", description="Kondisi unit baru")
+    unit_kodes: List[str] = Field(default_factory=list, max_length=1000)
+    kondisi: Optional[str] = None
+    status: Optional[str] = None
+
 class PeminjamanResponse(BaseModel):
     id: str
     nama: str
@@ -49,4 +56,10 @@ class PeminjamanResponse(BaseModel):
     keperluan: str
     status: str
     assigned_units: List[str]
-    tanggal_verifikasi: Optional[str] = None
\ No newline at end of file
+    tanggal_verifikasi: Optional[str] = None
+
+class ProfilerArmRequest(BaseModel):
+    pattern: Optional[str] = Field(None, description="Pola route/path (fnmatch), mis. /kelas/*")
+    requests: Optional[int] = Field(None, ge=1, le=1000)
+    duration_seconds: Optional[float] = Field(None, gt=0, le=600)
+    interval_ms: Optional[float] = Field(None, ge=1, le=100)
@@ -1,3 +1,4 @@
+import atexit
 import os
 import sys
 
@@ -19,5 +20,12 @@ import importlib
 
 ASGIMiddleware = importlib.import_module("a2wsgi").ASGIMiddleware
 from main import app
+from utils.startup import LifespanRunner
 
 application = ASGIMiddleware(app)
+
+# a2wsgi tidak mengirim event lifespan: jalankan startup/shutdown app di
+# event loop background milik middleware agar inisialisasi tetap terjadi
+lifespan = LifespanRunner(app, application.loop)
+lifespan.startup(timeout=60)
+atexit.register(lifespan.shutdown, timeout=30)
@@ -0,0 +1,62 @@
+"""
+Restore database dari file export NDJSON (.ndjson / .ndjson.gz).
+
+Contoh:
+    python restore_database.py backup_20260201_010000.ndjson.gz
+    python restore_database.py backup.ndjson.gz --batch-size 5000 --include borrowings,item_units
+"""
+import argparse
+import json
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from utils.db_export import parse_table_list
+from utils.db_restore import RESTORE_BATCH_SIZE, RestoreError, restore_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore database dari file export NDJSON")
+    parser.add_argument("path", help="File export (.ndjson atau .ndjson.gz), '-' untuk stdin")
+    parser.add_argument("--batch-size", type=int, default=RESTORE_BATCH_SIZE, help="Jumlah baris per batch/commit")
+    parser.add_argument("--include", help="Daftar tabel yang di-restore, pisahkan dengan koma")
+    parser.add_argument("--exclude", help="Daftar tabel yang dilewati, pisahkan dengan koma")
+    parser.add_argument("--keep-foreign-keys", action="store_true", help="Jangan matikan foreign_key_checks selama restore")
+    parser.add_argument("--purge-tombstones", action="store_true", help="Hapus permanen baris tombstone (default: set deleted_at)")
+    args = parser.parse_args()
+
+    def report(state):
+        rate = f"{state['rows_per_second']:.0f} rows/s" if state["rows_per_second"] else "-"
+        print(f"⏳ {state['table']}: {state['rows']} rows, {state['batches']} batches, {rate}", flush=True)
+
+    fileobj = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        summary = restore_file(
+            fileobj,
+            batch_size=args.batch_size,
+            include=parse_table_list(args.include),
+            exclude=parse_table_list(args.exclude),
+            disable_foreign_keys=not args.keep_foreign_keys,
+            purge_tombstones=args.purge_tombstones,
+            progress=report
+        )
+    except RestoreError as e:
+        print(f"❌ Restore gagal: {e}")
+        print(f"   Sudah di-commit: {e.summary['rows']} rows dalam {e.summary['batches']} batches")
+        sys.exit(1)
+    finally:
+        if fileobj is not sys.stdin.buffer:
+            fileobj.close()
+
+    print(f"✅ Restore selesai: {summary['rows']} rows, {summary['tombstones']} tombstones "
+          f"dalam {summary['duration_seconds']}s ({summary['rows_per_second']} rows/s)")
+    if summary["manifest_verified"] is False:
+        print("⚠️  Jumlah baris tidak cocok dengan manifest atau manifest tidak ada")
+    if summary["foreign_key_violations"]:
+        print("⚠️  Foreign key violation:")
+        print(json.dumps(summary["foreign_key_violations"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
 import logging
-import os
 import shutil
-from PIL import Image
 import io
 import json
 from fastapi import UploadFile, File, Form
@@ -11,9 +9,11 @@ from typing import List, Optional
 from dependencies.auth import verify_token
 from config.database import db
 from utils.validators import check_foto_profil_column, delete_old_profile_picture
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin"])
+router = APIRouter(tags=["Admin"], route_class=FastJSONRoute)
 
 # Path untuk menyimpan file upload
 SLIDER_UPLOAD_DIR = "uploads/slider"
@@ -22,10 +22,7 @@ TIM_UPLOAD_DIR = "uploads/tim"
 KONTAK_UPLOAD_DIR = "uploads/kontak"
 
 # Buat direktori jika belum ada
-os.makedirs(SLIDER_UPLOAD_DIR, exist_ok=True)
-os.makedirs(TENTANG_KAMI_UPLOAD_DIR, exist_ok=True)
-os.makedirs(TIM_UPLOAD_DIR, exist_ok=True)
-os.makedirs(KONTAK_UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(SLIDER_UPLOAD_DIR, TENTANG_KAMI_UPLOAD_DIR, TIM_UPLOAD_DIR, KONTAK_UPLOAD_DIR)
 
 # Konfigurasi gambar
 SLIDER_TARGET_WIDTH = 1200
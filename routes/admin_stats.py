@@ -2,18 +2,26 @@ from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime
 import logging
 import os
-import shutil
-from PIL import Image
 import io
 import json
 from fastapi import UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from dependencies.auth import verify_token
 from config.database import db
 from utils.validators import check_foto_profil_column, delete_old_profile_picture
+from utils.system_metrics import sampler as system_metrics
+from utils.db_export import (
+    EXPORT_FORMATS, prepare_export, parse_table_list, export_filename,
+    build_incremental_plan, parse_watermark, decode_watermark_token
+)
+from utils.db_restore import RESTORE_BATCH_SIZE, RestoreError, RestoreInputError, restore_file
+from utils.log_reader import LOG_FILE, list_log_files, parse_timestamp, search_logs
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs, on_startup
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin Stats"])
+router = APIRouter(tags=["Admin Stats"], route_class=FastJSONRoute)
 
 # Path untuk menyimpan file upload
 SLIDER_UPLOAD_DIR = "uploads/slider"
@@ -22,10 +30,7 @@ TIM_UPLOAD_DIR = "uploads/tim"
 LAYANAN_UPLOAD_DIR = "uploads/layanan"  # ✅ DITAMBAHKAN
 
 # Buat direktori jika belum ada
-os.makedirs(SLIDER_UPLOAD_DIR, exist_ok=True)
-os.makedirs(TENTANG_KAMI_UPLOAD_DIR, exist_ok=True)
-os.makedirs(TIM_UPLOAD_DIR, exist_ok=True)
-os.makedirs(LAYANAN_UPLOAD_DIR, exist_ok=True)  # ✅ DITAMBAHKAN
+register_upload_dirs(SLIDER_UPLOAD_DIR, TENTANG_KAMI_UPLOAD_DIR, TIM_UPLOAD_DIR, LAYANAN_UPLOAD_DIR)
 
 # Konfigurasi gambar
 SLIDER_TARGET_WIDTH = 1200
@@ -40,6 +45,7 @@ TIM_TARGET_HEIGHT = 400
 
 def process_tim_image(file_path: str) -> dict:
     """Proses gambar tim menjadi persegi 400x400"""
+    from PIL import Image
     try:
         with Image.open(file_path) as img:
             # Get original dimensions
@@ -341,8 +347,8 @@ def migrate_old_tim_data():
         cursor.close()
         connection.close()
 
-# Jalankan migrasi saat module di-load
-migrate_old_tim_data()
+# Migrasi dijalankan sekali di lifespan startup (bukan saat module di-load)
+on_startup(migrate_old_tim_data)
 
 # ============================================
 # ✅ ENDPOINT UNTUK STATISTIK ADMIN
@@ -452,7 +458,10 @@ def get_admin_stats(token: dict = Depends(verify_token)):
 
 @router.get("/admin/export/data")
 def export_database_data(token: dict = Depends(verify_token)):
-    """Export data database untuk backup (admin only)"""
+    """
+    Export data database untuk backup (admin only).
+    Seluruh isi ditampung di memory; untuk database besar gunakan /admin/export/stream.
+    """
     if token["role"] != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak")
     
@@ -494,6 +503,108 @@ def export_database_data(token: dict = Depends(verify_token)):
         cursor.close()
         connection.close()
 
+@router.get("/admin/export/stream")
+def export_database_stream(
+    format: str = "ndjson",
+    include: Optional[str] = None,
+    exclude: Optional[str] = None,
+    since: Optional[str] = None,
+    watermark_token: Optional[str] = None,
+    untracked: str = "full",
+    token: dict = Depends(verify_token)
+):
+    """
+    Export database sebagai stream gzip (admin only).
+    format=ndjson: satu record JSON per baris, diakhiri manifest jumlah baris per tabel.
+    format=csv: arsip tar.gz berisi satu CSV per tabel dan manifest.json.
+    Isi `since` (ISO datetime) atau `watermark_token` dari manifest export sebelumnya
+    untuk export incremental; manifest berisi watermark dan next_token baru.
+    """
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format tidak valid. Pilihan: {', '.join(EXPORT_FORMATS)}")
+    
+    include_tables = parse_table_list(include)
+    exclude_tables = parse_table_list(exclude)
+    plan_builder = None
+    
+    try:
+        if since or watermark_token:
+            since_value = decode_watermark_token(watermark_token) if watermark_token else parse_watermark(since)
+            plan_builder = lambda cursor: build_incremental_plan(
+                cursor, since_value, include_tables, exclude_tables, untracked
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        stream = prepare_export(format, include_tables, exclude_tables, plan_builder=plan_builder)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting export stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error mengekspor data: {str(e)}")
+    
+    filename = export_filename(format, "backup_incremental" if plan_builder else "backup")
+    return StreamingResponse(
+        stream,
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/admin/import/data")
+def restore_database_data(
+    file: UploadFile = File(...),
+    batch_size: int = Form(RESTORE_BATCH_SIZE),
+    include: Optional[str] = Form(None),
+    exclude: Optional[str] = Form(None),
+    disable_foreign_keys: bool = Form(True),
+    purge_tombstones: bool = Form(False),
+    token: dict = Depends(verify_token)
+):
+    """
+    Restore database dari file NDJSON (.ndjson/.ndjson.gz) hasil /admin/export/stream (admin only).
+    File dibaca sebagai stream dan ditulis per batch dengan upsert; bisa diulang dengan aman.
+    """
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+    
+    if batch_size < 1 or batch_size > 10000:
+        raise HTTPException(status_code=400, detail="batch_size harus antara 1 dan 10000")
+    
+    try:
+        summary = restore_file(
+            file.file,
+            batch_size=batch_size,
+            include=parse_table_list(include),
+            exclude=parse_table_list(exclude),
+            disable_foreign_keys=disable_foreign_keys,
+            purge_tombstones=purge_tombstones,
+            progress=lambda state: logger.info(
+                f"Restore progress: {state['rows']} rows, {state['batches']} batches ({state['table']})"
+            )
+        )
+        
+        return {
+            "message": "Restore selesai",
+            "filename": file.filename,
+            "restored_at": datetime.now().isoformat(),
+            "summary": summary
+        }
+        
+    except RestoreInputError as e:
+        raise HTTPException(status_code=400, detail={
+            "message": f"File restore tidak valid: {str(e)}",
+            "committed": e.summary
+        })
+    except RestoreError as e:
+        raise HTTPException(status_code=500, detail={
+            "message": f"Error merestore data: {str(e)}",
+            "committed": e.summary
+        })
+
 # ============================================
 # ✅ ENDPOINT UNTUK SYSTEM HEALTH CHECK
 # ============================================
@@ -534,17 +645,9 @@ def system_health_check(token: dict = Depends(verify_token)):
                     "row_count": 0
                 }
         
-        # Disk usage (simple check)
-        try:
-            disk_usage = shutil.disk_usage(".")
-            disk_info = {
-                "total_gb": round(disk_usage.total / (1024**3), 2),
-                "used_gb": round(disk_usage.used / (1024**3), 2),
-                "free_gb": round(disk_usage.free / (1024**3), 2),
-                "percent_used": round((disk_usage.used / disk_usage.total) * 100, 2)
-            }
-        except:
-            disk_info = {"error": "Unable to get disk usage"}
+        # Disk usage (dari sampler background, tanpa syscall tambahan)
+        system_metrics.ensure_started()
+        disk_info = system_metrics.latest_or_sample().get("disk") or {"error": "Unable to get disk usage"}
         
         # Upload directories check
         upload_dirs = [SLIDER_UPLOAD_DIR, TENTANG_KAMI_UPLOAD_DIR, TIM_UPLOAD_DIR, LAYANAN_UPLOAD_DIR]
@@ -584,60 +687,68 @@ def system_health_check(token: dict = Depends(verify_token)):
         connection.close()
 
 # ============================================
-# ✅ ENDPOINT UNTUK LOGS VIEWER (SIMPLE)
+# ✅ ENDPOINT UNTUK LOGS VIEWER
 # ============================================
 
 @router.get("/admin/logs")
 def get_recent_logs(
     lines: int = 100,
+    level: Optional[str] = None,
+    logger_name: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    contains: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_rotated: bool = True,
     token: dict = Depends(verify_token)
 ):
-    """Get recent logs (admin only)"""
+    """
+    Get recent logs (admin only)
+
+    - level: level minimum (DEBUG/INFO/WARNING/ERROR/CRITICAL)
+    - logger_name: prefix nama logger, mis. `routes.kelas`
+    - since / until: rentang waktu ISO 8601
+    - cursor: `next_cursor` dari response sebelumnya untuk halaman yang lebih lama
+    """
     if token["role"] != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak")
-    
+
+    if lines < 1 or lines > 5000:
+        raise HTTPException(status_code=400, detail="lines harus antara 1 dan 5000")
+
+    since_dt = parse_timestamp(since) if since else None
+    until_dt = parse_timestamp(until) if until else None
+    if (since and since_dt is None) or (until and until_dt is None):
+        raise HTTPException(status_code=400, detail="Format since/until harus ISO 8601, contoh 2026-01-31T08:00:00")
+
     try:
-        # This is a simple log viewer that reads from the current log file
-        log_file = "app.log"
-        
-        if not os.path.exists(log_file):
+        if not list_log_files(LOG_FILE):
             return {
                 "message": "Log file not found",
                 "logs": []
             }
-        
-        # Read last N lines from log file
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines_content = f.readlines()[-lines:]
-        
-        # Parse logs
-        parsed_logs = []
-        for line in lines_content:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Simple parsing (adjust based on your log format)
-            if 'ERROR' in line:
-                level = 'ERROR'
-            elif 'WARNING' in line:
-                level = 'WARNING'
-            elif 'INFO' in line:
-                level = 'INFO'
-            else:
-                level = 'DEBUG'
-            
-            parsed_logs.append({
-                "level": level,
-                "message": line,
-                "timestamp": line[:23] if len(line) > 23 else "unknown"
-            })
-        
+
+        result = search_logs(
+            limit=lines,
+            level=level,
+            logger_name=logger_name,
+            since=since_dt,
+            until=until_dt,
+            contains=contains,
+            cursor=cursor,
+            include_rotated=include_rotated
+        )
+
         return {
-            "total_lines": len(lines_content),
-            "logs": parsed_logs
+            "total_lines": len(result["logs"]),
+            "logs": result["logs"],
+            "next_cursor": result["next_cursor"],
+            "scanned_lines": result["scanned_lines"],
+            "files": result["files"]
         }
-        
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error reading logs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error membaca logs: {str(e)}")
@@ -720,14 +831,20 @@ def cleanup_system(
 # ============================================
 
 @router.get("/admin/system/info")
-def get_system_info(token: dict = Depends(verify_token)):
+def get_system_info(
+    history: int = 12,
+    token: dict = Depends(verify_token)
+):
     """Get system information (admin only)"""
     if token["role"] != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak")
     
+    import platform
+    
     try:
-        import platform
-        import psutil
+        # Sampler background mengisi ring buffer; endpoint hanya membaca
+        system_metrics.ensure_started()
+        latest = system_metrics.latest_or_sample()
         
         # System info
         system_info = {
@@ -738,59 +855,34 @@ def get_system_info(token: dict = Depends(verify_token)):
             "architecture": platform.architecture()[0]
         }
         
-        # CPU info
-        cpu_info = {
-            "cores": psutil.cpu_count(logical=False),
-            "logical_cores": psutil.cpu_count(logical=True),
-            "usage_percent": psutil.cpu_percent(interval=1)
-        }
-        
-        # Memory info
-        memory = psutil.virtual_memory()
-        memory_info = {
-            "total_gb": round(memory.total / (1024**3), 2),
-            "available_gb": round(memory.available / (1024**3), 2),
-            "used_gb": round(memory.used / (1024**3), 2),
-            "percent_used": memory.percent
-        }
-        
-        # Disk info
-        disk = psutil.disk_usage('.')
-        disk_info = {
-            "total_gb": round(disk.total / (1024**3), 2),
-            "used_gb": round(disk.used / (1024**3), 2),
-            "free_gb": round(disk.free / (1024**3), 2),
-            "percent_used": disk.percent
-        }
-        
-        # Process info
-        process = psutil.Process()
-        process_info = {
-            "pid": process.pid,
-            "name": process.name(),
-            "memory_percent": round(process.memory_percent(), 2),
-            "cpu_percent": process.cpu_percent(interval=1)
-        }
-        
-        return {
+        response = {
             "timestamp": datetime.now().isoformat(),
+            "sampled_at": latest["timestamp"],
+            "sample_interval_seconds": system_metrics.interval,
             "system": system_info,
-            "cpu": cpu_info,
-            "memory": memory_info,
-            "disk": disk_info,
-            "process": process_info
+            "cpu": latest.get("cpu"),
+            "memory": latest.get("memory"),
+            "disk": latest.get("disk"),
+            "process": latest.get("process"),
+            "history": [
+                {
+                    "timestamp": sample["timestamp"],
+                    "cpu_percent": (sample.get("cpu") or {}).get("usage_percent"),
+                    "memory_percent": (sample.get("memory") or {}).get("percent_used"),
+                    "disk_percent": (sample.get("disk") or {}).get("percent_used"),
+                    "process_cpu_percent": (sample.get("process") or {}).get("cpu_percent"),
+                    "process_rss_mb": (sample.get("process") or {}).get("rss_mb")
+                }
+                for sample in system_metrics.history(min(max(history, 0), system_metrics.history_size))
+            ]
         }
         
-    except ImportError:
-        # If psutil is not installed
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "system": {
-                "platform": platform.platform(),
-                "python_version": platform.python_version(),
-                "note": "psutil not installed for detailed metrics"
-            }
-        }
+        if latest.get("cpu") is None:
+            # psutil tidak terinstall
+            response["system"]["note"] = "psutil not installed for detailed metrics"
+        
+        return response
+        
     except Exception as e:
         logger.error(f"Error getting system info: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error mengambil informasi sistem: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error mengambil informasi sistem: {str(e)}")
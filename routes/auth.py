@@ -10,9 +10,11 @@ from uuid import uuid4
 import os
 import shutil
 from typing import Optional
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Authentication"])
+router = APIRouter(tags=["Authentication"], route_class=FastJSONRoute)
 
 # Konfigurasi upload foto
 UPLOAD_DIR = "uploads/profile_pictures"
@@ -20,7 +22,7 @@ ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
 # Pastikan direktori upload ada
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(UPLOAD_DIR)
 
 def allowed_file(filename: str) -> bool:
     """Cek apakah ekstensi file diizinkan"""
@@ -3,9 +3,11 @@ from datetime import datetime
 import logging
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
+from utils.json_response import FastJSONRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Footer Kontak"])
+router = APIRouter(tags=["Footer Kontak"], route_class=FastJSONRoute)
 
 # ============================================
 # ✅ FUNGSI: Buat tabel footer_kontak jika belum ada
@@ -248,18 +250,14 @@ def update_footer_kontak(
 # ============================================
 
 @router.get("/footer-kontak/public")
-def get_public_footer_kontak():
+async def get_public_footer_kontak():
     """Get data footer kontak untuk public (tanpa auth)"""
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        # Buat tabel jika belum ada
-        create_footer_kontak_table()
+        # Buat tabel jika belum ada (sekali per proses)
+        await ensure_schema(create_footer_kontak_table)
         
         # Ambil data dari database
-        cursor.execute("SELECT * FROM footer_kontak ORDER BY id DESC LIMIT 1")
-        footer_data = cursor.fetchone()
+        footer_data = await async_db.fetch_one("SELECT * FROM footer_kontak ORDER BY id DESC LIMIT 1")
         
         if not footer_data:
             # Return default data jika tidak ada
@@ -311,9 +309,6 @@ def get_public_footer_kontak():
                 "youtube": "https://youtube.com/gastronomirun"
             }
         }
-    finally:
-        cursor.close()
-        connection.close()
 
 # ============================================
 # ✅ ENDPOINT UNTUK RESET FOOTER KONTAK
@@ -1,83 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from dependencies.auth import verify_user
 from config.database import db
+import base64
+import json
 import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+from models.enums import StatusPeminjaman
+from utils.json_response import FastJSONResponse, FastJSONRoute
+from utils.startup import on_startup
+from utils.validators import validate_status_peminjaman
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/home", tags=["Home"])
+router = APIRouter(prefix="/home", tags=["Home"], route_class=FastJSONRoute)
 
-@router.get("/riwayat")
-def get_riwayat_home_user(token: dict = Depends(verify_user)):
-    """Endpoint khusus untuk HomeUser - tampilkan hanya riwayat yang BELUM dihapus"""
+RIWAYAT_INDEX = "idx_user_deleted_created"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def create_riwayat_index():
+    """Index komposit untuk riwayat per user (filter deleted_at, urut created_at)"""
     connection = db.get_connection()
     cursor = connection.cursor(dictionary=True)
-    
+
     try:
-        # Dapatkan user_id dari token
-        user_id = token.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=400, detail="User ID tidak ditemukan")
-        
-        # Query: Filter hanya data yang deleted_at IS NULL
+        # SHOW INDEX mengembalikan satu baris per kolom; cukup cek keberadaan index
         cursor.execute("""
-            SELECT 
-                b.*, 
-                i.nama_barang, 
-                i.foto as foto_barang,
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, ("borrowings", RIWAYAT_INDEX))
+        if cursor.fetchone() is None:
+            cursor.execute(f"CREATE INDEX {RIWAYAT_INDEX} ON borrowings (user_id, deleted_at, created_at)")
+            logger.info(f"✅ Index {RIWAYAT_INDEX} dibuat di tabel borrowings")
+    except Exception as e:
+        logger.error(f"Error creating riwayat index: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+on_startup(create_riwayat_index)
+
+
+def encode_cursor(created_at: datetime, borrowing_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), borrowing_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        created_at, borrowing_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(borrowing_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+
+def normalize_upload_path(column: str) -> str:
+    """Buang prefix 'uploads/' atau 'uploads\\' langsung di SQL"""
+    return f"""
+        CASE WHEN LEFT({column}, 8) IN ('uploads/', 'uploads\\\\')
+            THEN SUBSTRING({column}, 9) ELSE {column} END
+    """
+
+
+@router.get("/riwayat")
+def get_riwayat_home_user(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=f"Nilai header {NEXT_CURSOR_HEADER} dari halaman sebelumnya"),
+    status: Optional[str] = None,
+    dari: Optional[date] = Query(None, description="Tanggal pengajuan mulai (inklusif)"),
+    sampai: Optional[date] = Query(None, description="Tanggal pengajuan sampai (inklusif)"),
+    token: dict = Depends(verify_user)
+):
+    """
+    Endpoint khusus untuk HomeUser - tampilkan hanya riwayat yang BELUM dihapus.
+    Terbaru lebih dulu, per halaman `limit`; halaman berikutnya diambil dengan
+    `cursor` dari header X-Next-Cursor (tidak ada header = halaman terakhir).
+    """
+    # Dapatkan user_id dari token
+    user_id = token.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="User ID tidak ditemukan")
+    if status is not None and not validate_status_peminjaman(status):
+        status_valid = [s.value for s in StatusPeminjaman]
+        raise HTTPException(status_code=400, detail=f"Status tidak valid. Pilihan: {', '.join(status_valid)}")
+
+    # Query: Filter hanya data yang deleted_at IS NULL (memakai index user_id, deleted_at, created_at)
+    conditions = ["b.user_id = %s", "b.deleted_at IS NULL"]
+    params = [user_id]
+    if status is not None:
+        conditions.append("b.status = %s")
+        params.append(status)
+    if dari is not None:
+        conditions.append("b.created_at >= %s")
+        params.append(dari)
+    if sampai is not None:
+        conditions.append("b.created_at < %s")
+        params.append(sampai + timedelta(days=1))
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        conditions.append("(b.created_at < %s OR (b.created_at = %s AND b.id < %s))")
+        params.extend([cursor_created_at, cursor_created_at, cursor_id])
+    params.append(limit + 1)
+
+    connection = db.get_connection()
+    db_cursor = connection.cursor(dictionary=True)
+
+    try:
+        db_cursor.execute(f"""
+            SELECT
+                b.*,
+                i.nama_barang,
+                {normalize_upload_path('i.foto')} as foto_barang,
                 c.nama as kategori_barang,
-                r.tanggal_pengembalian, 
-                r.kondisi_barang, 
-                r.catatan, 
-                r.foto as foto_pengembalian,
+                r.tanggal_pengembalian,
+                r.kondisi_barang,
+                r.catatan,
+                {normalize_upload_path('r.foto')} as foto_pengembalian,
                 r.created_at as tanggal_pengembalian_dibuat,
                 CASE WHEN r.id IS NOT NULL THEN TRUE ELSE FALSE END as dikembalikan,
                 CASE WHEN b.deleted_at IS NOT NULL THEN TRUE ELSE FALSE END as dihapus_admin
-            FROM borrowings b 
-            JOIN items i ON b.barang_id = i.id 
-            JOIN categories c ON i.kategori_id = c.id 
+            FROM borrowings b
+            JOIN items i ON b.barang_id = i.id
+            JOIN categories c ON i.kategori_id = c.id
             LEFT JOIN returns r ON b.id = r.borrowing_id
-            WHERE b.user_id = %s 
-            AND b.deleted_at IS NULL  -- Hanya data yang belum dihapus
-            ORDER BY b.created_at DESC
-        """, (user_id,))
-        
-        riwayat = cursor.fetchall()
-        
-        # Format data
-        formatted_data = []
+            WHERE {' AND '.join(conditions)}
+            ORDER BY b.created_at DESC, b.id DESC
+            LIMIT %s
+        """, params)
+
+        riwayat = db_cursor.fetchall()
+        has_more = len(riwayat) > limit
+        riwayat = riwayat[:limit]
+
+        # Jika ada data pengembalian, format menjadi objek
         for item in riwayat:
-            formatted_item = dict(item)
-            
-            # Normalisasi path foto barang
-            if item['foto_barang']:
-                foto_barang_path = item['foto_barang']
-                if foto_barang_path.startswith('uploads\\') or foto_barang_path.startswith('uploads/'):
-                    foto_barang_path = foto_barang_path.replace('uploads\\', '').replace('uploads/', '')
-                formatted_item['foto_barang'] = foto_barang_path
-            
-            # Jika ada data pengembalian, format menjadi objek
             if item['dikembalikan'] and item['foto_pengembalian']:
-                foto_path = item['foto_pengembalian']
-                if foto_path.startswith('uploads\\') or foto_path.startswith('uploads/'):
-                    foto_path = foto_path.replace('uploads\\', '').replace('uploads/', '')
-                
-                formatted_item['pengembalian'] = {
+                item['pengembalian'] = {
                     'tanggal_pengembalian': item['tanggal_pengembalian'],
                     'kondisi_barang': item['kondisi_barang'],
                     'catatan': item['catatan'],
-                    'foto': foto_path,
+                    'foto': item['foto_pengembalian'],
                     'tanggal_dibuat': item['tanggal_pengembalian_dibuat']
                 }
-            
-            formatted_data.append(formatted_item)
-        
-        return formatted_data
-        
+
+        headers = {}
+        if has_more:
+            last = riwayat[-1]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(last['created_at'], last['id'])
+        return FastJSONResponse(riwayat, headers=headers)
+
     except Exception as e:
         logger.error(f"Error fetching home riwayat data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error mengambil data riwayat home: {str(e)}")
     finally:
-        cursor.close()
+        db_cursor.close()
         connection.close()
 
-# Endpoint delete dihapus untuk menjaga integritas data statistik
\ No newline at end of file
+# Endpoint delete dihapus untuk menjaga integritas data statistik
@@ -4,9 +4,12 @@ from dependencies.auth import verify_token
 from config.database import db
 from utils.file_utils import save_upload_file
 import logging
+from utils.json_response import FastJSONRoute
+from utils.data_version import KELAS, bump_data_version
+from utils.kelas_card import refresh_kelas_cards
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/kategori", tags=["Kategori"])
+router = APIRouter(prefix="/kategori", tags=["Kategori"], route_class=FastJSONRoute)
 
 @router.get("/")
 def get_kategori():
@@ -81,6 +84,8 @@ async def create_kategori_dan_kelas(
         )
         kelas_id = cursor.lastrowid
         
+        refresh_kelas_cards(cursor, [kelas_id])
+        bump_data_version(cursor, KELAS)
         connection.commit()
         
         return {
@@ -135,6 +140,7 @@ def delete_kategori(nama: str, token: str = Depends(verify_token)):
         
         # Hapus kategori (hanya jika tidak ada kelas atau barang yang menggunakan)
         cursor.execute("DELETE FROM categories WHERE nama = %s", (nama,))
+        bump_data_version(cursor, KELAS)
         connection.commit()
         
         return {"message": "Kategori berhasil dihapus", "kategori": nama}
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from typing import Optional, List
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
 from utils.file_utils import save_upload_file, delete_file
 import logging
 import os
-from decimal import Decimal
 import json
+import time
+from utils.json_response import FastJSONRoute
+from utils.data_version import KELAS, TIKET, bump_data_version
+from utils.kelas_search import kelas_search
+from utils.kelas_browse import SORT_OPTIONS, browse_conditions, facet_total, get_browse_facets, where_clause
+from utils.kelas_card import cards_response, create_kelas_card_table, lock_kelas, refresh_kelas_cards
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/kelas", tags=["Kelas"])
+router = APIRouter(prefix="/kelas", tags=["Kelas"], route_class=FastJSONRoute)
 
 @router.get("/")
 def get_all_kelas():
@@ -50,9 +56,6 @@ def get_all_kelas():
             
             # Format tiket kategori
             for tiket in tiket_kategori:
-                if isinstance(tiket.get('harga'), Decimal):
-                    tiket['harga'] = float(tiket['harga'])
-                
                 # Ensure is_populer field exists
                 if 'is_populer' not in tiket:
                     tiket['is_populer'] = False
@@ -67,7 +70,7 @@ def get_all_kelas():
             
             # Debug info untuk foto
             if kelas.get('foto'):
-                logger.info(f"Kelas {kelas['id']}: {kelas['nama_kelas']} - Foto: {kelas['foto']}")
+                logger.debug("Kelas %s: %s - Foto: %s", kelas['id'], kelas['nama_kelas'], kelas['foto'])
                 
                 # Cek apakah file ada di server
                 foto_path = os.path.join("uploads", kelas['foto'])
@@ -99,6 +102,70 @@ def get_all_kelas():
         cursor.close()
         connection.close()
 
+# ============ PENCARIAN KELAS ============
+# Didaftarkan sebelum /{id} agar "search" tidak dicocokkan sebagai id
+@router.get("/search")
+async def search_kelas(
+    q: str = Query(..., min_length=1, max_length=100),
+    kategori: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    Pencarian kelas di nama_kelas, kategori, ruangan dan deskripsi, terurut
+    relevansi (BM25). Imbuhan umum bahasa Indonesia dikenali (memasak ~ masak)
+    dan kata terakhir diperlakukan sebagai prefix untuk search-as-you-type.
+    """
+    try:
+        started = time.perf_counter()
+        index = await kelas_search.get_index()
+        hits = index.search(q, limit=limit, kategori=kategori)
+
+        results = []
+        for kelas_id, score in hits:
+            kelas = dict(index.docs[kelas_id])
+            kelas['score'] = round(score, 4)
+            results.append(kelas)
+
+        return {
+            "query": q,
+            "total": len(results),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results
+        }
+
+    except Exception as e:
+        logger.error(f"Error searching kelas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error mencari kelas: {str(e)}")
+
+@router.get("/search/suggest")
+async def suggest_kelas(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Autocomplete: kata yang diawali ketikan terakhir + kelas teratas untuk query tersebut"""
+    try:
+        index = await kelas_search.get_index()
+        words = q.split()
+        last_word = words[-1].lower() if words and not q[-1:].isspace() else ""
+        hits = index.search(q, limit=limit)
+
+        return {
+            "query": q,
+            "terms": index.complete(last_word, limit=limit) if last_word else [],
+            "kelas": [
+                {
+                    "id": kelas_id,
+                    "nama_kelas": index.docs[kelas_id]['nama_kelas'],
+                    "kategori": index.docs[kelas_id]['kategori']
+                }
+                for kelas_id, _ in hits
+            ]
+        }
+
+    except Exception as e:
+        logger.error(f"Error suggesting kelas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error autocomplete kelas: {str(e)}")
+
 @router.get("/{id}")
 def get_kelas(id: int):
     connection = db.get_connection()
@@ -160,9 +227,6 @@ def get_kelas(id: int):
         
         # Format tiket kategori
         for tiket in tiket_kategori:
-            if isinstance(tiket.get('harga'), Decimal):
-                tiket['harga'] = float(tiket['harga'])
-            
             # Ensure is_populer field exists
             if 'is_populer' not in tiket:
                 tiket['is_populer'] = False
@@ -281,6 +345,8 @@ async def create_kelas(
             """, (kelas_id, tiket['nama_kategori'], tiket['deskripsi'], 
                   tiket['harga'], tiket['manfaat'], tiket['is_populer']))
         
+        refresh_kelas_cards(cursor, [kelas_id])
+        bump_data_version(cursor, KELAS, TIKET)
         connection.commit()
         
         logger.info(f"Kelas created successfully: ID {kelas_id} with 3 default tiket categories")
@@ -420,6 +486,8 @@ async def update_kelas(
              total_peserta, foto_filename, gambaran_event_json, link_navigasi, is_link_eksternal, kelas_id)
         )
         
+        refresh_kelas_cards(cursor, [kelas_id])
+        bump_data_version(cursor, KELAS)
         connection.commit()
         
         # Get updated kelas data
@@ -465,9 +533,6 @@ async def update_kelas(
         
         # Format tiket kategori
         for tiket in tiket_kategori:
-            if isinstance(tiket.get('harga'), Decimal):
-                tiket['harga'] = float(tiket['harga'])
-            
             if 'is_populer' not in tiket:
                 tiket['is_populer'] = False
         
@@ -521,6 +586,9 @@ def delete_kelas(id: int, token: str = Depends(verify_token)):
             except json.JSONDecodeError:
                 pass
         
+        # Kunci kelas sebelum baris tiket (urutan lock sama dengan writer tiket_kategori)
+        lock_kelas(cursor, [id])
+        
         # Hapus tiket kategori terkait
         cursor.execute("DELETE FROM tiket_kategori WHERE kelas_id = %s", (id,))
         
@@ -533,6 +601,8 @@ def delete_kelas(id: int, token: str = Depends(verify_token)):
         # Hapus kelas
         cursor.execute("DELETE FROM kelas WHERE id = %s", (id,))
         
+        refresh_kelas_cards(cursor, [id])
+        bump_data_version(cursor, KELAS, TIKET)
         connection.commit()
         
         logger.info(f"Kelas deleted successfully: {id}")
@@ -608,9 +678,6 @@ def get_tiket_kategori_kelas(kelas_id: int):
         tiket_kategori = cursor.fetchall()
         
         for tiket in tiket_kategori:
-            if isinstance(tiket.get('harga'), Decimal):
-                tiket['harga'] = float(tiket['harga'])
-            
             if 'is_populer' not in tiket:
                 tiket['is_populer'] = False
         
@@ -626,18 +693,15 @@ def get_tiket_kategori_kelas(kelas_id: int):
 
 # ============ ENDPOINT PUBLIC UNTUK USER ============
 @router.get("/{kelas_id}/public")
-def get_kelas_public(kelas_id: int):
+async def get_kelas_public(kelas_id: int):
     """
     Endpoint public untuk mendapatkan data kelas tanpa authentication
     """
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
         logger.info(f"Fetching kelas data for public: ID {kelas_id}")
         
         # PERBAIKAN: Hanya kolom yang pasti ada di tabel kelas
-        cursor.execute("""
+        kelas_data = await async_db.fetch_one("""
             SELECT 
                 k.id,
                 k.nama_kelas,
@@ -657,8 +721,6 @@ def get_kelas_public(kelas_id: int):
             WHERE k.id = %s
         """, (kelas_id,))
         
-        kelas_data = cursor.fetchone()
-        
         if not kelas_data:
             logger.warning(f"Kelas ID {kelas_id} not found")
             return {
@@ -699,7 +761,7 @@ def get_kelas_public(kelas_id: int):
         
         # Ambil tiket kategori
         try:
-            cursor.execute("""
+            tiket_kategori = await async_db.fetch_all("""
                 SELECT 
                     id,
                     nama_kategori,
@@ -713,12 +775,6 @@ def get_kelas_public(kelas_id: int):
                 ORDER BY harga ASC
             """, (kelas_id,))
             
-            tiket_kategori = cursor.fetchall()
-            
-            for tiket in tiket_kategori:
-                if isinstance(tiket.get('harga'), Decimal):
-                    tiket['harga'] = float(tiket['harga'])
-            
             kelas_data['tiket_kategori'] = tiket_kategori
         except Exception as e:
             logger.warning(f"Could not fetch tiket kategori for kelas {kelas_id}: {str(e)}")
@@ -745,82 +801,100 @@ def get_kelas_public(kelas_id: int):
             "gambaran_event_urls": [],
             "tiket_kategori": []
         }
-    finally:
-        cursor.close()
-        connection.close()
 
 @router.get("/public/all")
-def get_all_kelas_public(
+async def get_all_kelas_public(
     kategori: Optional[str] = None,
     limit: int = 50,
     offset: int = 0
 ):
     """
-    Endpoint public untuk mendapatkan semua kelas tanpa authentication
+    Endpoint public untuk mendapatkan semua kelas tanpa authentication.
+    Dibaca dari read model kelas_card: kartu sudah berisi kategori, URL foto,
+    galeri dan rentang harga tiket, jadi cukup scan index satu tabel.
     """
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
         logger.info(f"Fetching all kelas data for public, kategori: {kategori}")
-        
-        query = """
-            SELECT 
-                k.id,
-                k.nama_kelas,
-                k.deskripsi,
-                k.jadwal,
-                k.ruangan,
-                k.biaya,
-                k.foto,
-                k.total_peserta,
-                k.link_navigasi,  -- TAMBAHKAN: Link navigasi
-                k.is_link_eksternal,  -- TAMBAHKAN: Apakah link eksternal
-                k.created_at,
-                c.nama as kategori,
-                CONCAT('http://localhost:8000/uploads/', k.foto) as foto_url
-            FROM kelas k
-            LEFT JOIN categories c ON k.kategori_id = c.id
-            WHERE 1=1
-        """
-        
-        params = []
-        
-        if kategori:
-            query += " AND c.nama = %s"
-            params.append(kategori)
-        
-        query += " ORDER BY k.created_at DESC LIMIT %s OFFSET %s"
+        await ensure_schema(create_kelas_card_table)
+
+        conditions, params = browse_conditions([kategori] if kategori else None)
         params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        kelas_list = cursor.fetchall()
-        
-        for kelas in kelas_list:
-            # Tambahkan field default
-            kelas['kuota'] = kelas.get('total_peserta', 50)  # Gunakan total_peserta sebagai kuota
-            kelas['durasi'] = "2 jam"
-            
-            gambaran_event_urls = []
-            if kelas.get('gambaran_event'):
-                try:
-                    gambaran_event = json.loads(kelas['gambaran_event'])
-                    if isinstance(gambaran_event, list):
-                        gambaran_event_urls = [
-                            f"http://localhost:8000/uploads/{foto}" 
-                            for foto in gambaran_event if foto
-                        ]
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            
-            kelas['gambaran_event_urls'] = gambaran_event_urls
-        
-        logger.info(f"Successfully retrieved {len(kelas_list)} kelas for public")
-        return kelas_list
+
+        rows = await async_db.fetch_all(f"""
+            SELECT card_json
+            FROM kelas_card
+            {where_clause(conditions)}
+            ORDER BY created_at DESC, kelas_id DESC
+            LIMIT %s OFFSET %s
+        """, params)
+
+        logger.info(f"Successfully retrieved {len(rows)} kelas for public")
+        return cards_response(row['card_json'] for row in rows)
         
     except Exception as e:
         logger.error(f"Error getting all kelas public data: {str(e)}", exc_info=True)
         return []
+
+@router.get("/public/browse")
+async def browse_kelas_public(
+    kategori: Optional[List[str]] = Query(None, description="Boleh diulang: ?kategori=A&kategori=B"),
+    harga_min: Optional[float] = Query(None, ge=0),
+    harga_max: Optional[float] = Query(None, ge=0),
+    sort: str = Query("newest", pattern="^(price|newest|schedule)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Satu panggilan untuk halaman daftar kelas + isi UI filter: kartu kelas
+    terfilter (harga = tiket aktif termurah, fallback biaya kelas) beserta
+    facet jumlah kelas per kategori dan per rentang harga.
+    """
+    try:
+        await ensure_schema(create_kelas_card_table)
+        kategori = [nama.strip() for nama in kategori or [] if nama and nama.strip()]
+        conditions, params = browse_conditions(kategori, harga_min, harga_max)
+        params.extend([limit, offset])
+
+        rows = await async_db.fetch_all(f"""
+            SELECT card_json
+            FROM kelas_card
+            {where_clause(conditions)}
+            ORDER BY {SORT_OPTIONS[sort]}
+            LIMIT %s OFFSET %s
+        """, params)
+
+        facets = await get_browse_facets(kategori, harga_min, harga_max)
+
+        return cards_response((row['card_json'] for row in rows), extra={
+            "total": facet_total(facets, kategori),
+            "limit": limit,
+            "offset": offset,
+            "sort": sort,
+            "facets": facets
+        })
+
+    except Exception as e:
+        logger.error(f"Error browsing kelas public data: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error mengambil data kelas: {str(e)}")
+
+@router.post("/card/rebuild")
+def rebuild_kelas_cards(token: dict = Depends(verify_token)):
+    """Hitung ulang semua kartu kelas_card (jika kelas/tiket diubah di luar API)"""
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    connection = db.get_connection()
+    cursor = connection.cursor(dictionary=True)
+
+    try:
+        refreshed = refresh_kelas_cards(cursor)
+        bump_data_version(cursor, KELAS, TIKET)
+        connection.commit()
+        return {"message": "Kartu kelas diperbarui", "kelas": refreshed}
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error rebuilding kelas cards: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error memperbarui kartu kelas: {str(e)}")
     finally:
         cursor.close()
-        connection.close()
\ No newline at end of file
+        connection.close()
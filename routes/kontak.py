@@ -2,19 +2,20 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from datetime import datetime
 import logging
-import os
 import shutil
 import json
 from typing import Optional
 from dependencies.auth import verify_token
 from config.database import db
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin - Kontak"])
+router = APIRouter(tags=["Admin - Kontak"], route_class=FastJSONRoute)
 
 # Path untuk menyimpan file upload
 KONTAK_UPLOAD_DIR = "uploads/kontak"
-os.makedirs(KONTAK_UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(KONTAK_UPLOAD_DIR)
 
 # ============================================
 # ✅ FUNGSI: Buat semua tabel kontak jika belum ada
@@ -5,18 +5,20 @@ import os
 import shutil
 import json
 from typing import Optional
-from PIL import Image
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Layanan"])
+router = APIRouter(tags=["Layanan"], route_class=FastJSONRoute)
 
 # Path untuk menyimpan file upload
 LAYANAN_UPLOAD_DIR = "uploads/layanan"
 
 # Buat direktori jika belum ada
-os.makedirs(LAYANAN_UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(LAYANAN_UPLOAD_DIR)
 
 # Konfigurasi gambar
 SLIDER_TARGET_WIDTH = 1200
@@ -29,6 +31,7 @@ SLIDER_ASPECT_RATIO = SLIDER_TARGET_WIDTH / SLIDER_TARGET_HEIGHT
 
 def detect_image_orientation(image_path: str) -> str:
     """Deteksi orientasi gambar (portrait/landscape/square)"""
+    from PIL import Image
     try:
         with Image.open(image_path) as img:
             width, height = img.size
@@ -48,6 +51,7 @@ def detect_image_orientation(image_path: str) -> str:
 
 def get_image_dimensions(image_path: str):
     """Get dimensi gambar (width, height)"""
+    from PIL import Image
     try:
         with Image.open(image_path) as img:
             return img.size  # (width, height)
@@ -65,6 +69,7 @@ def auto_crop_to_slider_ratio(image_path: str, output_path: str = None):
     Untuk portrait: crop bagian tengah secara vertikal
     Untuk landscape: crop bagian tengah secara horizontal
     """
+    from PIL import Image
     try:
         if output_path is None:
             output_path = image_path
@@ -137,6 +142,7 @@ def process_slider_image(file_path: str, crop_mode: str = "smart") -> dict:
     Proses gambar slider dengan berbagai mode crop
     Modes: 'smart', 'crop', 'fit', 'fill'
     """
+    from PIL import Image
     try:
         original_dimensions = get_image_dimensions(file_path)
         orientation = detect_image_orientation(file_path)
@@ -528,18 +534,14 @@ def reset_layanan_content(
         connection.close()
 
 @router.get("/layanan/public")
-def get_public_layanan():
+async def get_public_layanan():
     """Get konten Layanan untuk public (tanpa auth)"""
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        # Buat tabel jika belum ada
-        create_layanan_table()
+        # Buat tabel jika belum ada (sekali per proses)
+        await ensure_schema(create_layanan_table)
         
         # Ambil semua data dari database
-        cursor.execute("SELECT * FROM layanan ORDER BY section, section_key")
-        rows = cursor.fetchall()
+        rows = await async_db.fetch_all("SELECT * FROM layanan ORDER BY section, section_key")
         
         # Format data untuk frontend
         result = {}
@@ -625,9 +627,6 @@ def get_public_layanan():
     except Exception as e:
         logger.error(f"Error getting public Layanan: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error mengambil data Layanan: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
 
 # ============================================
 # ✅ ENDPOINT UNTUK LAYANAN SLIDER (HERO IMAGES)
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+import hmac
+import logging
+import os
+from dependencies.auth import verify_token
+from utils.metrics import registry
+from utils.json_response import FastJSONRoute
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["Metrics"], route_class=FastJSONRoute)
+
+# Token statis untuk Prometheus scraper (bearer_token di scrape config).
+# Jika kosong, /metrics hanya bisa diakses dengan token admin.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def verify_metrics_access(request: Request):
+    if METRICS_TOKEN:
+        auth_header = request.headers.get("authorization") or ""
+        provided = auth_header.split(" ", 1)[1].strip() if auth_header.lower().startswith("bearer ") else ""
+        if provided and hmac.compare_digest(provided, METRICS_TOKEN):
+            return {"role": "admin", "username": "metrics"}
+
+    token = verify_token(request, None)
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+    return token
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(token: dict = Depends(verify_metrics_access)):
+    """Metrics format Prometheus (admin only atau METRICS_TOKEN)"""
+    try:
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error membaca metrics: {str(e)}")
@@ -7,9 +7,12 @@ import uuid
 from typing import Optional, List
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin - Partner"])
+router = APIRouter(tags=["Admin - Partner"], route_class=FastJSONRoute)
 
 # ✅ PERBAIKI PATH UNTUK STATIC FILES
 # Gunakan path relatif ke root project
@@ -18,10 +21,7 @@ PARTNER_IMAGE_DIR = os.path.join("static", "uploads", "partner")
 FULL_PARTNER_DIR = os.path.join(BASE_DIR, "static", "uploads", "partner")
 
 # Pastikan direktori ada
-os.makedirs(FULL_PARTNER_DIR, exist_ok=True)
-logger.info(f"Partner image directory: {FULL_PARTNER_DIR}")
-logger.info(f"Directory exists: {os.path.exists(FULL_PARTNER_DIR)}")
-logger.info(f"Directory writable: {os.access(FULL_PARTNER_DIR, os.W_OK)}")
+register_upload_dirs(FULL_PARTNER_DIR)
 
 # ✅ FUNGSI: Buat tabel partner jika belum ada
 def create_partner_table():
@@ -99,9 +99,7 @@ def get_partner_content(token: dict = Depends(verify_token)):
             "partners": result.get('partners', {}).get('items', [])
         }
         
-        # Debug log
-        logger.info(f"Found {len(rows)} rows in partner table")
-        logger.info(f"Found {len(formatted_result['partners'])} partners")
+        logger.debug("Found %s rows, %s partners", len(rows), len(formatted_result['partners']))
         
         return formatted_result
         
@@ -227,18 +225,14 @@ def reset_partner_content(
         connection.close()
 
 @router.get("/partner/public")
-def get_public_partner():
+async def get_public_partner():
     """Get konten Partner untuk public (tanpa auth)"""
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        # Buat tabel jika belum ada
-        create_partner_table()
+        # Buat tabel jika belum ada (sekali per proses)
+        await ensure_schema(create_partner_table)
         
         # Ambil semua data dari database
-        cursor.execute("SELECT * FROM partner ORDER BY section, section_key")
-        rows = cursor.fetchall()
+        rows = await async_db.fetch_all("SELECT * FROM partner ORDER BY section, section_key")
         
         # Format data untuk frontend
         result = {}
@@ -289,9 +283,6 @@ def get_public_partner():
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error mengambil data Partner: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
 
 # ============================================
 # ENDPOINT UNTUK UPLOAD GAMBAR PARTNER - DIPERBAIKI
@@ -344,9 +335,6 @@ async def upload_partner_image(
         image_url = f"/static/uploads/partner/{filename}"
         
         logger.info(f"✅ Partner image uploaded: {filename} ({file_size} bytes)")
-        logger.info(f"   Path: {file_path}")
-        logger.info(f"   URL: {image_url}")
-        logger.info(f"   File exists: {os.path.exists(file_path)}")
         
         return {
             "message": "Gambar berhasil diupload",
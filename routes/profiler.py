@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+import logging
+from dependencies.auth import verify_token
+from models.base_models import ProfilerArmRequest
+from utils.profiler import profiler
+from utils.json_response import FastJSONRoute
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin/profiler", tags=["Profiler"], route_class=FastJSONRoute)
+
+
+@router.post("/arm")
+def arm_profiler(data: ProfilerArmRequest, token: dict = Depends(verify_token)):
+    """
+    Aktifkan sampling profiler (admin only) untuk N request berikutnya yang cocok
+    dengan `pattern`, atau untuk jangka waktu `duration_seconds`.
+    """
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    if data.requests is None and data.duration_seconds is None:
+        raise HTTPException(status_code=400, detail="Isi requests dan/atau duration_seconds")
+
+    try:
+        session = profiler.arm(data.pattern, data.requests, data.duration_seconds, data.interval_ms)
+        return {"message": "Profiler aktif", "session": session}
+    except Exception as e:
+        logger.error(f"Error arming profiler: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error mengaktifkan profiler: {str(e)}")
+
+
+@router.get("")
+def get_profiler_results(top: int = 30, include_collapsed: bool = False, token: dict = Depends(verify_token)):
+    """Status sesi profiler dan fungsi dengan self time terbesar (admin only)"""
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    try:
+        result = profiler.results(top=top)
+        if not include_collapsed:
+            result.pop("collapsed", None)
+        return result
+    except Exception as e:
+        logger.error(f"Error reading profiler results: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error membaca hasil profiler: {str(e)}")
+
+
+@router.get("/collapsed", response_class=PlainTextResponse)
+def get_profiler_collapsed(token: dict = Depends(verify_token)):
+    """Collapsed stacks (format flamegraph.pl / speedscope) dari sesi terakhir (admin only)"""
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    result = profiler.results()
+    if result["session"] is None:
+        raise HTTPException(status_code=404, detail="Belum ada sesi profiler")
+    return PlainTextResponse(result["collapsed"] + "\n")
+
+
+@router.post("/stop")
+def stop_profiler(token: dict = Depends(verify_token)):
+    """Hentikan sesi profiler yang sedang berjalan (admin only)"""
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Belum ada sesi profiler")
+    return {"message": "Profiler dihentikan", "session": session}
@@ -1,22 +1,24 @@
 # app/routes/admin/slider.py
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 import logging
 import os
 import shutil
 import json
-from PIL import Image
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin - Slider"])
+router = APIRouter(tags=["Admin - Slider"], route_class=FastJSONRoute)
 
 # Path untuk menyimpan file upload
 SLIDER_UPLOAD_DIR = "uploads/slider"
 TENTANG_KAMI_UPLOAD_DIR = "uploads/tentang_kami"
-os.makedirs(SLIDER_UPLOAD_DIR, exist_ok=True)
-os.makedirs(TENTANG_KAMI_UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(SLIDER_UPLOAD_DIR, TENTANG_KAMI_UPLOAD_DIR)
 
 # Konfigurasi gambar
 SLIDER_TARGET_WIDTH = 1200
@@ -26,6 +28,7 @@ SLIDER_ASPECT_RATIO = SLIDER_TARGET_WIDTH / SLIDER_TARGET_HEIGHT
 # ✅ FUNGSI BARU: Deteksi orientasi gambar
 def detect_image_orientation(image_path: str) -> str:
     """Deteksi orientasi gambar (portrait/landscape/square)"""
+    from PIL import Image
     try:
         with Image.open(image_path) as img:
             width, height = img.size
@@ -42,6 +45,7 @@ def detect_image_orientation(image_path: str) -> str:
 # ✅ FUNGSI BARU: Get dimensi gambar
 def get_image_dimensions(image_path: str):
     """Get dimensi gambar (width, height)"""
+    from PIL import Image
     try:
         with Image.open(image_path) as img:
             return img.size  # (width, height)
@@ -56,6 +60,7 @@ def auto_crop_to_slider_ratio(image_path: str, output_path: str = None):
     Untuk portrait: crop bagian tengah secara vertikal
     Untuk landscape: crop bagian tengah secara horizontal
     """
+    from PIL import Image
     try:
         if output_path is None:
             output_path = image_path
@@ -125,6 +130,7 @@ def process_slider_image(file_path: str, crop_mode: str = "smart") -> dict:
     Proses gambar slider dengan berbagai mode crop
     Modes: 'smart', 'crop', 'fit', 'fill'
     """
+    from PIL import Image
     try:
         original_dimensions = get_image_dimensions(file_path)
         orientation = detect_image_orientation(file_path)
@@ -730,24 +736,19 @@ def delete_slider_image(
         connection.close()
 
 @router.get("/slider/public")
-def get_public_slider():
+async def get_public_slider():
     """Get gambar slider untuk public (tanpa auth)"""
-    # Update struktur tabel jika diperlukan
-    update_slider_table_structure()
-    
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        cursor.execute("""
+        # Update struktur tabel jika diperlukan (sekali per proses)
+        await ensure_schema(update_slider_table_structure)
+        
+        sliders = await async_db.fetch_all("""
             SELECT * FROM event_slider 
             WHERE is_active = TRUE 
             ORDER BY order_position ASC, created_at DESC
             LIMIT 5
         """)
         
-        sliders = cursor.fetchall()
-        
         # Tambahkan URL lengkap dan info untuk setiap gambar
         for slider in sliders:
             slider['url'] = f"http://localhost:8000/uploads/slider/{slider['filename']}"
@@ -757,7 +758,7 @@ def get_public_slider():
                 file_path = os.path.join(SLIDER_UPLOAD_DIR, slider['filename'])
                 if os.path.exists(file_path):
                     try:
-                        orientation = detect_image_orientation(file_path)
+                        orientation = await run_in_threadpool(detect_image_orientation, file_path)
                         slider['orientation'] = orientation
                     except:
                         slider['orientation'] = 'unknown'
@@ -780,9 +781,6 @@ def get_public_slider():
     except Exception as e:
         logger.error(f"Error getting public slider: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error mengambil slider: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
 
 @router.get("/admin/slider/stats")
 def get_slider_stats(token: dict = Depends(verify_token)):
@@ -5,9 +5,10 @@ from dependencies.auth import verify_token
 from config.database import db
 import json
 import logging
+from utils.json_response import FastJSONRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/slider-events", tags=["Slider Events"])
+router = APIRouter(prefix="/slider-events", tags=["Slider Events"], route_class=FastJSONRoute)
 
 # Buat Pydantic model untuk request body
 from pydantic import BaseModel
@@ -1,13 +1,76 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema, ensure_schema_sync
 from utils.validators import validate_kondisi_barang, normalize_kondisi, validate_status_unit
 import logging
 from models.enums import KondisiBarang, StatusUnit
+from utils.json_response import FastJSONRoute
+from utils.file_utils import generate_stok_units, slugify
+from models.base_models import BulkStokRequest
+from utils.item_availability import (
+    COUNTER_COLUMNS, create_item_availability_table, backfill_item_availability, refresh_item_availability,
+    lock_unit_statuses, apply_status_changes, get_item_availability
+)
+from utils.unit_allocator import UnitAllocationError, allocate_units
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Stok"])
+router = APIRouter(tags=["Stok"], route_class=FastJSONRoute)
+
+@router.get("/barang/catalog")
+async def get_barang_catalog(kategori_id: Optional[int] = None):
+    """Semua barang beserta jumlah unit per status (dari ringkasan item_availability)"""
+    counters = ", ".join(f"COALESCE(a.{column}, 0) AS {column}" for column in COUNTER_COLUMNS)
+    query = f"""
+        SELECT i.id, i.nama_barang, i.foto, i.kategori_id, c.nama AS kategori, {counters},
+            a.barang_id IS NULL AS tanpa_ringkasan
+        FROM items i
+        LEFT JOIN categories c ON c.id = i.kategori_id
+        LEFT JOIN item_availability a ON a.barang_id = i.id
+    """
+    params = ()
+    if kategori_id is not None:
+        query += " WHERE i.kategori_id = %s"
+        params = (kategori_id,)
+    query += " ORDER BY i.nama_barang ASC"
+
+    try:
+        await ensure_schema(create_item_availability_table)
+        rows = await async_db.fetch_all(query, params)
+        if any(row["tanpa_ringkasan"] for row in rows):
+            # Barang baru setelah backfill startup: isi ringkasannya sekali lalu baca ulang
+            await run_in_threadpool(backfill_item_availability)
+            rows = await async_db.fetch_all(query, params)
+        for row in rows:
+            row.pop("tanpa_ringkasan", None)
+        return rows
+    except Exception as e:
+        logger.error(f"Error getting barang catalog: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error mengambil katalog barang: {str(e)}")
+
+@router.post("/admin/barang/availability/rebuild")
+def rebuild_barang_availability(token: dict = Depends(verify_token)):
+    """Hitung ulang ringkasan ketersediaan dari item_units (jika item_units diubah di luar API)"""
+    if token["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Akses ditolak")
+
+    ensure_schema_sync(create_item_availability_table)
+    connection = db.get_connection()
+    cursor = connection.cursor()
+
+    try:
+        affected = refresh_item_availability(cursor)
+        connection.commit()
+        return {"message": "Ringkasan ketersediaan barang diperbarui", "affected_rows": affected}
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error rebuilding item availability: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error memperbarui ringkasan: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
 
 @router.get("/barang/{barang_id}/stok")
 def get_barang_stok(barang_id: int):
@@ -30,16 +93,18 @@ def update_unit_stok(
     status: Optional[str] = Form(None),
     token: str = Depends(verify_token)
 ):
+    ensure_schema_sync(create_item_availability_table)
     connection = db.get_connection()
     cursor = connection.cursor(dictionary=True)
     
     try:
-        # Cek apakah unit exists
+        # Cek apakah unit exists (dikunci agar status lama akurat untuk ringkasan).
+        # Tanpa join ke items: FOR UPDATE atas join ikut mengunci baris items setelah
+        # item_units, terbalik dari urutan lock bulk_update_stok (lihat utils.item_availability)
         cursor.execute("""
-            SELECT iu.*, i.nama_barang 
-            FROM item_units iu 
-            JOIN items i ON iu.barang_id = i.id 
-            WHERE iu.barang_id = %s AND iu.kode = %s
+            SELECT * FROM item_units
+            WHERE barang_id = %s AND kode = %s
+            FOR UPDATE
         """, (barang_id, unit_kode))
         
         unit = cursor.fetchone()
@@ -86,6 +151,9 @@ def update_unit_stok(
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Unit stok tidak ditemukan")
         
+        if status is not None and status != unit['status']:
+            apply_status_changes(cursor, barang_id, removed=[unit['status']], added=[status])
+        
         # Get updated unit data
         cursor.execute("SELECT * FROM item_units WHERE kode = %s AND barang_id = %s", (unit_kode, barang_id))
         updated_unit = cursor.fetchone()
@@ -109,6 +177,42 @@ def update_unit_stok(
             cursor.close()
             connection.close()
 
+@router.post("/barang/{barang_id}/stok/reserve")
+def reserve_unit_stok(
+    barang_id: int,
+    jumlah: int = Form(1),
+    status: str = Form(StatusUnit.MENUNGGU.value),
+    token: str = Depends(verify_token)
+):
+    """Reservasi sejumlah unit Tersedia secara atomik (aman untuk persetujuan bersamaan)"""
+    if jumlah < 1:
+        raise HTTPException(status_code=400, detail="Jumlah minimal 1")
+    if not validate_status_unit(status) or status == StatusUnit.TERSEDIA.value:
+        status_valid = [s.value for s in StatusUnit if s != StatusUnit.TERSEDIA]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Status tidak valid. Pilihan: {', '.join(status_valid)}"
+        )
+
+    ensure_schema_sync(create_item_availability_table)
+    connection = db.get_connection()
+
+    try:
+        unit_kodes = allocate_units(connection, barang_id, jumlah, to_status=status)
+        return {
+            "message": f"{len(unit_kodes)} unit berhasil direservasi",
+            "barang_id": barang_id,
+            "status": status,
+            "unit_kodes": unit_kodes
+        }
+    except UnitAllocationError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reserving unit stok: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error reservasi unit stok: {str(e)}")
+    finally:
+        connection.close()
+
 @router.put("/debug/barang/{barang_id}/stok/{unit_kode}")
 def debug_update_unit_stok(
     barang_id: int,
@@ -160,15 +264,18 @@ def get_unit_stok(barang_id: int, unit_kode: str):
 
 @router.delete("/barang/{barang_id}/stok/{unit_kode}")
 def delete_unit_stok(barang_id: int, unit_kode: str, token: str = Depends(verify_token)):
+    ensure_schema_sync(create_item_availability_table)
     connection = db.get_connection()
     cursor = connection.cursor()
     
     try:
+        statuses = lock_unit_statuses(cursor, barang_id, [unit_kode])
         cursor.execute("DELETE FROM item_units WHERE kode = %s AND barang_id = %s", (unit_kode, barang_id))
         
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Unit stok tidak ditemukan")
         
+        apply_status_changes(cursor, barang_id, removed=statuses.values())
         connection.commit()
         return {"message": "Unit stok berhasil dihapus"}
         
@@ -188,13 +295,13 @@ def bulk_delete_stok(barang_id: int, unit_kodes: List[str], token: str = Depends
     if not unit_kodes:
         raise HTTPException(status_code=400, detail="Daftar unit_kodes tidak boleh kosong")
 
+    ensure_schema_sync(create_item_availability_table)
     connection = db.get_connection()
     cursor = connection.cursor()
     
     try:
-        # Hitung jumlah unit sebelum delete
-        cursor.execute("SELECT COUNT(*) FROM item_units WHERE barang_id = %s", (barang_id,))
-        before_count = cursor.fetchone()[0]
+        # Status unit yang akan dihapus (dikunci) untuk ringkasan ketersediaan
+        statuses = lock_unit_statuses(cursor, barang_id, unit_kodes)
 
         # Delete multiple units
         placeholders = ', '.join(['%s'] * len(unit_kodes))
@@ -206,16 +313,17 @@ def bulk_delete_stok(barang_id: int, unit_kodes: List[str], token: str = Depends
         if deleted_count == 0:
             raise HTTPException(status_code=404, detail="Tidak ada unit stok yang dihapus")
 
-        # Hitung jumlah unit setelah delete
-        cursor.execute("SELECT COUNT(*) FROM item_units WHERE barang_id = %s", (barang_id,))
-        after_count = cursor.fetchone()[0]
+        apply_status_changes(cursor, barang_id, removed=statuses.values())
+
+        # Sisa stok dibaca dari ringkasan (tanpa COUNT(*) atas item_units)
+        availability = get_item_availability(cursor, barang_id)
 
         connection.commit()
 
         return {
             "message": f"{deleted_count} unit stok berhasil dihapus",
             "barang_id": barang_id,
-            "sisa_stok": after_count
+            "sisa_stok": availability["total"] if availability else 0
         }
         
     except HTTPException:
@@ -226,4 +334,114 @@ def bulk_delete_stok(barang_id: int, unit_kodes: List[str], token: str = Depends
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
     finally:
         cursor.close()
-        connection.close()
\ No newline at end of file
+        connection.close()
+
+@router.post("/barang/{barang_id}/stok/bulk")
+def bulk_update_stok(barang_id: int, payload: BulkStokRequest, token: str = Depends(verify_token)):
+    """
+    Tambah unit baru dan/atau ubah kondisi/status banyak unit dalam satu
+    transaksi; mengembalikan ringkasan ketersediaan barang setelahnya.
+    """
+    if not payload.tambah and not payload.unit_kodes:
+        raise HTTPException(status_code=400, detail="Isi tambah dan/atau unit_kodes")
+    if payload.unit_kodes and payload.kondisi is None and payload.status is None:
+        raise HTTPException(status_code=400, detail="Tidak ada field yang diupdate")
+
+    kondisi_values = [payload.kondisi_baru] + ([payload.kondisi] if payload.kondisi is not None else [])
+    kondisi_normalized = [normalize_kondisi(kondisi) for kondisi in kondisi_values]
+    if not all(validate_kondisi_barang(kondisi) for kondisi in kondisi_normalized):
+        kondisi_valid = [k.value for k in KondisiBarang]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Kondisi tidak valid. Pilihan: {', '.join(kondisi_valid)}"
+        )
+    if payload.status is not None and not validate_status_unit(payload.status):
+        status_valid = [s.value for s in StatusUnit]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Status tidak valid. Pilihan: {', '.join(status_valid)}"
+        )
+
+    ensure_schema_sync(create_item_availability_table)
+    connection = db.get_connection()
+    cursor = connection.cursor(dictionary=True)
+
+    try:
+        # Lock baris barang: penambahan unit bersamaan untuk barang yang sama berjalan bergantian
+        cursor.execute("SELECT id, nama_barang FROM items WHERE id = %s FOR UPDATE", (barang_id,))
+        barang = cursor.fetchone()
+        if not barang:
+            raise HTTPException(status_code=404, detail="Barang tidak ditemukan")
+
+        created = []
+        if payload.tambah:
+            prefix = slugify(barang["nama_barang"])
+            # Nomor berikutnya = suffix terbesar yang sudah ada + 1 (bukan COUNT, agar tidak bentrok setelah delete)
+            cursor.execute("""
+                SELECT COALESCE(MAX(CAST(SUBSTRING(kode, %s) AS UNSIGNED)), 0) AS last_number
+                FROM item_units
+                WHERE barang_id = %s AND kode LIKE %s
+            """, (len(prefix) + 2, barang_id, f"{prefix}-%"))
+            start = int(cursor.fetchone()["last_number"]) + 1
+
+            units = generate_stok_units(start, payload.tambah, barang["nama_barang"], kondisi_normalized[0])
+            cursor.executemany("""
+                INSERT INTO item_units (barang_id, kode, kondisi, status)
+                VALUES (%s, %s, %s, %s)
+            """, [(barang_id, unit["kode"], unit["kondisi"], unit["status"]) for unit in units])
+            apply_status_changes(cursor, barang_id, added=[unit["status"] for unit in units])
+            created = [unit["kode"] for unit in units]
+
+        updated = 0
+        not_found = []
+        if payload.unit_kodes:
+            unit_kodes = list(dict.fromkeys(payload.unit_kodes))
+            statuses = lock_unit_statuses(cursor, barang_id, unit_kodes)
+            not_found = [kode for kode in unit_kodes if kode not in statuses]
+
+            if statuses:
+                update_fields = []
+                params = []
+                if payload.kondisi is not None:
+                    update_fields.append("kondisi = %s")
+                    params.append(kondisi_normalized[1])
+                if payload.status is not None:
+                    update_fields.append("status = %s")
+                    params.append(payload.status)
+
+                found = list(statuses)
+                placeholders = ", ".join(["%s"] * len(found))
+                cursor.execute(
+                    f"UPDATE item_units SET {', '.join(update_fields)} WHERE barang_id = %s AND kode IN ({placeholders})",
+                    params + [barang_id] + found
+                )
+                updated = len(found)
+
+                if payload.status is not None:
+                    apply_status_changes(
+                        cursor, barang_id,
+                        removed=statuses.values(), added=[payload.status] * len(statuses)
+                    )
+
+        availability = get_item_availability(cursor, barang_id)
+        connection.commit()
+
+        return {
+            "message": f"{len(created)} unit ditambahkan, {updated} unit diperbarui",
+            "barang_id": barang_id,
+            "created": created,
+            "updated": updated,
+            "not_found": not_found,
+            "availability": availability
+        }
+
+    except HTTPException:
+        connection.rollback()
+        raise
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error bulk updating unit stok: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error memperbarui unit stok: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
@@ -5,9 +5,11 @@ import json
 from typing import Optional
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema
+from utils.json_response import FastJSONRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin - Tentang Kami"])
+router = APIRouter(tags=["Admin - Tentang Kami"], route_class=FastJSONRoute)
 
 # ✅ FUNGSI: Buat tabel tentang_kami jika belum ada
 def create_tentang_kami_table():
@@ -218,23 +220,20 @@ def reset_tentang_kami_content(
         connection.close()
 
 @router.get("/tentang-kami/public")
-def get_public_tentang_kami():
+async def get_public_tentang_kami():
     """Get konten Tentang Kami untuk public (tanpa auth)"""
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        # Buat tabel jika belum ada
-        create_tentang_kami_table()
+        # Buat tabel jika belum ada (sekali per proses)
+        await ensure_schema(create_tentang_kami_table)
         
         # Ambil semua data dari database
-        cursor.execute("SELECT * FROM tentang_kami ORDER BY section, section_key")
-        rows = cursor.fetchall()
+        rows = await async_db.fetch_all("SELECT * FROM tentang_kami ORDER BY section, section_key")
         
-        # DEBUG: Log data yang diambil
-        logger.info(f"DEBUG: Found {len(rows)} rows in tentang_kami table")
-        for row in rows:
-            logger.info(f"DEBUG: Section: {row['section']}, Key: {row['section_key']}, Type: {row['content_type']}")
+        # DEBUG: Log data yang diambil (loop hanya jalan jika level DEBUG aktif)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found %s rows in tentang_kami table", len(rows))
+            for row in rows:
+                logger.debug("Section: %s, Key: %s, Type: %s", row['section'], row['section_key'], row['content_type'])
         
         # Format data untuk frontend
         result = {}
@@ -252,7 +251,7 @@ def get_public_tentang_kami():
                 try:
                     parsed_value = json.loads(content_value) if content_value else []
                     result[section][key] = parsed_value
-                    logger.info(f"DEBUG: Parsed {section}.{key} as {type(parsed_value)}")
+                    logger.debug("Parsed %s.%s as %s", section, key, type(parsed_value).__name__)
                 except json.JSONDecodeError as e:
                     logger.error(f"JSON decode error for {section}.{key}: {e}")
                     result[section][key] = content_value
@@ -269,16 +268,10 @@ def get_public_tentang_kami():
             "kontak_info": result.get('kontak', {}).get('info', {})
         }
         
-        # DEBUG: Log hasil akhir
-        logger.info(f"DEBUG: Returning formatted result")
-        
         return formatted_result
         
     except Exception as e:
         logger.error(f"Error getting public Tentang Kami: {str(e)}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Error mengambil data Tentang Kami: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error mengambil data Tentang Kami: {str(e)}")
\ No newline at end of file
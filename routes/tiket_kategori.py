@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Form
 from typing import Optional, List
-from decimal import Decimal
 import logging
 from config.database import db
 from dependencies.auth import verify_token
+from utils.json_response import FastJSONRoute
+from utils.data_version import TIKET, bump_data_version
+from utils.kelas_card import lock_kelas, refresh_kelas_cards
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/kelas/tiket-kategori", tags=["Tiket Kategori"])
+router = APIRouter(prefix="/kelas/tiket-kategori", tags=["Tiket Kategori"], route_class=FastJSONRoute)
 
 @router.post("/")
 def create_tiket_kategori(
@@ -26,6 +28,9 @@ def create_tiket_kategori(
         cursor.execute("SHOW COLUMNS FROM tiket_kategori LIKE 'is_active'")
         has_is_active = cursor.fetchone()
         
+        # Writer tiket untuk kelas yang sama berjalan bergantian (lihat utils.kelas_card)
+        lock_kelas(cursor, [kelas_id])
+        
         if has_is_active:
             # Kolom is_active ada
             cursor.execute("""
@@ -41,8 +46,10 @@ def create_tiket_kategori(
                 VALUES (%s, %s, %s, %s, %s, %s)
             """, (kelas_id, nama_kategori, deskripsi, harga, manfaat, is_populer))
         
-        connection.commit()
         tiket_id = cursor.lastrowid
+        refresh_kelas_cards(cursor, [kelas_id])
+        bump_data_version(cursor, TIKET)
+        connection.commit()
         
         # Get the created tiket with is_active handling
         cursor.execute("""
@@ -55,10 +62,6 @@ def create_tiket_kategori(
         """, (tiket_id,))
         tiket = cursor.fetchone()
         
-        # Convert Decimal to float
-        if tiket and isinstance(tiket.get('harga'), Decimal):
-            tiket['harga'] = float(tiket['harga'])
-        
         # Ensure is_active field exists
         if 'is_active' not in tiket:
             tiket['is_active'] = True
@@ -96,10 +99,6 @@ def get_tiket_kategori(tiket_id: int):
         if not tiket:
             raise HTTPException(status_code=404, detail="Tiket kategori tidak ditemukan")
         
-        # Convert Decimal to float
-        if isinstance(tiket.get('harga'), Decimal):
-            tiket['harga'] = float(tiket['harga'])
-        
         # Ensure is_active field exists
         if 'is_active' not in tiket:
             tiket['is_active'] = True
@@ -136,6 +135,8 @@ def update_tiket_kategori(
         if not existing_tiket:
             raise HTTPException(status_code=404, detail="Tiket kategori tidak ditemukan")
         
+        lock_kelas(cursor, [existing_tiket['kelas_id']])
+        
         # Update tiket
         cursor.execute("""
             UPDATE tiket_kategori 
@@ -144,6 +145,8 @@ def update_tiket_kategori(
             WHERE id = %s
         """, (nama_kategori, deskripsi, harga, manfaat, is_populer, tiket_id))
         
+        refresh_kelas_cards(cursor, [existing_tiket['kelas_id']])
+        bump_data_version(cursor, TIKET)
         connection.commit()
         
         # Get updated tiket dengan is_active
@@ -157,10 +160,6 @@ def update_tiket_kategori(
         """, (tiket_id,))
         updated_tiket = cursor.fetchone()
         
-        # Convert Decimal to float
-        if updated_tiket and isinstance(updated_tiket.get('harga'), Decimal):
-            updated_tiket['harga'] = float(updated_tiket['harga'])
-        
         # Ensure is_active field exists
         if 'is_active' not in updated_tiket:
             updated_tiket['is_active'] = True
@@ -188,15 +187,19 @@ def delete_tiket_kategori(tiket_id: int, token: str = Depends(verify_token)):
     
     try:
         # Check if tiket exists
-        cursor.execute("SELECT * FROM tiket_kategori WHERE id = %s", (tiket_id,))
+        cursor.execute("SELECT kelas_id FROM tiket_kategori WHERE id = %s", (tiket_id,))
         tiket = cursor.fetchone()
         
         if not tiket:
             raise HTTPException(status_code=404, detail="Tiket kategori tidak ditemukan")
         
+        lock_kelas(cursor, [tiket[0]])
+        
         # Delete tiket
         cursor.execute("DELETE FROM tiket_kategori WHERE id = %s", (tiket_id,))
         
+        refresh_kelas_cards(cursor, [tiket[0]])
+        bump_data_version(cursor, TIKET)
         connection.commit()
         
         return {"message": "Tiket kategori berhasil dihapus"}
@@ -253,8 +256,16 @@ def toggle_tiket_kategori_active(
         if not tiket:
             raise HTTPException(status_code=404, detail="Tiket kategori tidak ditemukan")
         
+        lock_kelas(cursor, [tiket['kelas_id']])
+        
+        # Status dibaca ulang setelah lock: toggle bersamaan tidak membalik nilai lama yang sama
+        cursor.execute("SELECT is_active FROM tiket_kategori WHERE id = %s FOR UPDATE", (tiket_id,))
+        locked = cursor.fetchone()
+        if not locked:
+            raise HTTPException(status_code=404, detail="Tiket kategori tidak ditemukan")
+        
         # Toggle is_active status
-        current_status = tiket.get('is_active', True)
+        current_status = locked['is_active'] if locked['is_active'] is not None else True
         new_status = not current_status
         
         cursor.execute("""
@@ -263,6 +274,8 @@ def toggle_tiket_kategori_active(
             WHERE id = %s
         """, (new_status, tiket_id))
         
+        refresh_kelas_cards(cursor, [tiket['kelas_id']])
+        bump_data_version(cursor, TIKET)
         connection.commit()
         
         # Get updated tiket
@@ -276,10 +289,6 @@ def toggle_tiket_kategori_active(
         """, (tiket_id,))
         updated_tiket = cursor.fetchone()
         
-        # Convert Decimal to float
-        if updated_tiket and isinstance(updated_tiket.get('harga'), Decimal):
-            updated_tiket['harga'] = float(updated_tiket['harga'])
-        
         # Ensure is_active field exists
         if 'is_active' not in updated_tiket:
             updated_tiket['is_active'] = True
@@ -323,9 +332,6 @@ def get_tiket_kategori_by_kelas(kelas_id: int):
         tiket_kategori = cursor.fetchall()
         
         for tiket in tiket_kategori:
-            if isinstance(tiket.get('harga'), Decimal):
-                tiket['harga'] = float(tiket['harga'])
-            
             if 'is_populer' not in tiket:
                 tiket['is_populer'] = False
             
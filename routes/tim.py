@@ -5,18 +5,20 @@ import logging
 import os
 import shutil
 import json
-from PIL import Image
 from typing import Optional
 from dependencies.auth import verify_token
 from config.database import db
+from config.async_database import async_db, ensure_schema, ensure_schema_sync
+from utils.json_response import FastJSONRoute
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["Admin - Tim"])
+router = APIRouter(tags=["Admin - Tim"], route_class=FastJSONRoute)
 API_BASE_URL = os.getenv("API_BASE_URL", "https://api.gastronomi.id").rstrip("/")
 
 # Path untuk menyimpan file upload
 TIM_UPLOAD_DIR = "uploads/tim"
-os.makedirs(TIM_UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(TIM_UPLOAD_DIR)
 
 # Konfigurasi gambar tim
 TIM_TARGET_WIDTH = 400
@@ -28,6 +30,7 @@ TIM_TARGET_HEIGHT = 400
 
 def process_tim_image(file_path: str) -> dict:
     """Proses gambar tim menjadi persegi 400x400"""
+    from PIL import Image
     try:
         with Image.open(file_path) as img:
             # Get original dimensions
@@ -129,6 +132,86 @@ def create_tim_tables():
         cursor.close()
         connection.close()
 
+# ============================================
+# ✅ FUNGSI: Keahlian anggota tim (query konstan, tanpa N+1)
+# ============================================
+
+def keahlian_query(tim_ids: list) -> tuple:
+    """Satu query IN untuk keahlian semua anggota, urut per anggota"""
+    placeholders = ", ".join(["%s"] * len(tim_ids))
+    query = f"""
+        SELECT tim_id, keahlian FROM tentang_kami_tim_keahlian
+        WHERE tim_id IN ({placeholders})
+        ORDER BY tim_id, urutan ASC, id ASC
+    """
+    return query, tuple(tim_ids)
+
+
+def attach_keahlian(members: list, keahlian_rows: list):
+    """Kelompokkan hasil keahlian_query ke member['keahlian'] (list kosong jika tidak ada)"""
+    grouped = {}
+    for row in keahlian_rows:
+        grouped.setdefault(row['tim_id'], []).append(row['keahlian'])
+    for member in members:
+        member['keahlian'] = grouped.get(member['id'], [])
+
+
+def load_keahlian(cursor, members: list):
+    if not members:
+        return
+    cursor.execute(*keahlian_query([member['id'] for member in members]))
+    attach_keahlian(members, cursor.fetchall())
+
+
+def parse_keahlian(keahlian: str, tim_id) -> Optional[list]:
+    """Parse JSON array keahlian dari form; None jika tidak valid"""
+    try:
+        keahlian_list = json.loads(keahlian)
+    except json.JSONDecodeError:
+        keahlian_list = None
+    if not isinstance(keahlian_list, list):
+        logger.warning(f"Invalid keahlian JSON for tim_id {tim_id}")
+        return None
+    return keahlian_list
+
+
+def sync_keahlian(cursor, tim_id: int, keahlian_list: list):
+    """
+    Samakan keahlian di DB dengan keahlian_list: baris yang tetap ada hanya
+    di-update urutannya jika berubah, sisanya insert/delete massal.
+    Maksimal 1 SELECT + 3 statement berapa pun jumlah keahliannya.
+    """
+    cursor.execute("""
+        SELECT id, keahlian, urutan FROM tentang_kami_tim_keahlian
+        WHERE tim_id = %s ORDER BY urutan ASC, id ASC
+    """, (tim_id,))
+    existing = {}
+    for row in cursor.fetchall():
+        existing.setdefault(row['keahlian'], []).append(row)
+
+    to_insert = []
+    to_reorder = []
+    for idx, skill in enumerate(keahlian_list):
+        rows = existing.get(skill)
+        if rows:
+            row = rows.pop(0)
+            if row['urutan'] != idx:
+                to_reorder.append((idx, row['id']))
+        else:
+            to_insert.append((tim_id, skill, idx))
+    to_delete = [row['id'] for rows in existing.values() for row in rows]
+
+    if to_delete:
+        placeholders = ", ".join(["%s"] * len(to_delete))
+        cursor.execute(f"DELETE FROM tentang_kami_tim_keahlian WHERE id IN ({placeholders})", tuple(to_delete))
+    if to_reorder:
+        cursor.executemany("UPDATE tentang_kami_tim_keahlian SET urutan = %s WHERE id = %s", to_reorder)
+    if to_insert:
+        cursor.executemany("""
+            INSERT INTO tentang_kami_tim_keahlian (tim_id, keahlian, urutan)
+            VALUES (%s, %s, %s)
+        """, to_insert)
+
 # ============================================
 # ✅ ENDPOINT UNTUK MANAJEMEN TIM (DATABASE)
 # ============================================
@@ -139,7 +222,7 @@ def get_all_tim_members(token: dict = Depends(verify_token)):
     if token["role"] != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak")
     
-    create_tim_tables()  # Pastikan tabel ada
+    ensure_schema_sync(create_tim_tables)  # Pastikan tabel ada (sekali per proses)
     
     connection = db.get_connection()
     cursor = connection.cursor(dictionary=True)
@@ -153,17 +236,10 @@ def get_all_tim_members(token: dict = Depends(verify_token)):
         
         members = cursor.fetchall()
         
-        # Untuk setiap anggota, ambil keahliannya
+        # Keahlian semua anggota dalam satu query
+        load_keahlian(cursor, members)
+        
         for member in members:
-            cursor.execute("""
-                SELECT keahlian FROM tentang_kami_tim_keahlian 
-                WHERE tim_id = %s 
-                ORDER BY urutan ASC
-            """, (member['id'],))
-            
-            keahlian_rows = cursor.fetchall()
-            member['keahlian'] = [row['keahlian'] for row in keahlian_rows]
-            
             # Tambahkan URL foto jika ada
             if member['foto']:
                 member['foto_url'] = f"{API_BASE_URL}/uploads/tim/{member['foto']}"
@@ -180,34 +256,27 @@ def get_all_tim_members(token: dict = Depends(verify_token)):
         connection.close()
 
 @router.get("/tim/public")
-def get_public_tim_members():
+async def get_public_tim_members():
     """Get anggota tim untuk public (tanpa auth)"""
-    create_tim_tables()
-    
-    connection = db.get_connection()
-    cursor = connection.cursor(dictionary=True)
-    
     try:
-        # Ambil hanya anggota yang aktif
-        cursor.execute("""
-            SELECT * FROM tentang_kami_tim 
-            WHERE is_active = TRUE 
-            ORDER BY urutan ASC, created_at DESC
-        """)
-        
-        members = cursor.fetchall()
-        
-        # Untuk setiap anggota, ambil keahliannya
-        for member in members:
-            cursor.execute("""
-                SELECT keahlian FROM tentang_kami_tim_keahlian 
-                WHERE tim_id = %s 
-                ORDER BY urutan ASC
-            """, (member['id'],))
+        await ensure_schema(create_tim_tables)
+        
+        async with async_db.cursor() as cursor:
+            # Ambil hanya anggota yang aktif
+            await cursor.execute("""
+                SELECT * FROM tentang_kami_tim 
+                WHERE is_active = TRUE 
+                ORDER BY urutan ASC, created_at DESC
+            """)
             
-            keahlian_rows = cursor.fetchall()
-            member['keahlian'] = [row['keahlian'] for row in keahlian_rows]
+            members = await cursor.fetchall()
             
+            # Keahlian semua anggota dalam satu query
+            if members:
+                await cursor.execute(*keahlian_query([member['id'] for member in members]))
+                attach_keahlian(members, await cursor.fetchall())
+        
+        for member in members:
             # Tambahkan URL foto jika ada
             if member['foto']:
                 member['foto_url'] = f"{API_BASE_URL}/uploads/tim/{member['foto']}"
@@ -219,9 +288,6 @@ def get_public_tim_members():
     except Exception as e:
         logger.error(f"Error getting public tim members: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error mengambil data tim: {str(e)}")
-    finally:
-        cursor.close()
-        connection.close()
 
 @router.post("/admin/tim")
 async def create_tim_member(
@@ -237,7 +303,7 @@ async def create_tim_member(
     if token["role"] != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak")
     
-    create_tim_tables()
+    await ensure_schema(create_tim_tables)
     
     connection = db.get_connection()
     cursor = connection.cursor(dictionary=True)
@@ -252,16 +318,13 @@ async def create_tim_member(
         
         tim_id = cursor.lastrowid
         
-        # Parse dan insert keahlian
-        try:
-            keahlian_list = json.loads(keahlian)
-            for idx, skill in enumerate(keahlian_list):
-                cursor.execute("""
-                    INSERT INTO tentang_kami_tim_keahlian (tim_id, keahlian, urutan)
-                    VALUES (%s, %s, %s)
-                """, (tim_id, skill, idx))
-        except json.JSONDecodeError:
-            logger.warning(f"Invalid keahlian JSON for tim_id {tim_id}")
+        # Parse dan insert keahlian sekaligus
+        keahlian_list = parse_keahlian(keahlian, tim_id)
+        if keahlian_list:
+            cursor.executemany("""
+                INSERT INTO tentang_kami_tim_keahlian (tim_id, keahlian, urutan)
+                VALUES (%s, %s, %s)
+            """, [(tim_id, skill, idx) for idx, skill in enumerate(keahlian_list)])
         
         connection.commit()
         
@@ -270,12 +333,7 @@ async def create_tim_member(
         member = cursor.fetchone()
         
         # Ambil keahlian
-        cursor.execute("""
-            SELECT keahlian FROM tentang_kami_tim_keahlian 
-            WHERE tim_id = %s ORDER BY urutan ASC
-        """, (tim_id,))
-        keahlian_rows = cursor.fetchall()
-        member['keahlian'] = [row['keahlian'] for row in keahlian_rows]
+        load_keahlian(cursor, [member])
         
         if member['foto']:
             member['foto_url'] = f"http://localhost:8000/uploads/tim/{member['foto']}"
@@ -356,19 +414,10 @@ async def update_tim_member(
         
         # Update keahlian jika diberikan
         if keahlian is not None:
-            try:
-                # Hapus keahlian lama
-                cursor.execute("DELETE FROM tentang_kami_tim_keahlian WHERE tim_id = %s", (tim_id,))
-                
-                # Insert keahlian baru
-                keahlian_list = json.loads(keahlian)
-                for idx, skill in enumerate(keahlian_list):
-                    cursor.execute("""
-                        INSERT INTO tentang_kami_tim_keahlian (tim_id, keahlian, urutan)
-                        VALUES (%s, %s, %s)
-                    """, (tim_id, skill, idx))
-            except json.JSONDecodeError:
-                logger.warning(f"Invalid keahlian JSON for tim_id {tim_id}")
+            keahlian_list = parse_keahlian(keahlian, tim_id)
+            if keahlian_list is not None:
+                # Hanya baris yang berubah yang ditulis (bukan hapus semua lalu insert ulang)
+                sync_keahlian(cursor, tim_id, keahlian_list)
         
         connection.commit()
         
@@ -376,12 +425,7 @@ async def update_tim_member(
         cursor.execute("SELECT * FROM tentang_kami_tim WHERE id = %s", (tim_id,))
         member = cursor.fetchone()
         
-        cursor.execute("""
-            SELECT keahlian FROM tentang_kami_tim_keahlian 
-            WHERE tim_id = %s ORDER BY urutan ASC
-        """, (tim_id,))
-        keahlian_rows = cursor.fetchall()
-        member['keahlian'] = [row['keahlian'] for row in keahlian_rows]
+        load_keahlian(cursor, [member])
         
         if member['foto']:
             member['foto_url'] = f"http://localhost:8000/uploads/tim/{member['foto']}"
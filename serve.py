@@ -0,0 +1,245 @@
+"""
+Launcher produksi tanpa Passenger: app di-load sekali di proses master
+(preload), gc.freeze() sebelum fork agar memori hasil import dibagi
+copy-on-write, lalu N worker uvicorn berbagi satu listening socket.
+
+- Worker didaur ulang setelah --max-requests (+ jitter) request
+- Worker yang mati di-spawn ulang (dengan backoff jika crash beruntun)
+- SIGTERM/SIGINT: semua worker dihentikan graceful (lifespan shutdown jalan)
+- SIGHUP: worker diganti satu per satu tanpa menutup socket
+
+Contoh:
+    python serve.py --workers 4 --port 8000
+    python serve.py --workers 4 --max-requests 5000 --max-requests-jitter 500
+    gunicorn -c gunicorn.conf.py main:app   # alternatif via gunicorn
+"""
+import argparse
+import errno
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CRASH_WINDOW_SECONDS = 5
+MAX_BACKOFF_SECONDS = 30
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Jalankan API dengan beberapa worker uvicorn (preload + fork)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", 10000)),
+                        help="Daur ulang worker setelah N request (0 = tidak pernah)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", 1000)),
+                        help="Tambahan acak agar worker tidak restart bersamaan")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", 30)))
+    parser.add_argument("--keepalive", type=int, default=int(os.getenv("KEEPALIVE", 5)))
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("BACKLOG", 2048)))
+    parser.add_argument("--access-log", action="store_true", help="Aktifkan access log uvicorn")
+    return parser.parse_args()
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def build_config(app, args):
+    import uvicorn
+    return uvicorn.Config(
+        app,
+        lifespan="on",
+        log_config=None,
+        access_log=args.access_log,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        timeout_keep_alive=args.keepalive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests or None,
+        limit_max_requests_jitter=args.max_requests_jitter if args.max_requests else 0,
+        backlog=args.backlog
+    )
+
+
+def run_worker(app, sock, args):
+    """Dijalankan di proses anak setelah fork; uvicorn memasang handler sinyal sendiri"""
+    import uvicorn
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    server = uvicorn.Server(build_config(app, args))
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, app, sock, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}
+        self.stopping = False
+        self.reload_requested = False
+        self.recent_crashes = []
+        # Worker yang sengaja dihentikan (reload); uvicorn me-raise ulang SIGTERM setelah shutdown
+        self.terminating = set()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                run_worker(self.app, self.sock, self.args)
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} error: {e}", file=sys.stderr, flush=True)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = time.monotonic()
+        return pid
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def _reap(self, block: bool):
+        try:
+            pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            return None, None
+        except InterruptedError:
+            return None, None
+        except OSError as e:
+            if e.errno == errno.EINTR:
+                return None, None
+            raise
+        if pid == 0:
+            return None, None
+        return pid, status
+
+    def _backoff(self):
+        now = time.monotonic()
+        self.recent_crashes = [t for t in self.recent_crashes if now - t < CRASH_WINDOW_SECONDS * 4]
+        self.recent_crashes.append(now)
+        if len(self.recent_crashes) > self.args.workers:
+            delay = min(2 ** (len(self.recent_crashes) - self.args.workers), MAX_BACKOFF_SECONDS)
+            print(f"⚠️  Worker crash beruntun, spawn ulang dalam {delay}s", file=sys.stderr, flush=True)
+            time.sleep(delay)
+
+    def reload(self):
+        """Ganti worker satu per satu: spawn baru dulu, baru hentikan yang lama"""
+        self.reload_requested = False
+        old_pids = list(self.workers)
+        print(f"🔄 Reload {len(old_pids)} worker", flush=True)
+        for pid in old_pids:
+            if self.stopping:
+                return
+            self.spawn()
+            self._terminate(pid)
+
+    def _terminate(self, pid: int):
+        self.terminating.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+        print(f"✅ {len(self.workers)} worker melayani {self.args.host}:{self.args.port} (master pid {os.getpid()})", flush=True)
+
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload()
+            pid, status = self._reap(block=False)
+            if pid is None:
+                time.sleep(0.2)
+                continue
+
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if pid in self.terminating:
+                self.terminating.discard(pid)
+                print(f"♻️  Worker {pid} diganti", flush=True)
+                continue
+            if exit_code == 0:
+                # Keluar normal = daur ulang karena limit_max_requests
+                print(f"♻️  Worker {pid} didaur ulang", flush=True)
+            else:
+                print(f"❌ Worker {pid} keluar dengan kode {exit_code}", file=sys.stderr, flush=True)
+                if time.monotonic() - started < CRASH_WINDOW_SECONDS:
+                    self._backoff()
+            if len(self.workers) < self.args.workers:
+                self.spawn()
+
+        self.shutdown()
+
+    def shutdown(self):
+        print(f"⏳ Menghentikan {len(self.workers)} worker (graceful {self.args.graceful_timeout}s)", flush=True)
+        for pid in list(self.workers):
+            self._terminate(pid)
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            pid, _ = self._reap(block=False)
+            if pid is None:
+                time.sleep(0.1)
+            else:
+                self.workers.pop(pid, None)
+
+        for pid in list(self.workers):
+            print(f"⚠️  Worker {pid} tidak berhenti, SIGKILL", file=sys.stderr, flush=True)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.sock.close()
+        print("✅ Server berhenti", flush=True)
+
+
+def main():
+    args = parse_args()
+
+    if args.workers > 1 and not os.getenv("METRICS_DIR"):
+        print("⚠️  METRICS_DIR kosong: /metrics hanya akan berisi data satu worker", file=sys.stderr)
+
+    # Preload: import app sekali di master sebelum fork
+    started = time.perf_counter()
+    from main import app
+    print(f"✅ App di-load dalam {(time.perf_counter() - started) * 1000:.0f}ms", flush=True)
+
+    if not hasattr(os, "fork"):
+        # Windows: tanpa fork, jalankan satu proses uvicorn biasa
+        import uvicorn
+        print("⚠️  os.fork tidak tersedia, berjalan dengan satu worker", file=sys.stderr)
+        uvicorn.Server(build_config(app, args)).run(sockets=[bind_socket(args.host, args.port, args.backlog)])
+        return
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    gc.collect()
+    gc.freeze()
+    Supervisor(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    main()
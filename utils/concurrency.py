@@ -0,0 +1,185 @@
+import os
+import math
+import time
+import asyncio
+import inspect
+import logging
+from typing import Dict
+from anyio import to_thread
+from fastapi import params
+from fastapi.routing import APIRoute
+from utils.json_response import FastJSONResponse
+from utils.metrics import registry, match_route
+
+logger = logging.getLogger(__name__)
+
+# Kapasitas threadpool AnyIO untuk endpoint `def` (default AnyIO: 40)
+THREADPOOL_TOKENS = int(os.getenv("THREADPOOL_TOKENS", 40))
+# Batas waktu antre menunggu slot sebelum request ditolak dengan 503
+THREADPOOL_QUEUE_TIMEOUT = float(os.getenv("THREADPOOL_QUEUE_TIMEOUT", 2))
+BULKHEAD_EXPORT_LIMIT = int(os.getenv("BULKHEAD_EXPORT_LIMIT", 2))
+BULKHEAD_UPLOAD_LIMIT = int(os.getenv("BULKHEAD_UPLOAD_LIMIT", 4))
+BULKHEAD_QUEUE_TIMEOUT = float(os.getenv("BULKHEAD_QUEUE_TIMEOUT", 5))
+LOAD_SHED_RETRY_AFTER = int(os.getenv("LOAD_SHED_RETRY_AFTER", 5))
+
+# Endpoint ringan yang tidak pernah ditahan/ditolak
+EXEMPT_PATHS = {"/healthz", "/metrics"}
+EXPORT_PREFIXES = ("/admin/export",)
+
+BULKHEAD_IN_FLIGHT = registry.gauge("bulkhead_in_flight", "Request yang sedang memegang slot bulkhead", ("bulkhead",))
+BULKHEAD_WAITING = registry.gauge("bulkhead_queue_depth", "Request yang sedang antre slot bulkhead", ("bulkhead",))
+BULKHEAD_QUEUE_WAIT = registry.histogram(
+    "bulkhead_queue_wait_seconds", "Lama antre sebelum mendapat slot bulkhead", ("bulkhead",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+)
+LOAD_SHED = registry.counter("load_shed_total", "Request yang ditolak 503 karena antrean penuh", ("bulkhead",))
+
+
+class Bulkhead:
+    """
+    Semaphore dengan batas waktu antre. Semaphore asyncio terikat ke event loop,
+    jadi dibuat lazy per loop (uvicorn maupun loop background a2wsgi).
+    """
+
+    def __init__(self, name: str, limit: int, queue_timeout: float):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue_timeout = queue_timeout
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
+
+    async def acquire(self) -> bool:
+        """True jika slot didapat, False jika antre melebihi queue_timeout"""
+        semaphore = self._get_semaphore()
+        if not semaphore.locked():
+            await semaphore.acquire()
+            BULKHEAD_QUEUE_WAIT.observe(self.name, value=0)
+            BULKHEAD_IN_FLIGHT.inc(self.name)
+            return True
+
+        started = time.perf_counter()
+        BULKHEAD_WAITING.inc(self.name)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            BULKHEAD_WAITING.dec(self.name)
+            BULKHEAD_QUEUE_WAIT.observe(self.name, value=time.perf_counter() - started)
+        BULKHEAD_IN_FLIGHT.inc(self.name)
+        return True
+
+    def release(self):
+        BULKHEAD_IN_FLIGHT.dec(self.name)
+        self._semaphore.release()
+
+
+BULKHEADS: Dict[str, Bulkhead] = {
+    "threadpool": Bulkhead("threadpool", THREADPOOL_TOKENS, THREADPOOL_QUEUE_TIMEOUT),
+    "export": Bulkhead("export", BULKHEAD_EXPORT_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+    "upload": Bulkhead("upload", BULKHEAD_UPLOAD_LIMIT, BULKHEAD_QUEUE_TIMEOUT),
+}
+
+
+def _has_file_upload(route: APIRoute) -> bool:
+    return any(isinstance(field.field_info, params.File) for field in route.dependant.body_params)
+
+
+def classify_route(route) -> tuple:
+    """
+    Bulkhead yang harus dilewati sebuah route, urut dari yang paling spesifik.
+    Endpoint `def` juga melewati bulkhead "threadpool" yang kapasitasnya sama
+    dengan threadpool AnyIO, sehingga antrean thread punya batas waktu.
+    """
+    if not isinstance(route, APIRoute) or route.path in EXEMPT_PATHS:
+        return ()
+
+    names = []
+    if route.path.startswith(EXPORT_PREFIXES):
+        names.append("export")
+    elif _has_file_upload(route):
+        names.append("upload")
+    if not inspect.iscoroutinefunction(route.dependant.call):
+        names.append("threadpool")
+    return tuple(names)
+
+
+_route_bulkheads: Dict[int, tuple] = {}
+_configured_loops = set()
+
+
+def configure_threadpool():
+    """Set kapasitas threadpool AnyIO untuk event loop yang sedang berjalan"""
+    loop = asyncio.get_running_loop()
+    if id(loop) in _configured_loops:
+        return
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = THREADPOOL_TOKENS
+    _configured_loops.add(id(loop))
+    logger.info(f"Threadpool capacity set to {THREADPOOL_TOKENS} threads")
+
+
+def _shed_response(bulkhead: Bulkhead) -> FastJSONResponse:
+    LOAD_SHED.inc(bulkhead.name)
+    retry_after = max(LOAD_SHED_RETRY_AFTER, math.ceil(bulkhead.queue_timeout))
+    return FastJSONResponse(
+        {"detail": "Server sedang sibuk, silakan coba beberapa saat lagi"},
+        status_code=503,
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    ASGI middleware: batasi request bersamaan per kelompok route (export,
+    upload, endpoint sync di threadpool). Request yang antre lebih lama dari
+    batas waktu langsung dijawab 503 + Retry-After, bukan menunggu tanpa batas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        configure_threadpool()
+        route = match_route(scope)
+        names = _route_bulkheads.get(id(route)) if route is not None else ()
+        if names is None:
+            names = classify_route(route)
+            _route_bulkheads[id(route)] = names
+
+        acquired = []
+        try:
+            for name in names:
+                bulkhead = BULKHEADS[name]
+                if not await bulkhead.acquire():
+                    logger.warning(
+                        f"Load shed {scope.get('method')} {route.path}: bulkhead '{name}' penuh "
+                        f"(limit {bulkhead.limit}, antre > {bulkhead.queue_timeout}s)"
+                    )
+                    await _shed_response(bulkhead)(scope, receive, send)
+                    return
+                acquired.append(bulkhead)
+
+            await self.app(scope, receive, send)
+        finally:
+            for bulkhead in reversed(acquired):
+                bulkhead.release()
+
+
+def _threadpool_stats():
+    for name, bulkhead in BULKHEADS.items():
+        yield ("bulkhead_limit", "Kapasitas bulkhead", {"bulkhead": name}, bulkhead.limit)
+
+
+registry.register_collector(_threadpool_stats)
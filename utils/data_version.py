@@ -0,0 +1,91 @@
+"""
+Nomor versi data per "nama" (mis. kelas) di tabel data_versions.
+
+Endpoint tulis menaikkan versi di transaksi yang sama dengan perubahan
+datanya; cache in-memory (indeks pencarian, facet) membandingkan versi yang
+dibaca dengan versi saat cache dibangun. Versi dibaca paling sering sekali
+per DATA_VERSION_CHECK_SECONDS per proses, jadi cache di semua worker ikut
+basi paling lambat selama interval itu tanpa query tambahan per request.
+"""
+import os
+import time
+import logging
+from typing import Dict, Optional
+from mysql.connector import errors as mysql_errors
+from config.database import db
+from config.async_database import async_db, ensure_schema_sync
+from utils.startup import on_startup
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_CHECK_SECONDS = float(os.getenv("DATA_VERSION_CHECK_SECONDS", 2))
+
+ER_NO_SUCH_TABLE = 1146
+
+KELAS = "kelas"
+TIKET = "tiket_kategori"
+
+_versions: Dict[str, int] = {}
+_checked_at = 0.0
+
+
+def create_data_versions_table():
+    connection = db.get_connection()
+    cursor = connection.cursor()
+
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name VARCHAR(50) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        connection.commit()
+    except Exception as e:
+        logger.error(f"Error creating data_versions table: {str(e)}")
+    finally:
+        cursor.close()
+        connection.close()
+
+
+on_startup(create_data_versions_table)
+
+
+def bump_data_version(cursor, *names: str):
+    """
+    Naikkan versi di transaksi pemanggil (commit oleh pemanggil). Hanya tabel
+    data_versions yang belum ada yang diabaikan (cukup di-log); error lain
+    (mis. deadlock, yang sudah me-rollback seluruh transaksi pemanggil)
+    diteruskan agar pemanggil tidak commit sisa transaksi dan melapor sukses.
+    """
+    global _checked_at
+    # DDL lewat koneksi terpisah: CREATE TABLE di transaksi ini akan implicit commit
+    ensure_schema_sync(create_data_versions_table)
+    try:
+        cursor.executemany("""
+            INSERT INTO data_versions (name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1
+        """, [(name,) for name in names])
+    except mysql_errors.ProgrammingError as e:
+        if e.errno != ER_NO_SUCH_TABLE:
+            raise
+        logger.warning(f"Gagal menaikkan versi data {', '.join(names)}: {str(e)}")
+    # Proses ini yang menulis: baca ulang versi di request berikutnya
+    _checked_at = 0.0
+
+
+async def get_data_versions() -> Optional[Dict[str, int]]:
+    """Versi semua data (di-cache DATA_VERSION_CHECK_SECONDS); None jika tabel belum bisa dibaca"""
+    global _versions, _checked_at
+    now = time.monotonic()
+    if _checked_at and now - _checked_at < DATA_VERSION_CHECK_SECONDS:
+        return _versions
+    try:
+        rows = await async_db.fetch_all("SELECT name, version FROM data_versions")
+    except Exception as e:
+        logger.warning(f"Gagal membaca data_versions: {str(e)}")
+        return None
+    _versions = {row["name"]: row["version"] for row in rows}
+    _checked_at = now
+    return _versions
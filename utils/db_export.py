@@ -0,0 +1,545 @@
+import os
+import io
+import base64
+import csv
+import json
+import time
+import tarfile
+import tempfile
+import zlib
+import logging
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional
+from config.database import db
+
+logger = logging.getLogger(__name__)
+
+# Jumlah baris yang diambil per fetchmany dari cursor unbuffered
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 1000))
+EXPORT_COMPRESS_LEVEL = int(os.getenv("EXPORT_COMPRESS_LEVEL", 6))
+# Batas ukuran CSV per tabel yang ditahan di memory sebelum dipindah ke file sementara
+EXPORT_CSV_SPOOL_BYTES = int(os.getenv("EXPORT_CSV_SPOOL_BYTES", 8 * 1024 * 1024))
+
+EXPORT_FORMAT_VERSION = 1
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Kolom penanda perubahan untuk export incremental (urutan prioritas)
+CHANGE_COLUMNS = ("updated_at", "created_at")
+TOMBSTONE_COLUMN = "deleted_at"
+# Perlakuan tabel tanpa kolom timestamp saat export incremental
+UNTRACKED_MODES = ("full", "skip")
+
+
+def quote_identifier(name: str) -> str:
+    """Quote nama tabel/kolom MySQL dengan backtick"""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def export_value(value):
+    """Konversi nilai dari MySQL ke bentuk yang bisa di-restore apa adanya"""
+    if isinstance(value, Decimal):
+        # String agar presisi DECIMAL tidak hilang
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f") if value.microsecond else value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        # Kolom TIME dikembalikan sebagai timedelta
+        total_seconds = int(value.total_seconds())
+        sign = "-" if total_seconds < 0 else ""
+        total_seconds = abs(total_seconds)
+        return f"{sign}{total_seconds // 3600:02d}:{(total_seconds % 3600) // 60:02d}:{total_seconds % 60:02d}"
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, set):
+        # Kolom SET
+        return ",".join(sorted(value))
+    return value
+
+
+def _json_default(value):
+    converted = export_value(value)
+    if converted is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return converted
+
+
+def dumps_record(record: dict) -> bytes:
+    return (json.dumps(record, default=_json_default, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def parse_table_list(value: Optional[str]) -> List[str]:
+    """Parse parameter 'a,b,c' menjadi list nama tabel"""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def list_tables(cursor, include: Optional[Iterable[str]] = None, exclude: Optional[Iterable[str]] = None) -> List[str]:
+    """Daftar base table di database, difilter include/exclude"""
+    cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+    tables = [list(row.values())[0] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+    include = list(include or [])
+    exclude = set(exclude or [])
+
+    if include:
+        unknown = [name for name in include if name not in tables]
+        if unknown:
+            raise ValueError(f"Tabel tidak ditemukan: {', '.join(unknown)}")
+        tables = [name for name in tables if name in include]
+
+    return [name for name in tables if name not in exclude]
+
+
+def get_table_columns(cursor, table: str) -> List[dict]:
+    """Ambil nama kolom dan tipe sebuah tabel (urutan sesuai definisi)"""
+    cursor.execute(f"SHOW COLUMNS FROM {quote_identifier(table)}")
+    rows = cursor.fetchall()
+    columns = []
+    for row in rows:
+        if not isinstance(row, dict):
+            row = dict(zip(cursor.column_names, row))
+        columns.append({
+            "name": row["Field"],
+            "type": row["Type"].decode() if isinstance(row["Type"], bytes) else row["Type"],
+            "key": row.get("Key")
+        })
+    return columns
+
+
+def get_primary_key(cursor, table: str) -> List[str]:
+    cursor.execute(f"SHOW KEYS FROM {quote_identifier(table)} WHERE Key_name = 'PRIMARY'")
+    rows = cursor.fetchall()
+    keys = []
+    for row in rows:
+        if not isinstance(row, dict):
+            row = dict(zip(cursor.column_names, row))
+        keys.append((row["Seq_in_index"], row["Column_name"]))
+    return [name for _, name in sorted(keys)]
+
+
+def iter_table_rows(connection, table: str, where: str = "", params: tuple = (), fetch_size: int = EXPORT_FETCH_SIZE) -> Iterator[dict]:
+    """
+    Stream baris tabel memakai cursor unbuffered + fetchmany sehingga
+    memory tetap konstan berapapun ukuran tabel
+    """
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        query = f"SELECT * FROM {quote_identifier(table)}"
+        if where:
+            query += f" WHERE {where}"
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        cursor.close()
+
+
+class _GzipWriter:
+    """Kompres data secara on-the-fly; setiap write mengembalikan chunk gzip yang siap dikirim"""
+
+    def __init__(self, level: int = EXPORT_COMPRESS_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """File-like object yang mengompres output tarfile dan menampungnya untuk di-yield per chunk"""
+
+    def __init__(self):
+        self._gzip_writer = _GzipWriter()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(self._gzip_writer.write(bytes(data)))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+    def finish(self) -> bytes:
+        self._chunks.append(self._gzip_writer.close())
+        return self.drain()
+
+
+def _begin_snapshot(connection):
+    """Semua tabel dibaca dari snapshot yang sama agar backup konsisten"""
+    try:
+        connection.start_transaction(consistent_snapshot=True, isolation_level="REPEATABLE READ", readonly=True)
+    except Exception as e:
+        logger.warning(f"Consistent snapshot tidak tersedia, lanjut tanpa snapshot: {str(e)}")
+
+
+class ExportPlan:
+    """Daftar tabel yang akan diekspor beserta filter baris per tabel"""
+
+    def __init__(self, tables: List[str]):
+        self.tables = tables
+        self.filters = {}
+        self.meta = {}
+        self.manifest_extra = {"mode": "full"}
+
+    def table_filter(self, table: str):
+        return self.filters.get(table, ("", ()))
+
+    def extra_records(self, connection, table: str):
+        """Record tambahan setelah baris sebuah tabel (dipakai export incremental)"""
+        return iter(())
+
+
+def build_full_plan(cursor, include=None, exclude=None) -> ExportPlan:
+    return ExportPlan(list_tables(cursor, include, exclude))
+
+
+# ============================================
+# EXPORT INCREMENTAL (SINCE WATERMARK)
+# ============================================
+
+def parse_watermark(value: str) -> datetime:
+    """Parse watermark ISO ('2026-01-31T23:00:00' atau '2026-01-31 23:00:00')"""
+    try:
+        return datetime.fromisoformat(value.strip().replace("Z", ""))
+    except (ValueError, AttributeError):
+        raise ValueError("Format watermark tidak valid, gunakan ISO datetime (YYYY-MM-DD HH:MM:SS)")
+
+
+def encode_watermark_token(watermark: datetime) -> str:
+    payload = json.dumps({"v": EXPORT_FORMAT_VERSION, "watermark": export_value(watermark)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_watermark_token(token: str) -> datetime:
+    """Ambil watermark dari token yang dihasilkan export sebelumnya"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return parse_watermark(payload["watermark"])
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError("Token watermark tidak valid")
+
+
+def get_change_columns(cursor) -> dict:
+    """Map tabel -> kolom updated_at/created_at/deleted_at yang dimiliki"""
+    names = CHANGE_COLUMNS + (TOMBSTONE_COLUMN,)
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(f"""
+        SELECT TABLE_NAME, COLUMN_NAME
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND COLUMN_NAME IN ({placeholders})
+    """, names)
+    columns = {}
+    for row in cursor.fetchall():
+        if not isinstance(row, dict):
+            row = dict(zip(cursor.column_names, row))
+        columns.setdefault(row["TABLE_NAME"], set()).add(row["COLUMN_NAME"])
+    return columns
+
+
+class IncrementalExportPlan(ExportPlan):
+    """
+    Plan export yang hanya mengambil baris berubah sejak watermark.
+    Baris dengan deleted_at terisi dikirim sebagai tombstone (primary key + deleted_at).
+    """
+
+    def __init__(self, tables: List[str], since: datetime, watermark: datetime):
+        super().__init__(tables)
+        self.since = since
+        self.watermark = watermark
+        self.tombstone_tables = {}
+        self.manifest_extra = {
+            "mode": "incremental",
+            "since": export_value(since),
+            "watermark": export_value(watermark),
+            "next_token": encode_watermark_token(watermark)
+        }
+
+    def extra_records(self, connection, table: str):
+        primary_key = self.tombstone_tables.get(table)
+        if not primary_key:
+            return
+
+        column = quote_identifier(TOMBSTONE_COLUMN)
+        count = 0
+        for row in iter_table_rows(connection, table, f"{column} >= %s", (self.since,)):
+            count += 1
+            yield {
+                "record": {
+                    "type": "tombstone",
+                    "table": table,
+                    "key": {name: row[name] for name in primary_key},
+                    TOMBSTONE_COLUMN: row[TOMBSTONE_COLUMN]
+                }
+            }
+        yield {"record": None, "manifest": {"tombstones": count}}
+
+
+def build_incremental_plan(cursor, since: datetime, include=None, exclude=None, untracked: str = "full") -> IncrementalExportPlan:
+    """
+    Tabel dengan updated_at/created_at hanya mengekspor baris >= since.
+    Batas menggunakan >= agar baris pada detik watermark tidak terlewat;
+    restore bersifat upsert sehingga overlap aman.
+    """
+    if untracked not in UNTRACKED_MODES:
+        raise ValueError(f"Mode untracked tidak valid. Pilihan: {', '.join(UNTRACKED_MODES)}")
+
+    cursor.execute("SELECT NOW() AS now")
+    row = cursor.fetchone()
+    watermark = row["now"] if isinstance(row, dict) else row[0]
+
+    tables = list_tables(cursor, include, exclude)
+    change_columns = get_change_columns(cursor)
+
+    selected = []
+    plan_filters = {}
+    plan_meta = {}
+    tombstone_tables = {}
+
+    for table in tables:
+        available = change_columns.get(table, set())
+        tracked = [name for name in CHANGE_COLUMNS if name in available]
+
+        if not tracked:
+            if untracked == "skip":
+                continue
+            selected.append(table)
+            plan_meta[table] = {"mode": "full"}
+            continue
+
+        conditions = " OR ".join(f"{quote_identifier(name)} >= %s" for name in tracked)
+        where = f"({conditions})"
+        params = [since] * len(tracked)
+
+        if TOMBSTONE_COLUMN in available:
+            # Baris yang sudah dihapus dikirim sebagai tombstone, bukan row
+            where += f" AND {quote_identifier(TOMBSTONE_COLUMN)} IS NULL"
+            primary_key = get_primary_key(cursor, table)
+            if primary_key:
+                tombstone_tables[table] = primary_key
+
+        selected.append(table)
+        plan_filters[table] = (where, tuple(params))
+        plan_meta[table] = {"mode": "incremental", "change_columns": tracked}
+
+    plan = IncrementalExportPlan(selected, since, watermark)
+    plan.filters = plan_filters
+    plan.meta = plan_meta
+    plan.tombstone_tables = tombstone_tables
+    return plan
+
+
+def _iter_ndjson(connection, plan: ExportPlan, header: dict, fetch_size: int) -> Iterator[bytes]:
+    gzip_writer = _GzipWriter()
+    manifest = {}
+    started = time.monotonic()
+    meta_cursor = connection.cursor(dictionary=True)
+
+    try:
+        yield gzip_writer.write(dumps_record(header))
+
+        for table in plan.tables:
+            columns = get_table_columns(meta_cursor, table)
+            primary_key = get_primary_key(meta_cursor, table)
+            table_meta = plan.meta.get(table, {})
+
+            yield gzip_writer.write(dumps_record({
+                "type": "table",
+                "table": table,
+                "columns": columns,
+                "primary_key": primary_key,
+                **table_meta
+            }))
+
+            where, params = plan.table_filter(table)
+            row_count = 0
+            buffer = []
+            for row in iter_table_rows(connection, table, where, params, fetch_size):
+                buffer.append(dumps_record({"type": "row", "table": table, "data": row}))
+                row_count += 1
+                if len(buffer) >= fetch_size:
+                    yield gzip_writer.write(b"".join(buffer))
+                    buffer = []
+            if buffer:
+                yield gzip_writer.write(b"".join(buffer))
+
+            manifest[table] = {"rows": row_count}
+            for extra in plan.extra_records(connection, table):
+                if extra.get("record") is not None:
+                    yield gzip_writer.write(dumps_record(extra["record"]))
+                manifest[table].update(extra.get("manifest", {}))
+
+        yield gzip_writer.write(dumps_record({
+            "type": "manifest",
+            "tables": manifest,
+            "total_rows": sum(item["rows"] for item in manifest.values()),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "completed_at": datetime.now().isoformat(),
+            **plan.manifest_extra
+        }))
+        yield gzip_writer.close()
+    finally:
+        meta_cursor.close()
+
+
+def _iter_csv_tar(connection, plan: ExportPlan, header: dict, fetch_size: int) -> Iterator[bytes]:
+    """
+    Format CSV: arsip tar.gz berisi satu file CSV per tabel dan manifest.json.
+    Setiap tabel ditulis ke SpooledTemporaryFile dulu karena header tar butuh ukuran file.
+    """
+    sink = _ChunkSink()
+    archive = tarfile.open(fileobj=sink, mode="w|")
+    manifest = {}
+    started = time.monotonic()
+    meta_cursor = connection.cursor(dictionary=True)
+
+    def add_bytes(name: str, fileobj, size: int):
+        info = tarfile.TarInfo(name=name)
+        info.size = size
+        info.mtime = int(time.time())
+        archive.addfile(info, fileobj)
+
+    try:
+        for table in plan.tables:
+            columns = [column["name"] for column in get_table_columns(meta_cursor, table)]
+            where, params = plan.table_filter(table)
+
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_CSV_SPOOL_BYTES, mode="w+b") as spool:
+                text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                row_count = 0
+                for row in iter_table_rows(connection, table, where, params, fetch_size):
+                    writer.writerow([export_value(row.get(column)) for column in columns])
+                    row_count += 1
+                text.flush()
+                size = spool.tell()
+                spool.seek(0)
+                add_bytes(f"{table}.csv", spool, size)
+                text.detach()
+
+            manifest[table] = {"rows": row_count}
+
+            # Tombstone (export incremental) ditulis ke file CSV terpisah per tabel
+            with tempfile.SpooledTemporaryFile(max_size=EXPORT_CSV_SPOOL_BYTES, mode="w+b") as spool:
+                text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+                writer = None
+                for extra in plan.extra_records(connection, table):
+                    record = extra.get("record")
+                    if record is not None:
+                        values = {**record["key"], TOMBSTONE_COLUMN: record[TOMBSTONE_COLUMN]}
+                        if writer is None:
+                            writer = csv.writer(text)
+                            writer.writerow(list(values))
+                        writer.writerow([export_value(value) for value in values.values()])
+                    manifest[table].update(extra.get("manifest", {}))
+                if writer is not None:
+                    text.flush()
+                    size = spool.tell()
+                    spool.seek(0)
+                    add_bytes(f"{table}.tombstones.csv", spool, size)
+                text.detach()
+
+            yield sink.drain()
+
+        manifest_bytes = json.dumps({
+            **header,
+            "type": "manifest",
+            "tables": manifest,
+            "total_rows": sum(item["rows"] for item in manifest.values()),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "completed_at": datetime.now().isoformat(),
+            **plan.manifest_extra
+        }, default=_json_default, indent=2).encode("utf-8")
+        add_bytes("manifest.json", io.BytesIO(manifest_bytes), len(manifest_bytes))
+        archive.close()
+        yield sink.finish()
+    finally:
+        meta_cursor.close()
+
+
+def stream_export(
+    fmt: str = "ndjson",
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    fetch_size: int = EXPORT_FETCH_SIZE,
+    plan_builder=None,
+    header_extra: Optional[dict] = None
+) -> Iterator[bytes]:
+    """
+    Generator chunk gzip untuk StreamingResponse. Koneksi dibuka di dalam
+    generator dan selalu ditutup, termasuk saat client memutus download.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format tidak didukung. Pilihan: {', '.join(EXPORT_FORMATS)}")
+
+    connection = db.get_connection()
+    try:
+        _begin_snapshot(connection)
+        cursor = connection.cursor(dictionary=True)
+        try:
+            plan = plan_builder(cursor) if plan_builder else build_full_plan(cursor, include, exclude)
+        finally:
+            cursor.close()
+
+        header = {
+            "type": "header",
+            "format": fmt,
+            "version": EXPORT_FORMAT_VERSION,
+            "exported_at": datetime.now().isoformat(),
+            "tables": plan.tables,
+            **plan.manifest_extra,
+            **(header_extra or {})
+        }
+
+        logger.info(f"Starting {fmt} export of {len(plan.tables)} tables")
+        if fmt == "ndjson":
+            yield from _iter_ndjson(connection, plan, header, fetch_size)
+        else:
+            yield from _iter_csv_tar(connection, plan, header, fetch_size)
+        logger.info(f"Finished {fmt} export of {len(plan.tables)} tables")
+    finally:
+        try:
+            connection.rollback()
+        except Exception:
+            pass
+        connection.close()
+
+
+def prepare_export(fmt: str, include=None, exclude=None, **kwargs) -> Iterator[bytes]:
+    """
+    Jalankan generator sampai chunk pertama agar error (tabel tidak ada,
+    koneksi gagal) muncul sebelum response 200 dikirim
+    """
+    stream = stream_export(fmt, include, exclude, **kwargs)
+    first_chunk = next(stream)
+
+    def chained():
+        try:
+            yield first_chunk
+            yield from stream
+        finally:
+            stream.close()
+
+    return chained()
+
+
+def export_filename(fmt: str, prefix: str = "backup") -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = "ndjson.gz" if fmt == "ndjson" else "tar.gz"
+    return f"{prefix}_{timestamp}.{extension}"
@@ -0,0 +1,342 @@
+import os
+import io
+import gzip
+import json
+import time
+import logging
+from typing import Callable, Iterable, Iterator, Optional
+from mysql.connector import errors as mysql_errors
+from config.database import db
+from utils.db_export import quote_identifier, get_table_columns, get_primary_key, TOMBSTONE_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# Jumlah baris per executemany + commit
+RESTORE_BATCH_SIZE = int(os.getenv("RESTORE_BATCH_SIZE", 1000))
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Error MySQL yang disebabkan isi file (kolom tidak dikenal, nilai tidak valid), bukan oleh server
+ER_BAD_FIELD_ERROR = 1054
+ER_NO_SUCH_TABLE = 1146
+ER_BAD_NULL_ERROR = 1048
+ER_WARN_DATA_OUT_OF_RANGE = 1264
+ER_TRUNCATED_WRONG_VALUE = 1292
+ER_TRUNCATED_WRONG_VALUE_FOR_FIELD = 1366
+ER_DATA_TOO_LONG = 1406
+INPUT_ERRORS = {
+    ER_BAD_FIELD_ERROR, ER_NO_SUCH_TABLE, ER_BAD_NULL_ERROR, ER_WARN_DATA_OUT_OF_RANGE,
+    ER_TRUNCATED_WRONG_VALUE, ER_TRUNCATED_WRONG_VALUE_FOR_FIELD, ER_DATA_TOO_LONG,
+}
+
+
+class RestoreError(Exception):
+    """Error saat restore; `summary` berisi progress yang sudah di-commit"""
+
+    def __init__(self, message: str, summary: dict):
+        super().__init__(message)
+        self.summary = summary
+
+
+class RestoreInputError(RestoreError):
+    """File restore tidak valid (bukan NDJSON/gzip, record rusak, tabel/kolom/nilai tidak dikenal)"""
+
+
+def is_input_error(error: Exception) -> bool:
+    if isinstance(error, mysql_errors.Error):
+        return error.errno in INPUT_ERRORS
+    # JSONDecodeError/UnicodeDecodeError (ValueError), record tanpa field wajib, gzip rusak/terpotong
+    return isinstance(error, (ValueError, KeyError, TypeError, AttributeError, EOFError, gzip.BadGzipFile))
+
+
+class _ReadableWrapper(io.RawIOBase):
+    """Adaptor agar file-like apapun (mis. SpooledTemporaryFile dari upload) bisa dibungkus BufferedReader"""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._fileobj.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_export_stream(fileobj) -> io.TextIOWrapper:
+    """Buka file export (.ndjson atau .ndjson.gz) sebagai text stream tanpa membaca seluruh isinya"""
+    if not hasattr(fileobj, "peek"):
+        fileobj = io.BufferedReader(_ReadableWrapper(fileobj))
+    if fileobj.peek(2)[:2] == GZIP_MAGIC:
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    return io.TextIOWrapper(fileobj, encoding="utf-8")
+
+
+def iter_export_records(stream: Iterable[str]) -> Iterator[dict]:
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Baris {line_number} bukan JSON yang valid (format restore harus NDJSON dari /admin/export/stream)")
+        if not isinstance(record, dict):
+            raise ValueError(f"Baris {line_number} bukan record export (harus objek JSON)")
+        yield record
+
+
+class _TableWriter:
+    """Menampung baris satu tabel dan menulisnya per batch dengan executemany"""
+
+    def __init__(self, table: str, columns: list, primary_key: list, purge_tombstones: bool, has_tombstone_column: bool):
+        self.table = table
+        self.columns = columns
+        self.primary_key = primary_key
+        self.purge_tombstones = purge_tombstones
+        self.rows = []
+        self.tombstones = []
+
+        quoted_table = quote_identifier(table)
+        quoted_columns = ", ".join(quote_identifier(name) for name in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        update_columns = [name for name in columns if name not in primary_key] or columns[:1]
+        updates = ", ".join(f"{quote_identifier(name)} = VALUES({quote_identifier(name)})" for name in update_columns)
+        self.upsert_sql = (
+            f"INSERT INTO {quoted_table} ({quoted_columns}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+
+        key_condition = " AND ".join(f"{quote_identifier(name)} = %s" for name in primary_key)
+        if not primary_key or (not purge_tombstones and not has_tombstone_column):
+            # Tombstone tidak bisa diterapkan ke tabel ini
+            self.tombstone_sql = None
+        elif purge_tombstones:
+            self.tombstone_sql = f"DELETE FROM {quoted_table} WHERE {key_condition}"
+        else:
+            self.tombstone_sql = f"UPDATE {quoted_table} SET {quote_identifier(TOMBSTONE_COLUMN)} = %s WHERE {key_condition}"
+
+    def add_row(self, data: dict):
+        self.rows.append(tuple(data.get(name) for name in self.columns))
+
+    def add_tombstone(self, record: dict):
+        key_values = tuple(record["key"].get(name) for name in self.primary_key)
+        if self.purge_tombstones:
+            self.tombstones.append(key_values)
+        else:
+            self.tombstones.append((record.get(TOMBSTONE_COLUMN),) + key_values)
+
+    @property
+    def pending(self) -> int:
+        return len(self.rows) + len(self.tombstones)
+
+    def flush(self, cursor) -> tuple:
+        rows, tombstones = len(self.rows), len(self.tombstones)
+        if self.rows:
+            cursor.executemany(self.upsert_sql, self.rows)
+            self.rows = []
+        if self.tombstones:
+            cursor.executemany(self.tombstone_sql, self.tombstones)
+            self.tombstones = []
+        return rows, tombstones
+
+
+def check_foreign_keys(cursor, tables: Iterable[str]) -> list:
+    """Cari baris yatim untuk foreign key tabel yang di-restore (dipakai setelah FK check dimatikan)"""
+    tables = list(tables)
+    if not tables:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(tables))
+    cursor.execute(f"""
+        SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME, CONSTRAINT_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE()
+        AND REFERENCED_TABLE_NAME IS NOT NULL
+        AND TABLE_NAME IN ({placeholders})
+    """, tables)
+    constraints = cursor.fetchall()
+
+    violations = []
+    for constraint in constraints:
+        child = quote_identifier(constraint["TABLE_NAME"])
+        child_column = quote_identifier(constraint["COLUMN_NAME"])
+        parent = quote_identifier(constraint["REFERENCED_TABLE_NAME"])
+        parent_column = quote_identifier(constraint["REFERENCED_COLUMN_NAME"])
+        cursor.execute(f"""
+            SELECT COUNT(*) AS orphan_count
+            FROM {child} c
+            LEFT JOIN {parent} p ON c.{child_column} = p.{parent_column}
+            WHERE c.{child_column} IS NOT NULL AND p.{parent_column} IS NULL
+        """)
+        orphan_count = cursor.fetchone()["orphan_count"]
+        if orphan_count:
+            violations.append({
+                "constraint": constraint["CONSTRAINT_NAME"],
+                "table": constraint["TABLE_NAME"],
+                "column": constraint["COLUMN_NAME"],
+                "references": f"{constraint['REFERENCED_TABLE_NAME']}.{constraint['REFERENCED_COLUMN_NAME']}",
+                "orphan_rows": orphan_count
+            })
+    return violations
+
+
+def restore_records(
+    records: Iterable[dict],
+    batch_size: int = RESTORE_BATCH_SIZE,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    disable_foreign_keys: bool = True,
+    purge_tombstones: bool = False,
+    progress: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """
+    Terapkan record export (header/table/row/tombstone/manifest) ke database.
+    Baris ditulis per batch dengan INSERT ... ON DUPLICATE KEY UPDATE dan
+    di-commit per batch, sehingga restore bisa diulang dengan aman.
+    """
+    batch_size = max(batch_size, 1)
+    include = set(include or [])
+    exclude = set(exclude or [])
+
+    summary = {
+        "tables": {},
+        "rows": 0,
+        "tombstones": 0,
+        "batches": 0,
+        "skipped_tables": [],
+        "ignored_columns": {},
+        "manifest_verified": None,
+        "foreign_key_violations": []
+    }
+    started = time.monotonic()
+
+    connection = db.get_connection()
+    cursor = connection.cursor(dictionary=True)
+    writer = None
+    foreign_keys_disabled = False
+
+    def flush():
+        nonlocal writer
+        if writer is None or not writer.pending:
+            return
+        rows, tombstones = writer.flush(cursor)
+        connection.commit()
+        table_summary = summary["tables"].setdefault(writer.table, {"rows": 0, "tombstones": 0})
+        table_summary["rows"] += rows
+        table_summary["tombstones"] += tombstones
+        summary["rows"] += rows
+        summary["tombstones"] += tombstones
+        summary["batches"] += 1
+        if progress:
+            elapsed = time.monotonic() - started
+            progress({
+                "table": writer.table,
+                "rows": summary["rows"],
+                "tombstones": summary["tombstones"],
+                "batches": summary["batches"],
+                "elapsed_seconds": round(elapsed, 2),
+                "rows_per_second": round(summary["rows"] / elapsed, 1) if elapsed > 0 else None
+            })
+
+    try:
+        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+        existing_tables = {list(row.values())[0] for row in cursor.fetchall()}
+
+        if disable_foreign_keys:
+            # Hanya untuk sesi ini; urutan tabel di file export tidak mengikuti relasi FK
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            foreign_keys_disabled = True
+
+        manifest = None
+        for record in records:
+            record_type = record.get("type")
+
+            if record_type == "table":
+                flush()
+                writer = None
+                table = record["table"]
+
+                if table not in existing_tables or (include and table not in include) or table in exclude:
+                    summary["skipped_tables"].append(table)
+                    continue
+
+                target_columns = [column["name"] for column in get_table_columns(cursor, table)]
+                export_columns = [column["name"] for column in record.get("columns", [])]
+                columns = [name for name in export_columns if name in target_columns] or target_columns
+                ignored = [name for name in export_columns if name not in target_columns]
+                if ignored:
+                    summary["ignored_columns"][table] = ignored
+
+                primary_key = record.get("primary_key") or get_primary_key(cursor, table)
+                writer = _TableWriter(table, columns, primary_key, purge_tombstones, TOMBSTONE_COLUMN in target_columns)
+                summary["tables"].setdefault(table, {"rows": 0, "tombstones": 0})
+
+            elif record_type == "row":
+                if writer is None or record.get("table") != writer.table:
+                    continue
+                writer.add_row(record["data"])
+                if writer.pending >= batch_size:
+                    flush()
+
+            elif record_type == "tombstone":
+                if writer is None or record.get("table") != writer.table or writer.tombstone_sql is None:
+                    continue
+                writer.add_tombstone(record)
+                if writer.pending >= batch_size:
+                    flush()
+
+            elif record_type == "manifest":
+                manifest = record
+
+        flush()
+
+        if manifest is not None:
+            expected = manifest.get("tables", {})
+            summary["manifest_verified"] = all(
+                summary["tables"][table]["rows"] == counts.get("rows", 0)
+                for table, counts in expected.items()
+                if table in summary["tables"]
+            )
+        else:
+            logger.warning("Restore file tidak memiliki manifest, kemungkinan export terpotong")
+            summary["manifest_verified"] = False
+
+        if foreign_keys_disabled:
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+            foreign_keys_disabled = False
+            summary["foreign_key_violations"] = check_foreign_keys(cursor, summary["tables"].keys())
+            if summary["foreign_key_violations"]:
+                logger.warning(f"Restore selesai dengan {len(summary['foreign_key_violations'])} foreign key violation")
+
+        elapsed = time.monotonic() - started
+        summary["duration_seconds"] = round(elapsed, 3)
+        summary["rows_per_second"] = round(summary["rows"] / elapsed, 1) if elapsed > 0 else None
+        logger.info(f"Restore selesai: {summary['rows']} rows, {summary['tombstones']} tombstones dalam {summary['duration_seconds']}s")
+        return summary
+
+    except Exception as e:
+        connection.rollback()
+        summary["duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.error(f"Error during restore: {str(e)}")
+        if is_input_error(e):
+            raise RestoreInputError(str(e), summary)
+        raise RestoreError(str(e), summary)
+    finally:
+        if foreign_keys_disabled:
+            try:
+                cursor.execute("SET SESSION foreign_key_checks = 1")
+            except Exception:
+                pass
+        cursor.close()
+        connection.close()
+
+
+def restore_file(fileobj, **kwargs) -> dict:
+    """Restore dari file-like object (.ndjson / .ndjson.gz) secara streaming"""
+    stream = open_export_stream(fileobj)
+    try:
+        return restore_records(iter_export_records(stream), **kwargs)
+    finally:
+        stream.detach()
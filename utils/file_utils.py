@@ -2,11 +2,12 @@ import os, re, shutil, unicodedata
 from uuid import uuid4
 from fastapi import UploadFile, HTTPException
 import logging
+from utils.startup import register_upload_dirs
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+register_upload_dirs(UPLOAD_DIR)
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename to remove special characters"""
@@ -0,0 +1,201 @@
+"""
+Ringkasan ketersediaan unit per barang (tabel item_availability).
+
+Setiap perubahan status unit di item_units ikut menggeser counter di
+item_availability dalam transaksi yang sama, sehingga katalog bisa membaca
+jumlah tersedia/dipinjam/rusak semua barang tanpa GROUP BY atas item_units.
+
+Urutan lock selalu: baris items (hanya jika perlu, mis. menambah unit), lalu
+baris item_units (SELECT ... FOR UPDATE), baru baris item_availability, agar
+dua transaksi pada barang yang sama tidak deadlock. Locking read atas
+item_units tidak boleh join ke items, karena akan mengunci items setelah
+item_units; begitu juga baris ringkasan yang dibuat saat lock item_units
+sudah dipegang (UNIT_UPSERT_QUERY hanya membaca item_units).
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from config.database import db
+from models.enums import StatusUnit
+
+logger = logging.getLogger(__name__)
+
+# Status unit -> kolom counter; status di luar enum masuk "lainnya"
+STATUS_COLUMNS = {
+    StatusUnit.TERSEDIA.value: "tersedia",
+    StatusUnit.MENUNGGU.value: "menunggu",
+    StatusUnit.DIPINJAM.value: "dipinjam",
+    StatusUnit.RUSAK.value: "rusak",
+}
+OTHER_COLUMN = "lainnya"
+COUNTER_COLUMNS = ["total"] + list(STATUS_COLUMNS.values()) + [OTHER_COLUMN]
+
+
+def status_column(status) -> str:
+    return STATUS_COLUMNS.get(status, OTHER_COLUMN)
+
+
+def _unit_counters() -> str:
+    """COUNT + SUM per status atas alias u (item_units); status di luar enum masuk lainnya"""
+    known = ", ".join(f"'{status}'" for status in STATUS_COLUMNS)
+    counters = [f"COALESCE(SUM(u.status = '{status}'), 0)" for status in STATUS_COLUMNS]
+    counters.append(f"COALESCE(SUM(u.id IS NOT NULL AND (u.status IS NULL OR u.status NOT IN ({known}))), 0)")
+    return f"COUNT(u.id), {', '.join(counters)}"
+
+
+def _aggregate_select(where: str = "") -> str:
+    """SELECT barang_id + semua counter dari item_units (LEFT JOIN agar barang tanpa unit bernilai 0)"""
+    return f"""
+        SELECT i.id, {_unit_counters()}
+        FROM items i
+        LEFT JOIN item_units u ON u.barang_id = i.id
+        {where}
+        GROUP BY i.id
+    """
+
+
+def _upsert_query(select: str) -> str:
+    columns = ", ".join(COUNTER_COLUMNS)
+    updates = ", ".join(f"{column} = VALUES({column})" for column in COUNTER_COLUMNS)
+    return f"""
+        INSERT INTO item_availability (barang_id, {columns})
+        {select}
+        ON DUPLICATE KEY UPDATE {updates}
+    """
+
+
+# Satu barang, hanya dari item_units (tanpa join ke items): dipakai saat lock
+# item_units sudah dipegang, agar tidak mengunci items setelah item_units
+UNIT_UPSERT_QUERY = _upsert_query(f"""
+        SELECT %s, {_unit_counters()}
+        FROM item_units u
+        WHERE u.barang_id = %s
+""")
+
+
+def _backfill(cursor) -> int:
+    """Isi baris hanya untuk barang yang belum ada di ringkasan (tabel baru / barang baru)"""
+    cursor.execute(_upsert_query(_aggregate_select(
+        "WHERE NOT EXISTS (SELECT 1 FROM item_availability a WHERE a.barang_id = i.id)"
+    )))
+    if cursor.rowcount:
+        logger.info(f"item_availability: {cursor.rowcount} barang di-backfill")
+    return cursor.rowcount
+
+
+def backfill_item_availability() -> int:
+    """
+    Backfill di transaksi sendiri, untuk barang yang ditambahkan ke items
+    setelah startup (mis. lewat import). Tidak ada lock item_units yang
+    dipegang, jadi join ke items di sini aman.
+    """
+    connection = db.get_connection()
+    cursor = connection.cursor()
+
+    try:
+        backfilled = _backfill(cursor)
+        connection.commit()
+        return backfilled
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def create_item_availability_table():
+    """Buat tabel ringkasan dan isi baris untuk barang yang belum punya counter"""
+    connection = db.get_connection()
+    cursor = connection.cursor()
+
+    try:
+        counter_columns = ",\n".join(f"                {column} INT NOT NULL DEFAULT 0" for column in COUNTER_COLUMNS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS item_availability (
+                barang_id INT PRIMARY KEY,
+{counter_columns},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+
+        _backfill(cursor)
+        connection.commit()
+
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error creating item_availability table: {str(e)}")
+        # Re-raise agar ensure_schema tidak menandai tabel sudah siap
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def refresh_item_availability(cursor, barang_ids: Iterable[int] = None) -> int:
+    """
+    Hitung ulang counter dari item_units (semua barang jika barang_ids None).
+    Dipakai untuk barang yang belum punya baris dan untuk rebuild manual jika
+    item_units diubah di luar API ini.
+    """
+    if barang_ids is None:
+        cursor.execute(_upsert_query(_aggregate_select()))
+        return cursor.rowcount
+
+    barang_ids = list(barang_ids)
+    if not barang_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(barang_ids))
+    cursor.execute(_upsert_query(_aggregate_select(f"WHERE i.id IN ({placeholders})")), tuple(barang_ids))
+    return cursor.rowcount
+
+
+def lock_unit_statuses(cursor, barang_id: int, unit_kodes: List[str]) -> Dict[str, str]:
+    """kode -> status unit yang akan diubah/dihapus, dikunci sampai commit (FOR UPDATE)"""
+    if not unit_kodes:
+        return {}
+    placeholders = ", ".join(["%s"] * len(unit_kodes))
+    cursor.execute(
+        f"SELECT kode, status FROM item_units WHERE barang_id = %s AND kode IN ({placeholders}) FOR UPDATE",
+        [barang_id] + list(unit_kodes)
+    )
+    return {
+        (row["kode"] if isinstance(row, dict) else row[0]): (row["status"] if isinstance(row, dict) else row[1])
+        for row in cursor.fetchall()
+    }
+
+
+def get_item_availability(cursor, barang_id: int) -> Optional[dict]:
+    columns = ["barang_id"] + COUNTER_COLUMNS
+    cursor.execute(f"SELECT {', '.join(columns)} FROM item_availability WHERE barang_id = %s", (barang_id,))
+    row = cursor.fetchone()
+    if row is None or isinstance(row, dict):
+        return row
+    return dict(zip(columns, row))
+
+
+def apply_status_changes(cursor, barang_id: int, removed: Iterable = (), added: Iterable = ()):
+    """
+    Geser counter barang: `removed` = status unit yang hilang (dihapus / status
+    lama), `added` = status unit yang muncul (unit baru / status baru).
+    """
+    deltas: Dict[str, int] = Counter()
+    for status in removed:
+        deltas[status_column(status)] -= 1
+        deltas["total"] -= 1
+    for status in added:
+        deltas[status_column(status)] += 1
+        deltas["total"] += 1
+    deltas = {column: delta for column, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    assignments = ", ".join(f"{column} = {column} + %s" for column in deltas)
+    cursor.execute(
+        f"UPDATE item_availability SET {assignments} WHERE barang_id = %s",
+        list(deltas.values()) + [barang_id]
+    )
+    if cursor.rowcount == 0:
+        # Belum ada baris ringkasan (mis. barang dibuat setelah backfill startup): hitung
+        # langsung dari item_units (sudah termasuk perubahan ini), tanpa menyentuh items
+        cursor.execute(UNIT_UPSERT_QUERY, (barang_id, barang_id))
@@ -0,0 +1,417 @@
+"""
+Import data JSON versi lama (kategori.json, barang.json, peminjaman.json,
+data/pengembalian/*.json) ke MySQL.
+
+File dibaca elemen demi elemen (tidak di-json.load sekaligus), id kategori
+dan user di-cache di memori, dan penulisan memakai executemany per batch
+yang di-commit per batch. Semua penulisan idempotent (upsert / insert jika
+belum ada), jadi import boleh diulang setelah gagal di tengah jalan.
+"""
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from config.database import db
+from models.enums import StatusUnit
+from utils.item_availability import create_item_availability_table, refresh_item_availability
+
+logger = logging.getLogger(__name__)
+
+# Jumlah record sumber per batch executemany + commit
+JSON_IMPORT_BATCH_SIZE = int(os.getenv("JSON_IMPORT_BATCH_SIZE", 500))
+READ_CHUNK_SIZE = 64 * 1024
+
+SOURCES = ("kategori", "barang", "peminjaman", "pengembalian")
+UPLOAD_PREFIXES = ("uploads/", "uploads\\")
+
+
+class JsonImportError(Exception):
+    """Error saat import; `summary` berisi progress yang sudah di-commit"""
+
+    def __init__(self, message: str, summary: dict):
+        super().__init__(message)
+        self.summary = summary
+
+
+def iter_json_array(fileobj, chunk_size: int = READ_CHUNK_SIZE) -> Iterator:
+    """Yield elemen array JSON top-level satu per satu tanpa memuat seluruh file"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Lewati whitespace dan pemisah antar elemen
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+
+        if position >= len(buffer):
+            if eof:
+                raise ValueError("File JSON terpotong (array tidak ditutup)")
+            chunk = fileobj.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("File JSON harus berupa array")
+            started = True
+            position += 1
+            continue
+
+        if buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Elemen belum lengkap di buffer: baca chunk berikutnya
+            chunk = fileobj.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield value
+        position = end
+        if position > chunk_size:
+            buffer = buffer[position:]
+            position = 0
+
+
+def iter_json_file(path: str) -> Iterator:
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_json_array(f)
+
+
+def iter_batches(records: Iterable, batch_size: int) -> Iterator[list]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def normalize_upload_path(path: Optional[str]) -> Optional[str]:
+    """Simpan path foto tanpa prefix uploads/ (format yang dipakai route)"""
+    if path and path.startswith(UPLOAD_PREFIXES):
+        return path[len("uploads/"):]
+    return path
+
+
+def _category_name(record) -> Optional[str]:
+    name = record.get("nama") if isinstance(record, dict) else record
+    return name.strip() if isinstance(name, str) and name.strip() else None
+
+
+class _CategoryCache:
+    """
+    nama kategori -> id; kategori baru dibuat sekaligus per batch. Key
+    lower-case karena collation MySQL tidak membedakan huruf besar/kecil.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        cursor.execute("SELECT id, nama FROM categories")
+        self.ids: Dict[str, int] = {row["nama"].lower(): row["id"] for row in cursor.fetchall()}
+        self.created = 0
+
+    def get(self, name: Optional[str]) -> Optional[int]:
+        return self.ids.get(name.lower()) if name else None
+
+    def ensure(self, names: Iterable[str]) -> int:
+        missing = {}
+        for name in names:
+            if name and name.lower() not in self.ids:
+                missing.setdefault(name.lower(), name)
+        if not missing:
+            return 0
+        names = list(missing.values())
+        self.cursor.executemany("INSERT IGNORE INTO categories (nama) VALUES (%s)", [(name,) for name in names])
+        placeholders = ", ".join(["%s"] * len(names))
+        self.cursor.execute(f"SELECT id, nama FROM categories WHERE nama IN ({placeholders})", names)
+        for row in self.cursor.fetchall():
+            self.ids[row["nama"].lower()] = row["id"]
+        self.created += len(names)
+        return len(names)
+
+
+def _load_user_ids(cursor) -> Dict[str, int]:
+    """Data lama hanya menyimpan nama peminjam; cocokkan ke username, lalu nama_lengkap"""
+    cursor.execute("SELECT id, username, nama_lengkap FROM users")
+    users = {}
+    for row in cursor.fetchall():
+        users[row["username"]] = row["id"]
+        if row.get("nama_lengkap"):
+            users.setdefault(row["nama_lengkap"], row["id"])
+    return users
+
+
+def _existing_values(cursor, query: str, keys: list) -> set:
+    if not keys:
+        return set()
+    placeholders = ", ".join(["%s"] * len(keys))
+    cursor.execute(query.format(placeholders=placeholders), keys)
+    return {tuple(row.values()) if len(row) > 1 else next(iter(row.values())) for row in cursor.fetchall()}
+
+
+ITEM_UPSERT = """
+    INSERT INTO items (id, nama_barang, kategori_id, tahun_perolehan, deskripsi, foto)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        nama_barang = VALUES(nama_barang),
+        kategori_id = VALUES(kategori_id),
+        tahun_perolehan = VALUES(tahun_perolehan),
+        deskripsi = VALUES(deskripsi),
+        foto = VALUES(foto)
+"""
+
+BORROWING_COLUMNS = [
+    "id", "user_id", "barang_id", "nama_peminjam", "unit", "jumlah", "tanggal_pinjam",
+    "tanggal_kembali", "keperluan", "status", "alasan_penolakan", "tanggal_verifikasi", "created_at"
+]
+BORROWING_UPSERT = f"""
+    INSERT INTO borrowings ({', '.join(BORROWING_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(BORROWING_COLUMNS))})
+    ON DUPLICATE KEY UPDATE {', '.join(f'{column} = VALUES({column})' for column in BORROWING_COLUMNS[1:-1])},
+        created_at = COALESCE(created_at, VALUES(created_at))
+"""
+
+
+def _import_categories(cursor, categories: _CategoryCache, records: list) -> int:
+    return categories.ensure(_category_name(record) for record in records)
+
+
+def _import_items(cursor, categories: _CategoryCache, records: list) -> int:
+    categories.ensure(_category_name(item.get("kategori")) for item in records)
+
+    items = []
+    units = []
+    for item in records:
+        kategori = _category_name(item.get("kategori"))
+        items.append((
+            item["id"],
+            item["nama_barang"],
+            categories.get(kategori),
+            item.get("tahun_perolehan", 2025),
+            item.get("deskripsi", ""),
+            normalize_upload_path(item.get("foto"))
+        ))
+        for unit in item.get("stok") or []:
+            units.append((
+                item["id"],
+                unit["kode"],
+                unit.get("kondisi", "Baik"),
+                unit.get("status", StatusUnit.TERSEDIA.value)
+            ))
+    cursor.executemany(ITEM_UPSERT, items)
+
+    # Unit yang sudah ada (import sebelumnya) tidak diduplikasi
+    barang_ids = [item[0] for item in items]
+    existing = _existing_values(
+        cursor, "SELECT barang_id, kode FROM item_units WHERE barang_id IN ({placeholders})", barang_ids
+    )
+    new_units = [unit for unit in units if (unit[0], unit[1]) not in existing]
+    if new_units:
+        cursor.executemany(
+            "INSERT INTO item_units (barang_id, kode, kondisi, status) VALUES (%s, %s, %s, %s)",
+            new_units
+        )
+    refresh_item_availability(cursor, barang_ids)
+    return len(items) + len(new_units)
+
+
+def _import_borrowings(cursor, user_ids: Dict[str, int], records: list) -> int:
+    imported_at = datetime.now()
+    rows = []
+    for record in records:
+        nama = record.get("nama") or record.get("nama_peminjam")
+        rows.append((
+            record["id"],
+            record.get("user_id") or user_ids.get(nama),
+            record.get("barang_id"),
+            nama,
+            record.get("unit"),
+            record.get("jumlah", 1),
+            record.get("tanggal_pinjam"),
+            record.get("tanggal_kembali"),
+            record.get("keperluan"),
+            record.get("status"),
+            record.get("alasan_penolakan"),
+            record.get("tanggal_verifikasi"),
+            # Riwayat di-page dengan keyset atas created_at sehingga tidak boleh NULL:
+            # pakai tanggal pinjam asli, lalu tanggal lain yang ada, terakhir waktu import.
+            # created_at yang sudah ada tidak ditimpa (waktu import tidak berubah saat diulang)
+            record.get("created_at") or record.get("tanggal_pinjam")
+            or record.get("tanggal_verifikasi") or record.get("tanggal_kembali") or imported_at
+        ))
+    cursor.executemany(BORROWING_UPSERT, rows)
+    return len(rows)
+
+
+def _import_returns(cursor, records: list, summary: dict) -> int:
+    """
+    records: (borrowing_id, data pengembalian); hanya borrowing yang ada dan
+    belum punya return. Pengembalian tanpa borrowing dihitung di
+    summary["returns_skipped"].
+    """
+    borrowing_ids = list({borrowing_id for borrowing_id, _ in records})
+    borrowings = _existing_values(
+        cursor, "SELECT id FROM borrowings WHERE id IN ({placeholders})", borrowing_ids
+    )
+    existing = _existing_values(
+        cursor, "SELECT borrowing_id FROM returns WHERE borrowing_id IN ({placeholders})", borrowing_ids
+    )
+    rows = []
+    for borrowing_id, data in records:
+        if borrowing_id not in borrowings:
+            summary["returns_skipped"] += 1
+            logger.warning(f"Pengembalian {borrowing_id} dilewati: peminjaman tidak ditemukan")
+            continue
+        if borrowing_id in existing:
+            continue
+        existing.add(borrowing_id)
+        rows.append((
+            borrowing_id,
+            data.get("tanggal_pengembalian"),
+            data.get("kondisi_barang"),
+            data.get("catatan"),
+            normalize_upload_path(data.get("foto"))
+        ))
+    if rows:
+        cursor.executemany("""
+            INSERT INTO returns (borrowing_id, tanggal_pengembalian, kondisi_barang, catatan, foto)
+            VALUES (%s, %s, %s, %s, %s)
+        """, rows)
+    return len(rows)
+
+
+def iter_return_records(peminjaman_path: Optional[str], pengembalian_dir: Optional[str]) -> Iterator[tuple]:
+    """
+    (borrowing_id, data) dari folder data/pengembalian/<borrowing_id>.json,
+    lalu dari field `pengembalian` di peminjaman.json untuk yang tidak punya file.
+    """
+    seen = set()
+    if pengembalian_dir and os.path.isdir(pengembalian_dir):
+        for entry in sorted(os.scandir(pengembalian_dir), key=lambda entry: entry.name):
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+            borrowing_id = entry.name[:-len(".json")]
+            with open(entry.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                seen.add(borrowing_id)
+                yield borrowing_id, data
+
+    if peminjaman_path and os.path.exists(peminjaman_path):
+        for record in iter_json_file(peminjaman_path):
+            pengembalian = record.get("pengembalian")
+            if isinstance(pengembalian, dict) and record.get("id") not in seen:
+                seen.add(record["id"])
+                yield record["id"], pengembalian
+
+
+def import_json_sources(
+    source_dir: str,
+    batch_size: int = JSON_IMPORT_BATCH_SIZE,
+    only: Optional[Iterable[str]] = None,
+    progress: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """
+    Import semua sumber JSON di `source_dir` (urutan: kategori, barang,
+    peminjaman, pengembalian). File yang tidak ada dilewati.
+    """
+    batch_size = max(batch_size, 1)
+    only = set(only or SOURCES)
+    paths = {
+        "kategori": os.path.join(source_dir, "kategori.json"),
+        "barang": os.path.join(source_dir, "barang.json"),
+        "peminjaman": os.path.join(source_dir, "peminjaman.json"),
+        "pengembalian": os.path.join(source_dir, "data", "pengembalian"),
+    }
+
+    summary = {
+        "sources": {}, "records": 0, "rows": 0, "batches": 0, "skipped_sources": [],
+        "categories_created": 0, "returns_skipped": 0
+    }
+    started = time.monotonic()
+
+    # Pastikan tabel ringkasan ada sebelum counter barang di-refresh
+    if "barang" in only:
+        try:
+            create_item_availability_table()
+        except Exception as e:
+            raise JsonImportError(str(e), summary)
+
+    connection = db.get_connection()
+    cursor = connection.cursor(dictionary=True)
+
+    def run(source: str, records: Iterable, write: Callable[[list], int]):
+        source_summary = summary["sources"].setdefault(source, {"records": 0, "rows": 0})
+        for batch in iter_batches(records, batch_size):
+            rows = write(batch)
+            connection.commit()
+            source_summary["records"] += len(batch)
+            source_summary["rows"] += rows
+            summary["records"] += len(batch)
+            summary["rows"] += rows
+            summary["batches"] += 1
+            if progress:
+                elapsed = time.monotonic() - started
+                progress({
+                    "source": source,
+                    "records": summary["records"],
+                    "rows": summary["rows"],
+                    "batches": summary["batches"],
+                    "elapsed_seconds": round(elapsed, 2),
+                    "records_per_second": round(summary["records"] / elapsed, 1) if elapsed > 0 else None
+                })
+
+    try:
+        categories = _CategoryCache(cursor)
+
+        for source in SOURCES:
+            if source not in only:
+                continue
+            path = paths[source]
+            sources_exist = os.path.exists(path) or (source == "pengembalian" and os.path.exists(paths["peminjaman"]))
+            if not sources_exist:
+                summary["skipped_sources"].append(source)
+                continue
+
+            if source == "kategori":
+                run(source, iter_json_file(path), lambda batch: _import_categories(cursor, categories, batch))
+            elif source == "barang":
+                run(source, iter_json_file(path), lambda batch: _import_items(cursor, categories, batch))
+            elif source == "peminjaman":
+                user_ids = _load_user_ids(cursor)
+                run(source, iter_json_file(path), lambda batch: _import_borrowings(cursor, user_ids, batch))
+            elif source == "pengembalian":
+                records = iter_return_records(paths["peminjaman"], path)
+                run(source, records, lambda batch: _import_returns(cursor, batch, summary))
+
+        summary["categories_created"] = categories.created
+        elapsed = time.monotonic() - started
+        summary["duration_seconds"] = round(elapsed, 3)
+        summary["records_per_second"] = round(summary["records"] / elapsed, 1) if elapsed > 0 else None
+        logger.info(f"Import JSON selesai: {summary['records']} records, {summary['rows']} rows dalam {summary['duration_seconds']}s")
+        return summary
+
+    except Exception as e:
+        connection.rollback()
+        summary["duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.error(f"Error during JSON import: {str(e)}")
+        raise JsonImportError(str(e), summary)
+    finally:
+        cursor.close()
+        connection.close()
@@ -0,0 +1,140 @@
+import json
+import inspect
+import functools
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from uuid import UUID
+from typing import Any, Callable
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.utils import get_typed_return_annotation
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback jika orjson belum terpasang
+    orjson = None
+
+
+def _default(value: Any):
+    """Tipe yang tidak di-handle orjson secara native (hasil mysql-connector, pydantic, dll)"""
+    # Decimal tetap jadi number (bukan string) agar kompatibel dengan response lama
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", errors="replace")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, PurePath):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_default(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return _default(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(
+            content, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse berbasis orjson: Decimal, datetime, date, UUID dan bytes hasil
+    query langsung di-encode tanpa konversi per baris di route.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _accepts_response_param(endpoint: Callable) -> bool:
+    """Endpoint yang menerima parameter Response (untuk set header/cookie) tetap lewat jalur standar"""
+    try:
+        parameters = inspect.signature(endpoint).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(
+        inspect.isclass(parameter.annotation) and issubclass(parameter.annotation, Response)
+        for parameter in parameters
+    )
+
+
+def _can_bypass_encoder(endpoint: Callable, response_model: Any, response_class: Any) -> bool:
+    if isinstance(response_model, DefaultPlaceholder):
+        response_model = get_typed_return_annotation(endpoint)
+    if response_model is not None and not (inspect.isclass(response_model) and issubclass(response_model, Response)):
+        return False
+    if isinstance(response_class, DefaultPlaceholder):
+        response_class = response_class.value
+    if response_class not in (JSONResponse, FastJSONResponse):
+        return False
+    return not _accepts_response_param(endpoint)
+
+
+def wrap_endpoint(endpoint: Callable, status_code: int = 200) -> Callable:
+    """
+    Bungkus endpoint agar hasil non-Response langsung jadi FastJSONResponse.
+    FastAPI memakai Response yang dikembalikan apa adanya, sehingga
+    jsonable_encoder (yang menyalin seluruh struktur data) dilewati.
+    Signature asli tetap terbaca lewat __wrapped__ untuk dependency injection.
+    """
+    if getattr(endpoint, "__fast_json__", False):
+        # include_router membuat ulang route dengan endpoint yang sudah dibungkus
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code)
+        async_wrapper.__fast_json__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        result = endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return FastJSONResponse(result, status_code=status_code)
+    sync_wrapper.__fast_json__ = True
+    return sync_wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    APIRoute yang melewati jsonable_encoder untuk endpoint tanpa response_model.
+    Route dengan response_model, response_class lain atau parameter Response
+    tetap memakai jalur standar FastAPI.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        response_model = kwargs.get("response_model", DefaultPlaceholder(None))
+        response_class = kwargs.get("response_class", DefaultPlaceholder(JSONResponse))
+        if _can_bypass_encoder(endpoint, response_model, response_class):
+            endpoint = wrap_endpoint(endpoint, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,131 @@
+"""
+Query dan facet untuk /kelas/public/browse, semuanya dari read model
+kelas_card (satu tabel, kolom filter/urutan ber-index).
+
+Harga kelas = harga tiket aktif termurah, atau kelas.biaya jika kelas belum
+punya tiket aktif (kolom harga_mulai). Facet (jumlah kelas per kategori dan
+bucket harga) di-cache per kombinasi filter sampai versi data kelas /
+tiket_kategori berubah (utils.data_version).
+"""
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+from config.async_database import async_db
+from utils.data_version import KELAS, TIKET, get_data_versions
+
+logger = logging.getLogger(__name__)
+
+# Batas bawah bucket harga (rupiah); bucket pertama mulai dari 0, terakhir tanpa batas atas
+KELAS_PRICE_BUCKETS = [
+    int(edge) for edge in os.getenv("KELAS_PRICE_BUCKETS", "100000,250000,500000,1000000").split(",") if edge.strip()
+]
+BROWSE_FACET_CACHE_SIZE = int(os.getenv("BROWSE_FACET_CACHE_SIZE", 256))
+
+SORT_OPTIONS = {
+    "price": "harga_mulai ASC, kelas_id ASC",
+    "newest": "created_at DESC, kelas_id DESC",
+    # jadwal disimpan "YYYY-MM-DD HH:MM" sehingga urutan string = urutan waktu; kosong di akhir
+    "schedule": "(jadwal IS NULL OR jadwal = '') ASC, jadwal ASC, kelas_id ASC",
+}
+
+_facet_cache: Dict[tuple, dict] = {}
+_facet_cache_version: Optional[tuple] = None
+
+
+def browse_conditions(
+    kategori: Optional[List[str]] = None,
+    harga_min: Optional[float] = None,
+    harga_max: Optional[float] = None
+) -> Tuple[List[str], list]:
+    conditions = []
+    params = []
+    if kategori:
+        conditions.append(f"kategori IN ({', '.join(['%s'] * len(kategori))})")
+        params.extend(kategori)
+    if harga_min is not None:
+        conditions.append("harga_mulai >= %s")
+        params.append(harga_min)
+    if harga_max is not None:
+        conditions.append("harga_mulai <= %s")
+        params.append(harga_max)
+    return conditions, params
+
+
+def where_clause(conditions: List[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def price_buckets() -> List[tuple]:
+    edges = [0] + sorted(KELAS_PRICE_BUCKETS)
+    return [(low, edges[i + 1] if i + 1 < len(edges) else None) for i, low in enumerate(edges)]
+
+
+async def _compute_facets(kategori: List[str], harga_min: Optional[float], harga_max: Optional[float]) -> dict:
+    # Facet kategori mengikuti filter harga saja, facet harga mengikuti filter kategori saja,
+    # agar pilihan lain tetap terlihat di UI filter
+    conditions, params = browse_conditions(harga_min=harga_min, harga_max=harga_max)
+    kategori_rows = await async_db.fetch_all(f"""
+        SELECT kategori AS nama, COUNT(*) AS jumlah
+        FROM kelas_card
+        {where_clause(conditions)}
+        GROUP BY kategori
+        ORDER BY kategori
+    """, params)
+
+    buckets = price_buckets()
+    bucket_columns = [
+        f"COALESCE(SUM(harga_mulai >= {low}{f' AND harga_mulai < {high}' if high is not None else ''}), 0) AS bucket_{i}"
+        for i, (low, high) in enumerate(buckets)
+    ]
+    conditions, params = browse_conditions(kategori=kategori)
+    harga_row = await async_db.fetch_one(f"""
+        SELECT MIN(harga_mulai) AS harga_min, MAX(harga_mulai) AS harga_max, {', '.join(bucket_columns)}
+        FROM kelas_card
+        {where_clause(conditions)}
+    """, params) or {}
+
+    return {
+        "kategori": [{"nama": row["nama"], "jumlah": row["jumlah"]} for row in kategori_rows],
+        "harga": {
+            "min": harga_row.get("harga_min"),
+            "max": harga_row.get("harga_max"),
+            "buckets": [
+                {"min": low, "max": high, "jumlah": int(harga_row.get(f"bucket_{i}") or 0)}
+                for i, (low, high) in enumerate(buckets)
+            ]
+        }
+    }
+
+
+async def get_browse_facets(
+    kategori: Optional[List[str]] = None,
+    harga_min: Optional[float] = None,
+    harga_max: Optional[float] = None
+) -> dict:
+    global _facet_cache_version
+    kategori = sorted({nama.strip() for nama in kategori or [] if nama and nama.strip()})
+    key = (tuple(nama.lower() for nama in kategori), harga_min, harga_max)
+
+    versions = await get_data_versions()
+    version = (versions.get(KELAS, 0), versions.get(TIKET, 0)) if versions is not None else None
+    if version is not None and version != _facet_cache_version:
+        _facet_cache.clear()
+        _facet_cache_version = version
+    if version is not None and key in _facet_cache:
+        return _facet_cache[key]
+
+    facets = await _compute_facets(kategori, harga_min, harga_max)
+    if version is not None and version == _facet_cache_version:
+        if len(_facet_cache) >= BROWSE_FACET_CACHE_SIZE:
+            _facet_cache.clear()
+        _facet_cache[key] = facets
+    return facets
+
+
+def facet_total(facets: dict, kategori: Optional[List[str]] = None) -> int:
+    """Jumlah kelas yang cocok dengan semua filter, dihitung dari facet kategori (tanpa COUNT tambahan)"""
+    selected = {nama.strip().lower() for nama in kategori or [] if nama and nama.strip()}
+    return sum(
+        row["jumlah"] for row in facets["kategori"]
+        if not selected or (row["nama"] or "").lower() in selected
+    )
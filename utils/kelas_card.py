@@ -0,0 +1,252 @@
+"""
+Read model kelas_card: satu baris per kelas berisi dokumen JSON kartu kelas
+yang sudah jadi (nama kategori, URL foto & galeri, rentang harga tiket
+aktif) plus kolom ber-index untuk filter dan urutan.
+
+Baris di-refresh di transaksi yang sama dengan penulisan kelas,
+tiket_kategori dan kategori, sehingga listing publik cukup membaca satu
+tabel dan menyambung card_json tanpa join, parse JSON atau membangun URL
+per baris.
+
+Urutan lock writer: baris kelas (lock_kelas) dulu, lalu tiket_kategori, baru
+kelas_card. Sumber kartu dibaca dengan locking read agar kartu selalu
+dihitung dari tiket committed terbaru.
+"""
+import json
+import logging
+from typing import Iterable, List, Optional
+from starlette.responses import Response
+from config.database import db
+from config.async_database import ensure_schema_sync
+from utils.json_response import dumps
+from utils.startup import on_startup
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_URL = "http://localhost:8000/uploads/"
+
+# Locking read (LOCK IN SHARE MODE, juga dikenal MariaDB/MySQL 5.7): membaca versi
+# committed terbaru, bukan snapshot REPEATABLE READ yang bisa sudah diambil sebelum
+# writer lain commit, sehingga agregat tiket tidak kehilangan perubahan paralel
+CARD_SOURCE_QUERY = """
+    SELECT
+        k.id,
+        k.nama_kelas,
+        k.deskripsi,
+        k.jadwal,
+        k.ruangan,
+        k.biaya,
+        k.foto,
+        k.total_peserta,
+        k.link_navigasi,
+        k.is_link_eksternal,
+        k.created_at,
+        k.gambaran_event,
+        k.kategori_id,
+        c.nama as kategori
+    FROM kelas k
+    LEFT JOIN categories c ON k.kategori_id = c.id
+    {where}
+    LOCK IN SHARE MODE
+"""
+
+TIKET_AGGREGATE_QUERY = """
+    SELECT kelas_id, MIN(harga) AS harga_min, MAX(harga) AS harga_max, COUNT(*) AS tiket_aktif
+    FROM tiket_kategori
+    WHERE kelas_id IN ({placeholders}) AND (is_active IS NULL OR is_active = TRUE)
+    GROUP BY kelas_id
+    LOCK IN SHARE MODE
+"""
+
+CARD_UPSERT = """
+    INSERT INTO kelas_card
+        (kelas_id, kategori_id, kategori, jadwal, harga_mulai, harga_maks, tiket_aktif, created_at, card_json)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        kategori_id = VALUES(kategori_id),
+        kategori = VALUES(kategori),
+        jadwal = VALUES(jadwal),
+        harga_mulai = VALUES(harga_mulai),
+        harga_maks = VALUES(harga_maks),
+        tiket_aktif = VALUES(tiket_aktif),
+        created_at = VALUES(created_at),
+        card_json = VALUES(card_json)
+"""
+
+
+def create_kelas_card_table():
+    """Buat tabel read model dan isi kartu untuk kelas yang belum punya"""
+    connection = db.get_connection()
+    cursor = connection.cursor(dictionary=True)
+
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS kelas_card (
+                kelas_id INT PRIMARY KEY,
+                kategori_id INT,
+                kategori VARCHAR(100),
+                jadwal VARCHAR(255),
+                harga_mulai DECIMAL(12, 2) DEFAULT 0,
+                harga_maks DECIMAL(12, 2) DEFAULT 0,
+                tiket_aktif INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP NULL,
+                card_json MEDIUMTEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_card_kategori_created (kategori, created_at),
+                INDEX idx_card_created (created_at),
+                INDEX idx_card_harga (harga_mulai),
+                INDEX idx_card_jadwal (jadwal)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+
+        # Agregasi harga per kelas saat refresh cukup membaca index ini. Cek lewat
+        # information_schema (satu baris): SHOW INDEX mengembalikan satu baris per kolom
+        cursor.execute("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            LIMIT 1
+        """, ("tiket_kategori", "idx_tiket_kelas_active_harga"))
+        if cursor.fetchone() is None:
+            cursor.execute("CREATE INDEX idx_tiket_kelas_active_harga ON tiket_kategori (kelas_id, is_active, harga)")
+
+        refreshed = _refresh(cursor, "WHERE NOT EXISTS (SELECT 1 FROM kelas_card kc WHERE kc.kelas_id = k.id)")
+        if refreshed:
+            logger.info(f"kelas_card: {refreshed} kelas di-backfill")
+        connection.commit()
+
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Error creating kelas_card table: {str(e)}")
+        # Re-raise agar ensure_schema tidak menandai tabel sudah siap
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+
+
+on_startup(create_kelas_card_table)
+
+
+def gambaran_event_urls(raw) -> List[str]:
+    if not raw:
+        return []
+    try:
+        files = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return [f"{UPLOADS_URL}{foto}" for foto in files if foto] if isinstance(files, list) else []
+
+
+def build_card(row: dict) -> dict:
+    """Dokumen kartu kelas; field sama dengan /kelas/public/all ditambah rentang harga tiket"""
+    harga_mulai = row["harga_min"] if row["harga_min"] is not None else row["biaya"]
+    harga_maks = row["harga_max"] if row["harga_max"] is not None else row["biaya"]
+    return {
+        "id": row["id"],
+        "nama_kelas": row["nama_kelas"],
+        "deskripsi": row["deskripsi"],
+        "jadwal": row["jadwal"],
+        "ruangan": row["ruangan"],
+        "biaya": row["biaya"],
+        "foto": row["foto"],
+        "total_peserta": row["total_peserta"],
+        "link_navigasi": row["link_navigasi"],
+        "is_link_eksternal": row["is_link_eksternal"],
+        "created_at": row["created_at"],
+        "kategori": row["kategori"],
+        "foto_url": f"{UPLOADS_URL}{row['foto']}" if row["foto"] is not None else None,
+        "kuota": row["total_peserta"],
+        "durasi": "2 jam",
+        "gambaran_event_urls": gambaran_event_urls(row["gambaran_event"]),
+        "harga_mulai": harga_mulai,
+        "harga_maks": harga_maks,
+        "tiket_aktif": row["tiket_aktif"],
+    }
+
+
+def _fetch_dicts(cursor) -> List[dict]:
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0], dict):
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in rows]
+    return rows
+
+
+def _refresh(cursor, where: str = "", params: Iterable = ()) -> int:
+    cursor.execute(CARD_SOURCE_QUERY.format(where=where), list(params))
+    rows = _fetch_dicts(cursor)
+    if not rows:
+        return 0
+
+    kelas_ids = [row["id"] for row in rows]
+    cursor.execute(TIKET_AGGREGATE_QUERY.format(placeholders=", ".join(["%s"] * len(kelas_ids))), kelas_ids)
+    tiket = {row["kelas_id"]: row for row in _fetch_dicts(cursor)}
+
+    values = []
+    for row in rows:
+        harga = tiket.get(row["id"], {})
+        row["harga_min"] = harga.get("harga_min")
+        row["harga_max"] = harga.get("harga_max")
+        row["tiket_aktif"] = harga.get("tiket_aktif", 0)
+        card = build_card(row)
+        values.append((
+            row["id"], row["kategori_id"], row["kategori"], row["jadwal"], card["harga_mulai"],
+            card["harga_maks"], row["tiket_aktif"], row["created_at"], dumps(card).decode("utf-8")
+        ))
+    cursor.executemany(CARD_UPSERT, values)
+    return len(values)
+
+
+def lock_kelas(cursor, kelas_ids: Iterable[int]):
+    """
+    Kunci baris kelas (FOR UPDATE, urut id) di awal writer yang mengubah
+    tiket_kategori/kelas, sebelum baris tiket disentuh: writer untuk kelas
+    yang sama berjalan bergantian sehingga locking read agregat tiket di
+    refresh_kelas_cards tidak saling menunggu (deadlock) dengan writer lain.
+    """
+    kelas_ids = sorted({int(kelas_id) for kelas_id in kelas_ids if kelas_id is not None})
+    if not kelas_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(kelas_ids))
+    cursor.execute(f"SELECT id FROM kelas WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE", kelas_ids)
+    cursor.fetchall()
+
+
+def refresh_kelas_cards(cursor, kelas_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Hitung ulang kartu kelas_ids (semua kelas jika None) di transaksi
+    pemanggil; kartu untuk kelas yang sudah tidak ada ikut dihapus. Writer
+    tiket_kategori memanggil lock_kelas lebih dulu.
+    """
+    # DDL lewat koneksi terpisah: CREATE TABLE di transaksi ini akan implicit commit
+    ensure_schema_sync(create_kelas_card_table)
+
+    if kelas_ids is None:
+        refreshed = _refresh(cursor)
+        cursor.execute("DELETE FROM kelas_card WHERE kelas_id NOT IN (SELECT id FROM kelas)")
+        return refreshed
+
+    kelas_ids = sorted({int(kelas_id) for kelas_id in kelas_ids if kelas_id is not None})
+    if not kelas_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(kelas_ids))
+    refreshed = _refresh(cursor, f"WHERE k.id IN ({placeholders})", kelas_ids)
+    if refreshed < len(kelas_ids):
+        cursor.execute(
+            f"DELETE FROM kelas_card WHERE kelas_id IN ({placeholders}) AND kelas_id NOT IN (SELECT id FROM kelas)",
+            kelas_ids
+        )
+    return refreshed
+
+
+def cards_response(cards: Iterable[str], extra: Optional[dict] = None, key: str = "items") -> Response:
+    """
+    Sambung card_json apa adanya menjadi body response: list JSON, atau
+    objek {key: [...], **extra} jika extra diberikan.
+    """
+    items = b"[" + ",".join(cards).encode("utf-8") + b"]"
+    if extra:
+        body = b'{"' + key.encode("utf-8") + b'":' + items + b"," + dumps(extra)[1:]
+    else:
+        body = items
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,279 @@
+"""
+Indeks pencarian kelas in-memory (inverted index + BM25).
+
+Dipilih daripada FULLTEXT MySQL karena FULLTEXT tidak mengenal imbuhan
+bahasa Indonesia (memasak vs masak), punya panjang token minimum dan tidak
+mendukung autocomplete prefix dengan ranking. Data kelas kecil, jadi indeks
+dibangun ulang utuh setiap versi data "kelas" berubah (lihat
+utils.data_version) dan query dilayani tanpa akses DB.
+"""
+import re
+import math
+import time
+import asyncio
+import bisect
+import logging
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from config.async_database import async_db
+from utils.data_version import DATA_VERSION_CHECK_SECONDS, KELAS, get_data_versions
+
+logger = logging.getLogger(__name__)
+
+# Bobot field untuk BM25F: judul paling menentukan relevansi
+FIELD_WEIGHTS = {
+    "nama_kelas": 3.0,
+    "kategori": 2.0,
+    "ruangan": 1.5,
+    "deskripsi": 1.0,
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Jumlah kata maksimum hasil ekspansi prefix untuk token terakhir query
+PREFIX_EXPANSIONS = 20
+
+STOPWORDS = {
+    "ada", "adalah", "agar", "akan", "anda", "atau", "bagi", "bahwa", "bisa", "dalam", "dan",
+    "dapat", "dari", "dengan", "di", "hal", "harus", "ini", "itu", "jadi", "juga", "ke", "kami",
+    "kita", "lebih", "oleh", "pada", "para", "saat", "sampai", "secara", "sehingga", "serta",
+    "setiap", "sudah", "tanpa", "tentang", "untuk", "yang",
+}
+VOWELS = "aeiou"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+KELAS_SEARCH_QUERY = """
+    SELECT
+        k.id,
+        k.nama_kelas,
+        k.deskripsi,
+        k.jadwal,
+        k.ruangan,
+        k.biaya,
+        k.foto,
+        k.total_peserta,
+        k.link_navigasi,
+        k.is_link_eksternal,
+        k.created_at,
+        c.nama as kategori,
+        CONCAT('http://localhost:8000/uploads/', k.foto) as foto_url
+    FROM kelas k
+    LEFT JOIN categories c ON k.kategori_id = c.id
+"""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Huruf kecil, tanpa aksen, pisah di karakter non-alfanumerik, buang stopword"""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii").lower()
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+
+
+def _strip_prefix(word: str) -> Iterable[str]:
+    """Kandidat kata dasar tanpa awalan (dengan peluluhan me-/pe- yang umum)"""
+    for prefix in ("meng", "peng"):
+        if word.startswith(prefix) and len(word) > 6:
+            rest = word[4:]
+            yield rest
+            if rest[0] in VOWELS:
+                yield "k" + rest
+            return
+    for prefix in ("meny", "peny"):
+        if word.startswith(prefix) and len(word) > 6:
+            yield "s" + word[4:]
+            return
+    for prefix in ("mem", "pem"):
+        if word.startswith(prefix) and len(word) > 5:
+            rest = word[3:]
+            if rest[0] in "bfpv":
+                yield rest
+            elif rest[0] in VOWELS:
+                yield "p" + rest
+                yield "m" + rest
+            return
+    for prefix in ("men", "pen"):
+        if word.startswith(prefix) and len(word) > 5:
+            rest = word[3:]
+            if rest[0] in "cdjtz":
+                yield rest
+            elif rest[0] in VOWELS:
+                yield "t" + rest
+                yield "n" + rest
+            return
+    for prefix in ("ber", "ter", "per"):
+        if word.startswith(prefix) and len(word) > 6:
+            yield word[3:]
+            return
+    for prefix in ("me", "pe"):
+        if word.startswith(prefix) and len(word) > 5 and word[2] in "lrwymn":
+            yield word[2:]
+            return
+    for prefix in ("di", "ke", "se"):
+        if word.startswith(prefix) and len(word) > 5:
+            yield word[2:]
+            return
+
+
+def word_variants(token: str) -> Set[str]:
+    """
+    Token + kandidat kata dasarnya (partikel, kata ganti, akhiran, awalan).
+    Tanpa kamus kata dasar, jadi semua kandidat diindeks dan query cukup
+    cocok dengan salah satunya: "memasak" -> {memasak, masak, pasak}.
+    """
+    variants = {token}
+    word = token
+    for suffixes in (("lah", "kah", "tah", "pun"), ("nya", "ku", "mu")):
+        for suffix in suffixes:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[:-len(suffix)]
+                break
+    forms = [word]
+    # "masakan" bisa masak+an atau masa+kan: simpan semua kandidat
+    for suffix in ("kan", "an", "i"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            forms.append(word[:-len(suffix)])
+    for form in forms:
+        variants.add(form)
+        variants.update(_strip_prefix(form))
+    return {variant for variant in variants if len(variant) >= 3 or variant == token}
+
+
+class KelasSearchIndex:
+    def __init__(self, rows: List[dict], version: Optional[int] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.docs: Dict[int, dict] = {}
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.doc_lengths: Dict[int, float] = {}
+        self.kategori: Dict[int, str] = {}
+        word_df: Counter = Counter()
+
+        for row in rows:
+            doc_id = row["id"]
+            self.docs[doc_id] = row
+            self.kategori[doc_id] = (row.get("kategori") or "").lower()
+            weighted_tf: Dict[str, float] = defaultdict(float)
+            length = 0.0
+            words = set()
+            for field, weight in FIELD_WEIGHTS.items():
+                tokens = tokenize(row.get(field))
+                length += weight * len(tokens)
+                for token in tokens:
+                    words.add(token)
+                    for term in word_variants(token):
+                        weighted_tf[term] += weight
+            for term, tf in weighted_tf.items():
+                self.postings[term][doc_id] = tf
+            self.doc_lengths[doc_id] = length
+            word_df.update(words)
+
+        self.postings = dict(self.postings)
+        self.average_length = (sum(self.doc_lengths.values()) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        # Kosakata kata asli (bukan kandidat kata dasar) terurut untuk autocomplete
+        self.words = sorted(word_df)
+        self.word_df = dict(word_df)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def _score_terms(self, terms: Iterable[str]) -> Dict[int, float]:
+        """Skor BM25 satu token query; jika beberapa term cocok di satu doc, ambil yang tertinggi"""
+        scores: Dict[int, float] = {}
+        average_length = self.average_length or 1.0
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def complete(self, prefix: str, limit: int = PREFIX_EXPANSIONS) -> List[str]:
+        """Kata di kosakata yang diawali prefix, paling sering muncul dulu"""
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(self.words, prefix + "\uffff")
+        matches = self.words[start:end]
+        if len(matches) > limit:
+            matches = sorted(matches, key=lambda word: (-self.word_df[word], word))[:limit]
+        return matches
+
+    def search(self, query: str, limit: int = 20, kategori: Optional[str] = None, prefix: bool = True) -> List[tuple]:
+        """
+        (doc_id, skor) terurut relevansi. Token terakhir diperlakukan sebagai
+        prefix (search-as-you-type) kecuali query diakhiri spasi. Doc yang
+        cocok dengan lebih banyak token query diberi bobot lebih.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        per_token = []
+        for position, token in enumerate(tokens):
+            terms = word_variants(token)
+            is_last = position == len(tokens) - 1
+            if prefix and is_last and not query[-1:].isspace():
+                terms |= set(self.complete(token))
+            per_token.append(self._score_terms(terms))
+
+        totals: Dict[int, float] = defaultdict(float)
+        matched: Counter = Counter()
+        for scores in per_token:
+            for doc_id, score in scores.items():
+                totals[doc_id] += score
+                matched[doc_id] += 1
+
+        kategori = kategori.lower() if kategori else None
+        results = [
+            (doc_id, total * matched[doc_id] / len(tokens))
+            for doc_id, total in totals.items()
+            if kategori is None or self.kategori[doc_id] == kategori
+        ]
+        results.sort(key=lambda item: (-item[1], -item[0]))
+        return results[:limit]
+
+
+class KelasSearch:
+    """Pegang indeks aktif dan bangun ulang saat versi data kelas berubah"""
+
+    def __init__(self):
+        self._index: Optional[KelasSearchIndex] = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, version: Optional[int]) -> bool:
+        index = self._index
+        if index is None:
+            return False
+        if version is None:
+            # Versi tidak terbaca: perlakukan umur indeks sebagai TTL
+            return time.monotonic() - index.built_at < DATA_VERSION_CHECK_SECONDS
+        return index.version == version
+
+    async def get_index(self) -> KelasSearchIndex:
+        versions = await get_data_versions()
+        version = versions.get(KELAS, 0) if versions is not None else None
+        if self._is_fresh(version):
+            return self._index
+        async with self._lock:
+            if not self._is_fresh(version):
+                started = time.perf_counter()
+                rows = await async_db.fetch_all(KELAS_SEARCH_QUERY)
+                self._index = KelasSearchIndex(rows, version)
+                logger.info(
+                    f"Indeks pencarian kelas dibangun: {len(rows)} kelas, {len(self._index.postings)} term "
+                    f"dalam {(time.perf_counter() - started) * 1000:.1f}ms"
+                )
+        return self._index
+
+
+kelas_search = KelasSearch()
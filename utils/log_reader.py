@@ -0,0 +1,334 @@
+import os
+import re
+import gzip
+import json
+import bisect
+import logging
+import threading
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+
+# Ukuran blok saat membaca file dari belakang
+TAIL_BLOCK_SIZE = 64 * 1024
+# Jarak antar titik di sparse index waktu -> offset
+LOG_INDEX_STEP = int(os.getenv("LOG_INDEX_STEP", 256 * 1024))
+# Batas jumlah baris yang diperiksa per request agar query tanpa hasil tetap cepat selesai
+LOG_SCAN_LIMIT = int(os.getenv("LOG_SCAN_LIMIT", 200000))
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# Format teks: "2026-02-01 10:00:00,123 - routes.kelas - INFO - pesan"
+# atau format default logging: "INFO:routes.kelas:pesan"
+_TEXT_LINE = re.compile(
+    r"^(?P<timestamp>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[,.]\d+)?)"
+    r"(?:\s*-\s*(?P<logger>[\w.\-]+))?"
+    r"\s*-?\s*(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL)\b\s*-?\s*(?P<message>.*)$"
+)
+_BASIC_LINE = re.compile(r"^(?P<level>DEBUG|INFO|WARNING|ERROR|CRITICAL):(?P<logger>[^:]*):(?P<message>.*)$")
+_TIMESTAMP_PREFIX = re.compile(r"^\{?.{0,20}?(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})")
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace(",", ".").replace("Z", ""))
+    except ValueError:
+        return None
+
+
+def parse_log_line(line: str) -> dict:
+    """Parse satu baris log (JSON atau teks) menjadi dict level/logger/timestamp/message"""
+    line = line.rstrip("\r\n")
+
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            return {
+                "timestamp": parse_timestamp(record.get("timestamp")),
+                "level": record.get("level"),
+                "logger": record.get("logger"),
+                "message": record.get("message", line),
+                "extra": {key: value for key, value in record.items() if key not in ("timestamp", "level", "logger", "message")}
+            }
+        except ValueError:
+            pass
+
+    match = _TEXT_LINE.match(line)
+    if match:
+        return {
+            "timestamp": parse_timestamp(match.group("timestamp")),
+            "level": match.group("level"),
+            "logger": match.group("logger"),
+            "message": match.group("message"),
+            "extra": None
+        }
+
+    match = _BASIC_LINE.match(line)
+    if match:
+        return {
+            "timestamp": None,
+            "level": match.group("level"),
+            "logger": match.group("logger"),
+            "message": match.group("message"),
+            "extra": None
+        }
+
+    return {"timestamp": None, "level": None, "logger": None, "message": line, "extra": None}
+
+
+def _quick_timestamp(line: bytes) -> Optional[datetime]:
+    """Ambil timestamp di awal baris tanpa parse penuh (dipakai saat membangun index)"""
+    match = _TIMESTAMP_PREFIX.match(line[:80].decode("utf-8", errors="ignore"))
+    return parse_timestamp(match.group(1)) if match else None
+
+
+def list_log_files(base_path: str = LOG_FILE) -> List[str]:
+    """File log aktif diikuti file rotasi (app.log.1, app.log.2.gz, ...) dari terbaru ke terlama"""
+    files = [base_path] if os.path.exists(base_path) else []
+    directory = os.path.dirname(base_path) or "."
+    prefix = os.path.basename(base_path) + "."
+
+    rotated = []
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if not filename.startswith(prefix):
+                continue
+            suffix = filename[len(prefix):]
+            number = suffix[:-3] if suffix.endswith(".gz") else suffix
+            if number.isdigit():
+                rotated.append((int(number), os.path.join(directory, filename)))
+
+    files.extend(path for _, path in sorted(rotated))
+    return files
+
+
+# ============================================
+# SPARSE INDEX WAKTU -> OFFSET
+# ============================================
+
+class _SparseIndex:
+    def __init__(self, inode: int):
+        self.inode = inode
+        self.size = 0
+        self.offsets = []
+        self.timestamps = []
+
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+
+def get_sparse_index(path: str) -> _SparseIndex:
+    """
+    Index (timestamp, offset) setiap LOG_INDEX_STEP byte. Dibangun dengan seek
+    (bukan membaca seluruh file) dan diperpanjang saat file bertambah besar.
+    """
+    stat = os.stat(path)
+    with _index_lock:
+        index = _index_cache.get(path)
+        if index is None or index.inode != stat.st_ino or stat.st_size < index.size:
+            index = _SparseIndex(stat.st_ino)
+            _index_cache[path] = index
+
+        if stat.st_size - index.size < LOG_INDEX_STEP and index.offsets:
+            return index
+
+        with open(path, "rb") as f:
+            position = index.offsets[-1] + LOG_INDEX_STEP if index.offsets else 0
+            while position < stat.st_size:
+                f.seek(position)
+                if position > 0:
+                    f.readline()  # lewati baris yang terpotong
+                line_offset = f.tell()
+                timestamp = None
+                # Cari baris bertimestamp terdekat (baris lanjutan traceback tidak punya timestamp)
+                for _ in range(50):
+                    line = f.readline()
+                    if not line:
+                        break
+                    timestamp = _quick_timestamp(line)
+                    if timestamp:
+                        break
+                    line_offset = f.tell()
+                if timestamp and (not index.timestamps or timestamp >= index.timestamps[-1]):
+                    index.offsets.append(line_offset)
+                    index.timestamps.append(timestamp)
+                position += LOG_INDEX_STEP
+            index.size = stat.st_size
+
+        return index
+
+
+def _end_offset_for_until(path: str, until: datetime, size: int) -> int:
+    """Offset setelah baris terakhir yang mungkin <= until, berdasarkan sparse index"""
+    index = get_sparse_index(path)
+    position = bisect.bisect_right(index.timestamps, until)
+    if position < len(index.offsets):
+        return index.offsets[position]
+    return size
+
+
+# ============================================
+# PEMBACAAN FILE
+# ============================================
+
+def iter_lines_reverse(path: str, end_offset: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, baris) dari belakang file tanpa membaca seluruh isinya"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if end_offset is None else min(end_offset, f.tell())
+        remainder = b""
+        while position > 0:
+            read_size = min(TAIL_BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b"\n")
+            remainder = lines.pop(0)
+            line_end = position + len(block)
+            for line in reversed(lines):
+                line_end -= len(line) + 1
+                if line:
+                    yield line_end + 1, line
+        if remainder:
+            yield 0, remainder
+
+
+def iter_lines_compressed(path: str, before_offset: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    File .gz tidak bisa di-seek mundur; scan maju sekali lalu yield dari belakang.
+    Ukuran file rotasi dibatasi konfigurasi logrotate (maxsize) sehingga isinya aman ditampung.
+    """
+    lines = []
+    offset = 0
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if before_offset is not None and offset >= before_offset:
+                break
+            stripped = line.rstrip(b"\n")
+            if stripped:
+                lines.append((offset, stripped))
+            offset += len(line)
+    while lines:
+        yield lines.pop()
+
+
+def _matches(entry: dict, min_level: Optional[int], logger_prefix: Optional[str], contains: Optional[str]) -> bool:
+    if min_level is not None:
+        if LEVELS.get(entry["level"] or "", -1) < min_level:
+            return False
+    if logger_prefix:
+        name = entry["logger"] or ""
+        if name != logger_prefix and not name.startswith(logger_prefix + "."):
+            return False
+    if contains and contains.lower() not in entry["message"].lower():
+        return False
+    return True
+
+
+def encode_cursor(file_index: int, offset: int) -> str:
+    return f"{file_index}:{offset}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[int, Optional[int]]:
+    if not cursor:
+        return 0, None
+    try:
+        file_index, offset = cursor.split(":", 1)
+        return int(file_index), int(offset)
+    except ValueError:
+        raise ValueError("Cursor tidak valid")
+
+
+def search_logs(
+    limit: int = 100,
+    level: Optional[str] = None,
+    logger_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    contains: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_rotated: bool = True,
+    base_path: str = LOG_FILE
+) -> dict:
+    """
+    Ambil entri log terbaru yang cocok dengan filter, dari file aktif lalu file rotasi.
+    Hasil diurutkan kronologis; `next_cursor` menunjuk ke entri yang lebih lama.
+    """
+    min_level = None
+    if level:
+        level = level.upper()
+        if level not in LEVELS:
+            raise ValueError(f"Level tidak valid. Pilihan: {', '.join(LEVELS)}")
+        min_level = LEVELS[level]
+
+    files = list_log_files(base_path)
+    if not include_rotated:
+        files = files[:1]
+
+    start_file, start_offset = decode_cursor(cursor)
+    results = []
+    scanned = 0
+    next_cursor = None
+    exhausted = True
+
+    for file_index in range(start_file, len(files)):
+        path = files[file_index]
+        compressed = path.endswith(".gz")
+        before_offset = start_offset if file_index == start_file else None
+
+        if compressed:
+            lines = iter_lines_compressed(path, before_offset)
+        else:
+            end_offset = before_offset
+            if until is not None:
+                size = os.path.getsize(path)
+                index_end = _end_offset_for_until(path, until, size)
+                end_offset = index_end if end_offset is None else min(end_offset, index_end)
+            lines = iter_lines_reverse(path, end_offset)
+
+        reached_since = False
+        for offset, raw_line in lines:
+            scanned += 1
+            entry = parse_log_line(raw_line.decode("utf-8", errors="replace"))
+            timestamp = entry["timestamp"]
+
+            if until is not None and timestamp is not None and timestamp > until:
+                continue
+            if since is not None and timestamp is not None and timestamp < since:
+                # File log urut waktu; baris selanjutnya (ke belakang) pasti lebih lama
+                reached_since = True
+                break
+
+            if _matches(entry, min_level, logger_name, contains):
+                entry["file"] = os.path.basename(path)
+                entry["offset"] = offset
+                results.append(entry)
+                if len(results) >= limit:
+                    next_cursor = encode_cursor(file_index, offset)
+                    exhausted = False
+                    break
+
+            if scanned >= LOG_SCAN_LIMIT:
+                next_cursor = encode_cursor(file_index, offset)
+                exhausted = False
+                break
+
+        if not exhausted or reached_since:
+            break
+
+    results.reverse()
+    for entry in results:
+        entry["timestamp"] = entry["timestamp"].isoformat() if entry["timestamp"] else "unknown"
+
+    return {
+        "logs": results,
+        "next_cursor": next_cursor,
+        "scanned_lines": scanned,
+        "files": [os.path.basename(path) for path in files]
+    }
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from utils.log_reader import LOG_FILE
+
+# Konfigurasi logging dari env
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Level per logger, contoh: "routes.kelas=WARNING,mysql.connector=ERROR"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Maksimal pesan per call site per window; 0 = tanpa batas
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", 20))
+LOG_RATE_LIMIT_WINDOW = float(os.getenv("LOG_RATE_LIMIT_WINDOW", 10))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Atribut bawaan LogRecord; sisanya dianggap field `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suppressed"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record: timestamp, level, logger, message + extra"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """
+    QueueHandler bawaan memformat record dengan formatter teks sebelum masuk queue.
+    Di sini hanya pesan dan traceback yang dirender, formatting sebenarnya
+    (JSON / teks) dikerjakan thread listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+class _LazyWatchedFileHandler(WatchedFileHandler):
+    """
+    WatchedFileHandler yang baru membuat folder dan file log saat record
+    pertama ditulis; jika file tidak bisa dibuka, record dibuang dengan satu
+    peringatan di stderr alih-alih traceback per record.
+    """
+
+    _open_failed = False
+
+    def _open(self):
+        log_dir = os.path.dirname(self.baseFilename)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        return super()._open()
+
+    def emit(self, record: logging.LogRecord):
+        if self._open_failed:
+            return
+        if self.stream is None:
+            try:
+                self.stream = self._open()
+            except OSError as e:
+                self._open_failed = True
+                sys.stderr.write(f"Tidak bisa membuka log file {self.baseFilename}: {e}\n")
+                return
+        super().emit(record)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Batasi pesan berulang per call site (logger + file + baris), karena pesan
+    memakai f-string sehingga isi pesannya selalu berbeda. Jumlah pesan yang
+    dibuang dilaporkan lewat field `suppressed` pada pesan berikutnya yang lolos.
+    """
+
+    def __init__(self, limit: int, window: float):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._buckets.get(key, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+
+            if count >= self.limit:
+                self._buckets[key] = (window_start, count, suppressed + 1)
+                return False
+
+            self._buckets[key] = (window_start, count + 1, 0)
+            if len(self._buckets) > 10000:
+                self._buckets.clear()
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def _parse_logger_levels(value: str) -> dict:
+    levels = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        name, level = name.strip(), level.strip().upper()
+        if name and level in logging._nameToLevel:
+            levels[name] = level
+    return levels
+
+
+class _LoggingState:
+    listener = None
+    queue_handler = None
+
+
+_state = _LoggingState()
+_setup_lock = threading.Lock()
+
+
+def _restart_listener_after_fork():
+    """Thread listener tidak ikut ter-fork (mis. gunicorn --preload); buat queue + thread baru di child"""
+    if _state.listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    _state.queue_handler.queue = log_queue
+    _state.listener.queue = log_queue
+    _state.listener._thread = None
+    _state.listener.start()
+
+
+def setup_logging():
+    """
+    Pasang logging non-blocking: root logger hanya menaruh record ke queue,
+    lalu thread QueueListener yang memformat dan menulis ke console dan file
+    (JSON). Aman dipanggil berkali-kali.
+
+    Setiap worker (Passenger, serve.py, gunicorn) menulis ke LOG_FILE yang
+    sama secara append, jadi rotasi tidak dilakukan di sini: rotasi berbasis
+    ukuran per proses tidak aman multi-proses (rename ganda, baris hilang).
+    Rotasi diserahkan ke logrotate (create + compress, lihat
+    docs/backend-cpanel-deploy.md); WatchedFileHandler membuka ulang file
+    begitu logrotate memindahkannya. File baru dibuka saat record pertama
+    ditulis, bukan saat import.
+    """
+    with _setup_lock:
+        if _state.listener is not None:
+            return
+
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL.upper())
+
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers = [console_handler]
+
+        file_handler = _LazyWatchedFileHandler(LOG_FILE, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = _PreparedQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_LIMIT_WINDOW))
+
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        for name, level in _parse_logger_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+
+        _state.listener = listener
+        _state.queue_handler = queue_handler
+
+        atexit.register(shutdown_logging)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def shutdown_logging():
+    """Flush sisa record di queue dan hentikan thread listener"""
+    listener = _state.listener
+    if listener is None or listener._thread is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
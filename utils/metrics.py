@@ -0,0 +1,466 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Direktori file metrics per proses. Wajib diisi jika ada lebih dari satu worker
+# (Passenger / gunicorn) agar /metrics menjumlahkan semua proses.
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _reset(self):
+        self._values = {}
+
+    def snapshot(self) -> dict:
+        with _lock:
+            values = [[list(labels), value if not isinstance(value, list) else list(value)]
+                      for labels, value in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": values
+        }
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Gauge per proses; saat multi-proses dijumlahkan untuk proses yang masih hidup"""
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with _lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        # Layout: [count per bucket..., count +Inf, sum]
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = [0] * (len(self.buckets) + 2)
+                self._values[labels] = state
+            state[index] += 1
+            state[-1] += value
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    """
+    Registry metrics in-process. Setiap proses menulis snapshot ke
+    METRICS_DIR/metrics_<pid>.json secara berkala; /metrics membaca dan
+    menjumlahkan semua file sehingga hasilnya benar untuk banyak worker.
+    """
+
+    def __init__(self, directory: str = "", flush_interval: float = 5):
+        self.directory = directory
+        self.flush_interval = max(flush_interval, 1)
+        self._metrics = {}
+        self._collectors = []
+        self._pid = os.getpid()
+        self._flush_thread = None
+        self._stop_event = threading.Event()
+
+    # ---------- definisi metric ----------
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """
+        Collector dipanggil saat flush/scrape dan mengembalikan iterable
+        (name, help, labels_dict, value) yang diekspos sebagai gauge.
+        Dipakai untuk statistik cache, pool, dsb.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    # ---------- snapshot & file per proses ----------
+
+    def _collect(self) -> dict:
+        snapshot = {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+        for collector in list(self._collectors):
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+                continue
+            for name, documentation, labels, value in samples:
+                entry = snapshot.setdefault(name, {
+                    "type": "gauge",
+                    "help": documentation,
+                    "labelnames": list(labels.keys()),
+                    "values": []
+                })
+                entry["values"].append([[str(labels[key]) for key in entry["labelnames"]], value])
+
+        return snapshot
+
+    def _process_file(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+
+    def flush(self):
+        """Tulis snapshot proses ini ke METRICS_DIR (atomic replace)"""
+        if not self.directory:
+            return
+        self._check_fork()
+        path = self._process_file(self._pid)
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"pid": self._pid, "metrics": self._collect()}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Unable to write metrics file {path}: {str(e)}")
+
+    def ensure_started(self):
+        """Start thread flush berkala (hanya jika METRICS_DIR diisi)"""
+        if not self.directory:
+            return
+        self._check_fork()
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._flush_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def _check_fork(self):
+        """Setelah fork, nilai milik parent jangan ikut dihitung ulang oleh child"""
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        self._flush_thread = None
+        with _lock:
+            for metric in self._metrics.values():
+                metric._reset()
+
+    # ---------- agregasi ----------
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _read_snapshots(self) -> List[Tuple[Optional[int], dict]]:
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or not filename.startswith("metrics_"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), encoding="utf-8") as f:
+                    data = json.load(f)
+                snapshots.append((data.get("pid"), data["metrics"]))
+            except (OSError, ValueError, KeyError):
+                continue
+        return snapshots
+
+    def _compact_dead_processes(self):
+        """
+        Gabungkan counter/histogram milik worker yang sudah mati ke
+        metrics_archive.json agar total tetap monoton dan file tidak menumpuk.
+        """
+        if fcntl is None:
+            return
+        lock_path = os.path.join(self.directory, ".lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.directory, "metrics_archive.json")
+            dead = []
+            for filename in os.listdir(self.directory):
+                if not filename.startswith("metrics_") or not filename.endswith(".json") or filename == "metrics_archive.json":
+                    continue
+                try:
+                    pid = int(filename[len("metrics_"):-len(".json")])
+                except ValueError:
+                    continue
+                if pid != self._pid and not self._pid_alive(pid):
+                    dead.append(os.path.join(self.directory, filename))
+            if not dead:
+                return
+
+            snapshots = []
+            for path in [archive_path] + dead:
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        snapshots.append((None, json.load(f)["metrics"]))
+                except (OSError, ValueError, KeyError):
+                    continue
+
+            merged = _merge_snapshots(snapshots, live_pids=set())
+            temp_path = f"{archive_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"pid": None, "metrics": merged}, f)
+            os.replace(temp_path, archive_path)
+            for path in dead:
+                os.remove(path)
+
+    def aggregate(self) -> dict:
+        if not self.directory:
+            return self._collect()
+
+        self.flush()
+        try:
+            self._compact_dead_processes()
+        except OSError as e:
+            logger.warning(f"Unable to compact metrics files: {str(e)}")
+
+        snapshots = self._read_snapshots()
+        live_pids = {pid for pid, _ in snapshots if pid is not None and self._pid_alive(pid)}
+        return _merge_snapshots(snapshots, live_pids)
+
+    def render(self) -> str:
+        return render_prometheus(self.aggregate())
+
+
+def _merge_snapshots(snapshots: List[Tuple[Optional[int], dict]], live_pids: set) -> dict:
+    merged = {}
+    for pid, metrics in snapshots:
+        for name, data in metrics.items():
+            # Gauge dari proses yang sudah mati tidak dihitung
+            if data["type"] == "gauge" and pid not in live_pids:
+                continue
+            entry = merged.setdefault(name, {
+                "type": data["type"],
+                "help": data["help"],
+                "labelnames": data["labelnames"],
+                "buckets": data.get("buckets"),
+                "values": {}
+            })
+            for labels, value in data["values"]:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    current = entry["values"].get(key)
+                    entry["values"][key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    entry["values"][key] = entry["values"].get(key, 0) + value
+
+    for entry in merged.values():
+        entry["values"] = [[list(key), value] for key, value in entry["values"].items()]
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(snapshot: Dict[str, dict]) -> str:
+    """Format text exposition Prometheus (version 0.0.4)"""
+    lines = []
+    for name in sorted(snapshot):
+        data = snapshot[name]
+        lines.append(f"# HELP {name} {_escape(data['help'])}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        labelnames = data["labelnames"]
+
+        for labels, value in sorted(data["values"], key=lambda item: item[0]):
+            if data["type"] == "histogram":
+                cumulative = 0
+                bounds = list(data["buckets"]) + [float("inf")]
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    bucket_labels = _format_labels(labelnames, labels, ("le", _format_value(bound)))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                label_text = _format_labels(labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{label_text} {cumulative}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(METRICS_DIR, METRICS_FLUSH_INTERVAL)
+atexit.register(registry.flush)
+
+# ============================================
+# METRICS HTTP & DATABASE
+# ============================================
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Jumlah request HTTP", ("method", "handler", "status")
+)
+HTTP_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "Request HTTP yang sedang diproses", ("method", "handler")
+)
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Latency request HTTP", ("method", "handler")
+)
+DB_CONNECTIONS = registry.counter(
+    "db_connections_opened_total", "Koneksi MySQL yang dibuka"
+)
+DB_CONNECTION_ERRORS = registry.counter(
+    "db_connection_errors_total", "Koneksi MySQL yang gagal dibuka"
+)
+DB_CONNECT_DURATION = registry.histogram(
+    "db_connect_duration_seconds", "Waktu membuka koneksi MySQL",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def match_route(scope):
+    """Route yang akan menangani request (dicache di scope["route"]), None jika tidak ada"""
+    route = scope.get("route")
+    if route is not None:
+        return route
+
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    if router is None:
+        return None
+
+    from starlette.routing import Match
+    for candidate in _iter_routes(router.routes):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            scope["route"] = candidate
+            return candidate
+    return None
+
+
+def _iter_routes(routes):
+    """
+    Ratakan route hasil include_router. FastAPI versi baru tidak lagi menyalin
+    route ke app.router, tetapi menyimpan wrapper dengan atribut original_router.
+    """
+    for route in routes:
+        original_router = getattr(route, "original_router", None)
+        if original_router is not None:
+            yield from _iter_routes(original_router.routes)
+        else:
+            yield route
+
+
+def resolve_route_path(scope) -> str:
+    """Path template route (mis. /kelas/{id}) agar label tidak meledak per ID"""
+    route = match_route(scope)
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware: jumlah request per route/status, in-flight gauge dan latency histogram"""
+
+    def __init__(self, app, exclude_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        registry.ensure_started()
+        method = scope.get("method", "GET")
+        handler = resolve_route_path(scope)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method, handler)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec(method, handler)
+            HTTP_DURATION.observe(method, handler, value=time.perf_counter() - started)
+            HTTP_REQUESTS.inc(method, handler, f"{status_code // 100}xx")
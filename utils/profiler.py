@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import time
+import uuid
+import fnmatch
+import logging
+import tempfile
+import threading
+from collections import Counter
+from typing import Optional
+from utils.metrics import resolve_route_path
+
+logger = logging.getLogger(__name__)
+
+# Direktori bersama antar worker (Passenger/gunicorn) untuk sesi dan hasil profiling
+PROFILER_DIR = os.getenv("PROFILER_DIR") or os.path.join(tempfile.gettempdir(), "gastronomi_profiler")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 5))
+# Sesi mode request otomatis berhenti jika request tidak kunjung datang
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", 300))
+PROFILER_MAX_DEPTH = 128
+
+# Frame dianggap bagian dari aplikasi jika file-nya ada di root project
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SITE_MARKERS = ("site-packages", "dist-packages")
+# Leaf frame thread yang sedang menganggur (event loop / thread menunggu kerja)
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+_SESSION_FILE = "session.json"
+# Seberapa sering worker mengecek session.json (detik)
+_REFRESH_INTERVAL = 1.0
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _is_project_file(filename: str) -> bool:
+    return (
+        filename.startswith(PROJECT_ROOT)
+        and not any(marker in filename for marker in _SITE_MARKERS)
+        and not filename.endswith(os.path.join("utils", "profiler.py"))
+    )
+
+
+class ProfileSession:
+    def __init__(self, config: dict):
+        self.id = config["id"]
+        self.pattern = config.get("pattern")
+        self.max_requests = config.get("requests")
+        self.deadline = config["deadline"]
+        self.interval = config.get("interval_ms", PROFILER_INTERVAL_MS) / 1000
+        self.stopped = config.get("stopped", False)
+        self.started_at = time.time()
+        self.matched_requests = 0
+        self.completed_requests = 0
+        self.active_requests = 0
+        self.samples = 0
+        self.ticks = 0
+        self.sampled_seconds = 0.0
+        self.stacks = Counter()
+        self.self_samples = Counter()
+        self.finished = False
+
+    def matches(self, path: str, route_path: str) -> bool:
+        if not self.pattern:
+            return True
+        return fnmatch.fnmatchcase(route_path, self.pattern) or fnmatch.fnmatchcase(path, self.pattern)
+
+    def accepts_requests(self) -> bool:
+        if self.finished or self.stopped or time.time() >= self.deadline:
+            return False
+        return self.max_requests is None or self.matched_requests < self.max_requests
+
+    def to_result(self) -> dict:
+        return {
+            "session_id": self.id,
+            "pid": os.getpid(),
+            "pattern": self.pattern,
+            "interval_ms": self.interval * 1000,
+            "finished": self.finished,
+            "matched_requests": self.matched_requests,
+            "completed_requests": self.completed_requests,
+            "samples": self.samples,
+            "ticks": self.ticks,
+            "sampled_seconds": self.sampled_seconds,
+            "stacks": dict(self.stacks),
+            "self_samples": dict(self.self_samples)
+        }
+
+
+class SamplingProfiler:
+    """
+    Profiler statistik: thread sampler membaca sys._current_frames() setiap
+    interval selama ada request yang cocok sedang berjalan. Tidak memakai
+    sys.setprofile sehingga overhead rendah dan bekerja di thread manapun
+    (event loop uvicorn, threadpool FastAPI, maupun thread bridge a2wsgi).
+
+    Karena sampling per proses, stack dari request lain yang berjalan
+    bersamaan bisa ikut tercatat; hanya stack yang memuat frame kode aplikasi
+    yang disimpan.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._session = None
+        self._thread = None
+        self._last_refresh = 0.0
+        self._session_mtime = None
+
+    # ---------- sesi (dibagikan antar worker lewat file) ----------
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def _write_json(self, filename: str, data: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(filename)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def _read_session_config(self) -> Optional[dict]:
+        try:
+            with open(self._path(_SESSION_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def arm(self, pattern: Optional[str], requests: Optional[int], duration: Optional[float], interval_ms: Optional[float] = None) -> dict:
+        now = time.time()
+        config = {
+            "id": uuid.uuid4().hex[:12],
+            "pattern": pattern or None,
+            "requests": requests,
+            "armed_at": now,
+            "deadline": now + (duration if duration else PROFILER_MAX_SECONDS),
+            "interval_ms": interval_ms or PROFILER_INTERVAL_MS,
+            "stopped": False
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        for filename in os.listdir(self.directory):
+            if filename.startswith("result_"):
+                os.remove(self._path(filename))
+        self._write_json(_SESSION_FILE, config)
+        self.refresh(force=True)
+        logger.info(f"Profiler armed: pattern={pattern}, requests={requests}, duration={duration}")
+        return config
+
+    def stop(self) -> Optional[dict]:
+        config = self._read_session_config()
+        if config is None:
+            return None
+        config["stopped"] = True
+        self._write_json(_SESSION_FILE, config)
+        self.refresh(force=True)
+        return config
+
+    def refresh(self, force: bool = False):
+        """Sinkronkan sesi lokal dengan session.json (maksimal sekali per detik)"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < _REFRESH_INTERVAL:
+            return
+        self._last_refresh = now
+
+        try:
+            mtime = os.stat(self._path(_SESSION_FILE)).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._session_mtime:
+            return
+        self._session_mtime = mtime
+
+        config = self._read_session_config()
+        if config is None:
+            return
+
+        with self._lock:
+            session = self._session
+            if session is not None and session.id == config["id"]:
+                if config.get("stopped") and not session.stopped:
+                    session.stopped = True
+                    self._finish(session)
+                return
+            if session is not None and not session.finished:
+                self._finish(session)
+            if config.get("stopped") or time.time() >= config["deadline"]:
+                self._session = None
+                return
+            self._session = ProfileSession(config)
+
+    # ---------- request tracking ----------
+
+    def request_started(self, scope) -> Optional[ProfileSession]:
+        self.refresh()
+        session = self._session
+        path = scope.get("path", "")
+        if session is None or session.finished or path.startswith("/admin/profiler"):
+            return None
+
+        route_path = resolve_route_path(scope)
+        with self._lock:
+            if not session.accepts_requests() or not session.matches(path, route_path):
+                if not session.finished and not session.active_requests and time.time() >= session.deadline:
+                    self._finish(session)
+                return None
+            session.matched_requests += 1
+            session.active_requests += 1
+            self._ensure_sampler()
+        return session
+
+    def request_finished(self, session: ProfileSession):
+        with self._lock:
+            session.active_requests -= 1
+            session.completed_requests += 1
+            done = session.max_requests is not None and session.completed_requests >= session.max_requests
+            if not session.active_requests and (done or session.stopped or time.time() >= session.deadline):
+                self._finish(session)
+
+    def _finish(self, session: ProfileSession):
+        if session.finished:
+            return
+        session.finished = True
+        self._save_result(session)
+        logger.info(f"Profiler session {session.id} finished: {session.completed_requests} requests, {session.samples} samples")
+
+    def _save_result(self, session: ProfileSession):
+        try:
+            self._write_json(f"result_{session.id}_{os.getpid()}.json", session.to_result())
+        except OSError as e:
+            logger.warning(f"Unable to write profiler result: {str(e)}")
+
+    # ---------- sampler ----------
+
+    def _ensure_sampler(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        last_save = time.monotonic()
+        last_tick = None
+
+        while True:
+            session = self._session
+            if session is None or session.finished:
+                return
+
+            if session.active_requests > 0:
+                now = time.monotonic()
+                # Interval nyata bisa lebih panjang dari target karena GIL
+                if last_tick is not None:
+                    session.sampled_seconds += min(now - last_tick, session.interval * 10)
+                    session.ticks += 1
+                last_tick = now
+                self._sample(session, own_id)
+            else:
+                last_tick = None
+
+            if time.monotonic() - last_save >= 2:
+                # Hasil sementara agar bisa dibaca worker lain selama sesi berjalan
+                self._save_result(session)
+                last_save = time.monotonic()
+
+            time.sleep(session.interval)
+
+    def _sample(self, session: ProfileSession, own_id: int):
+        frames = sys._current_frames()
+        for thread_id, frame in frames.items():
+            if thread_id == own_id:
+                continue
+
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+
+            stack = []
+            in_project = False
+            while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                code = frame.f_code
+                # Frame level modul = script launcher (serve.py dsb), bukan kode request
+                if not in_project and code.co_name != "<module>" and _is_project_file(code.co_filename):
+                    in_project = True
+                stack.append(_frame_label(code))
+                frame = frame.f_back
+
+            if not in_project:
+                continue
+
+            stack.reverse()
+            with self._lock:
+                session.samples += 1
+                session.stacks[";".join(stack)] += 1
+                session.self_samples[stack[-1]] += 1
+
+    # ---------- hasil ----------
+
+    def results(self, top: int = 30) -> dict:
+        """Gabungkan hasil semua worker untuk sesi terakhir"""
+        self.refresh(force=True)
+        config = self._read_session_config()
+        if config is None:
+            return {"session": None}
+
+        session = self._session
+        if session is not None and session.id == config["id"]:
+            self._save_result(session)
+
+        stacks = Counter()
+        self_samples = Counter()
+        ticks = 0
+        sampled_seconds = 0.0
+        workers = []
+        for filename in os.listdir(self.directory):
+            if not filename.startswith(f"result_{config['id']}_"):
+                continue
+            try:
+                with open(self._path(filename), encoding="utf-8") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                continue
+            stacks.update(result["stacks"])
+            self_samples.update(result["self_samples"])
+            ticks += result.get("ticks", 0)
+            sampled_seconds += result.get("sampled_seconds", 0.0)
+            workers.append({key: result[key] for key in ("pid", "finished", "matched_requests", "completed_requests", "samples")})
+
+        interval_ms = sampled_seconds * 1000 / ticks if ticks else config.get("interval_ms", PROFILER_INTERVAL_MS)
+        total_samples = sum(self_samples.values())
+        expired = time.time() >= config["deadline"]
+        if config.get("stopped"):
+            state = "stopped"
+        elif workers and all(worker["finished"] for worker in workers):
+            state = "finished"
+        else:
+            state = "expired" if expired else "armed"
+
+        return {
+            "session": {
+                **config,
+                "state": state
+            },
+            "workers": workers,
+            "total_samples": total_samples,
+            "effective_interval_ms": round(interval_ms, 2),
+            "top_functions": [
+                {
+                    "function": function,
+                    "self_samples": count,
+                    "self_ms": round(count * interval_ms, 1),
+                    "self_percent": round(count * 100 / total_samples, 2) if total_samples else 0
+                }
+                for function, count in self_samples.most_common(top)
+            ],
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        }
+
+
+profiler = SamplingProfiler(PROFILER_DIR)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware yang menandai request yang cocok dengan sesi profiler aktif"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = profiler.request_started(scope)
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.request_finished(session)
@@ -0,0 +1,260 @@
+import os
+import re
+import time
+import logging
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+from utils.metrics import registry, resolve_route_path
+
+logger = logging.getLogger(__name__)
+# Logger terpisah agar slow query bisa difilter di /admin/logs (logger_name=slow_query)
+slow_query_logger = logging.getLogger("slow_query")
+
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Fingerprint yang sama dieksekusi lebih dari N kali dalam satu request = kemungkinan N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+# Tambahkan header X-DB-Query-Count dan Server-Timing di response (untuk debugging)
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "false").lower() == "true"
+
+DB_QUERIES = registry.counter("db_queries_total", "Query yang dieksekusi", ("route",))
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Latency query database",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Jumlah query per request", ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250)
+)
+DB_SLOW_QUERIES = registry.counter("db_slow_queries_total", "Query di atas SLOW_QUERY_MS", ("route",))
+DB_N_PLUS_ONE = registry.counter("db_n_plus_one_total", "Request yang terdeteksi N+1", ("route",))
+DB_CONNECTIONS_IN_USE = registry.gauge("db_connections_in_use", "Koneksi MySQL yang sedang terbuka")
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """Normalisasi SQL: literal dan placeholder jadi ?, IN-list jadi (...), whitespace dirapikan"""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", errors="replace")
+    sql = _COMMENTS.sub(" ", sql)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _IN_LISTS.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class RequestQueryStats:
+    """Statistik query untuk satu request (disimpan di contextvar)"""
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.handler = f"{method} {route}"
+        self.count = 0
+        self.total_seconds = 0.0
+        self.fingerprints = {}
+
+    def record(self, sql_fingerprint: str, seconds: float) -> dict:
+        self.count += 1
+        self.total_seconds += seconds
+        entry = self.fingerprints.get(sql_fingerprint)
+        if entry is None:
+            entry = {"count": 0, "seconds": 0.0, "rows": 0}
+            self.fingerprints[sql_fingerprint] = entry
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        return entry
+
+    def repeated(self, threshold: int) -> list:
+        return sorted(
+            ((sql, entry) for sql, entry in self.fingerprints.items() if entry["count"] > threshold),
+            key=lambda item: item[1]["count"],
+            reverse=True
+        )
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def record_query(operation, elapsed: float) -> Optional[dict]:
+    """
+    Catat satu query ke metrics, statistik request aktif dan slow query log.
+    Mengembalikan entry fingerprint di request aktif (untuk menghitung row).
+    """
+    sql_fingerprint = fingerprint(operation)
+    stats = _current_stats.get()
+    handler = stats.handler if stats is not None else "-"
+    route = stats.route if stats is not None else "-"
+
+    DB_QUERIES.inc(route)
+    DB_QUERY_DURATION.observe(value=elapsed)
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc(route)
+        slow_query_logger.warning(
+            f"Slow query {elapsed * 1000:.1f}ms [{handler}]: {sql_fingerprint[:500]}",
+            extra={"duration_ms": round(elapsed * 1000, 1), "fingerprint": sql_fingerprint, "handler": handler}
+        )
+
+    return stats.record(sql_fingerprint, elapsed) if stats is not None else None
+
+
+class InstrumentedCursor:
+    """Proxy cursor MySQL: catat fingerprint, latency dan jumlah row tiap execute"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count_rows(1)
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+        return False
+
+    def _record(self, operation, started: float, rows: Optional[int] = None):
+        self._entry = record_query(operation, time.perf_counter() - started)
+        if rows is not None:
+            self._count_rows(rows)
+
+    def _count_rows(self, rows: int):
+        if self._entry is not None and rows > 0:
+            self._entry["rows"] += rows
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            # rowcount untuk DML; untuk SELECT dihitung saat fetch
+            rowcount = self._cursor.rowcount if not getattr(self._cursor, "with_rows", False) else None
+            self._record(operation, started, rowcount)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, started, self._cursor.rowcount)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count_rows(len(rows))
+        return rows
+
+
+class InstrumentedConnection:
+    """Proxy koneksi MySQL yang membagikan InstrumentedCursor"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._closed = False
+        DB_CONNECTIONS_IN_USE.inc()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            DB_CONNECTIONS_IN_USE.dec()
+        return self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Koneksi yang lupa di-close tetap dikurangi dari gauge
+        if not getattr(self, "_closed", True):
+            self._closed = True
+            DB_CONNECTIONS_IN_USE.dec()
+
+
+def instrument_connection(connection):
+    return InstrumentedConnection(connection) if QUERY_INSTRUMENTATION else connection
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware yang membuka RequestQueryStats per request, lalu di akhir
+    request mencatat jumlah query dan memberi warning jika ada pola N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope.get("method", "GET"), resolve_route_path(scope))
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if QUERY_STATS_HEADERS and message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"server-timing", f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries"'.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
+            DB_QUERIES_PER_REQUEST.observe(stats.route, value=stats.count)
+
+            repeated = stats.repeated(N_PLUS_ONE_THRESHOLD)
+            if repeated:
+                DB_N_PLUS_ONE.inc(stats.route)
+                sql, entry = repeated[0]
+                logger.warning(
+                    f"Possible N+1 in {stats.handler}: {entry['count']}x {sql[:300]} "
+                    f"({stats.count} queries total, {stats.total_seconds * 1000:.1f}ms)",
+                    extra={
+                        "handler": stats.handler,
+                        "query_count": stats.count,
+                        "repeated": [{"fingerprint": fp, **data} for fp, data in repeated[:5]]
+                    }
+                )
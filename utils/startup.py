@@ -0,0 +1,152 @@
+"""
+Inisialisasi aplikasi lewat lifespan FastAPI, bukan saat module di-import.
+
+Module route cukup *mendaftarkan* kebutuhannya (folder upload, migrasi DB)
+yang murah dan tanpa efek samping; semuanya dijalankan sekali di lifespan
+startup dengan laporan waktu per fase. Import `main` jadi cepat dan tidak
+gagal/lambat ketika MySQL sedang down (penting untuk worker Passenger yang
+di-spawn saat ada request).
+"""
+import os
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+from anyio import to_thread
+
+logger = logging.getLogger(__name__)
+
+# Task DB dijalankan di background agar worker langsung siap melayani request
+STARTUP_TASKS_IN_BACKGROUND = os.getenv("STARTUP_TASKS_IN_BACKGROUND", "true").lower() == "true"
+
+_upload_dirs: List[str] = []
+_startup_tasks: List[Callable] = []
+_phases: List[tuple] = []
+_background_tasks = set()
+
+
+def register_upload_dirs(*paths: str):
+    """Daftarkan folder yang harus ada sebelum request pertama (dibuat di lifespan)"""
+    for path in paths:
+        if path not in _upload_dirs:
+            _upload_dirs.append(path)
+
+
+def on_startup(function: Callable) -> Callable:
+    """Daftarkan fungsi sinkron (migrasi/inisialisasi DB) untuk dijalankan di lifespan startup"""
+    if function not in _startup_tasks:
+        _startup_tasks.append(function)
+    return function
+
+
+def record_phase(name: str, seconds: float):
+    _phases.append((name, seconds))
+
+
+@contextmanager
+def startup_phase(name: str):
+    """Catat durasi satu fase startup (import router, folder, DB, ...)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def ensure_upload_dirs():
+    for path in _upload_dirs:
+        os.makedirs(path, exist_ok=True)
+
+
+async def run_startup_tasks():
+    """Jalankan task terdaftar di threadpool; kegagalan (mis. MySQL down) hanya di-log"""
+    for function in _startup_tasks:
+        with startup_phase(f"task:{function.__name__}"):
+            try:
+                await to_thread.run_sync(function)
+            except Exception as e:
+                logger.error(f"Startup task {function.__name__} gagal: {e}")
+
+
+async def _run_startup_tasks_in_background():
+    started = len(_phases)
+    await run_startup_tasks()
+    logger.info(f"Startup tasks selesai: {_format_phases(_phases[started:])}")
+
+
+async def start_startup_tasks():
+    if not _startup_tasks:
+        return
+    if not STARTUP_TASKS_IN_BACKGROUND:
+        await run_startup_tasks()
+        return
+    task = asyncio.get_running_loop().create_task(_run_startup_tasks_in_background())
+    # Simpan referensi agar task tidak di-garbage-collect sebelum selesai
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def cancel_background_tasks():
+    for task in list(_background_tasks):
+        task.cancel()
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+
+def _format_phases(phases) -> str:
+    return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in phases)
+
+
+def startup_report() -> dict:
+    """Ringkasan waktu per fase, juga ditulis ke log saat aplikasi siap"""
+    phases = {name: round(seconds * 1000, 1) for name, seconds in _phases}
+    return {"total_ms": round(sum(phases.values()), 1), "phases_ms": phases}
+
+
+def log_startup_report() -> dict:
+    report = startup_report()
+    logger.info(f"Startup selesai dalam {report['total_ms']:.0f}ms ({_format_phases(_phases)})")
+    return report
+
+
+class LifespanRunner:
+    """
+    Jalankan protokol lifespan ASGI di event loop milik bridge yang tidak
+    mengirim event lifespan sendiri (a2wsgi di Passenger), sehingga startup
+    dan shutdown app tetap berjalan seperti di uvicorn.
+    """
+
+    def __init__(self, app, loop: asyncio.AbstractEventLoop):
+        self.app = app
+        self.loop = loop
+        self._receive_queue: Optional[asyncio.Queue] = None
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._task = None
+
+    async def _start_app(self):
+        self._receive_queue = asyncio.Queue()
+        self._send_queue = asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}, "state": {}}
+        self._task = asyncio.ensure_future(self.app(scope, self._receive_queue.get, self._send_queue.put))
+
+    async def _run_phase(self, phase: str):
+        if self._task is None:
+            await self._start_app()
+        await self._receive_queue.put({"type": f"lifespan.{phase}"})
+        message = await self._send_queue.get()
+        if message["type"] == f"lifespan.{phase}.failed":
+            raise RuntimeError(f"Lifespan {phase} gagal: {message.get('message', '')}")
+        if phase == "shutdown":
+            await self._task
+
+    def startup(self, timeout: Optional[float] = None):
+        asyncio.run_coroutine_threadsafe(self._run_phase("startup"), self.loop).result(timeout)
+
+    def shutdown(self, timeout: Optional[float] = None):
+        if self._task is None or self._task.done() or self.loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._run_phase("shutdown"), self.loop).result(timeout)
+        except Exception as e:
+            logger.error(f"Lifespan shutdown error: {e}")
@@ -0,0 +1,160 @@
+import os
+import shutil
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Interval sampling (detik) dan jumlah sampel yang disimpan di ring buffer
+SYSTEM_METRICS_INTERVAL = float(os.getenv("SYSTEM_METRICS_INTERVAL", 5))
+SYSTEM_METRICS_HISTORY = int(os.getenv("SYSTEM_METRICS_HISTORY", 120))
+SYSTEM_METRICS_DISK_PATH = os.getenv("SYSTEM_METRICS_DISK_PATH", ".")
+
+
+def _to_gb(value: int) -> float:
+    return round(value / (1024**3), 2)
+
+
+class SystemMetricsSampler:
+    """
+    Thread background yang mengambil sampel CPU, memory, disk dan proses
+    secara berkala dan menyimpannya di ring buffer berukuran tetap.
+    Endpoint cukup membaca sampel terakhir tanpa harus menunggu psutil.
+    """
+
+    def __init__(self, interval: float, history_size: int, disk_path: str = "."):
+        self.interval = max(interval, 0.5)
+        self.disk_path = disk_path
+        self._samples = deque(maxlen=max(history_size, 1))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._process = None
+
+    @property
+    def history_size(self) -> int:
+        return self._samples.maxlen
+
+    def ensure_started(self):
+        """Start thread sampler jika belum jalan (aman dipanggil berkali-kali, juga setelah fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self._process = None
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="system-metrics-sampler",
+                daemon=True
+            )
+            self._thread.start()
+            logger.info(f"System metrics sampler started (interval={self.interval}s, history={self._samples.maxlen})")
+
+    def stop(self):
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.warning(f"System metrics sampling failed: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def sample_once(self) -> dict:
+        """Ambil satu sampel dan simpan ke ring buffer. Tidak pernah blocking."""
+        sample = {
+            "timestamp": datetime.now().isoformat(),
+            "cpu": None,
+            "memory": None,
+            "disk": None,
+            "process": None
+        }
+
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+
+        if psutil is not None:
+            # interval=None: bandingkan dengan panggilan sebelumnya, tanpa sleep
+            sample["cpu"] = {
+                "cores": psutil.cpu_count(logical=False),
+                "logical_cores": psutil.cpu_count(logical=True),
+                "usage_percent": psutil.cpu_percent(interval=None)
+            }
+
+            memory = psutil.virtual_memory()
+            sample["memory"] = {
+                "total_gb": _to_gb(memory.total),
+                "available_gb": _to_gb(memory.available),
+                "used_gb": _to_gb(memory.used),
+                "percent_used": memory.percent
+            }
+
+            if self._process is None:
+                self._process = psutil.Process()
+            process = self._process
+            with process.oneshot():
+                sample["process"] = {
+                    "pid": process.pid,
+                    "name": process.name(),
+                    "memory_percent": round(process.memory_percent(), 2),
+                    "rss_mb": round(process.memory_info().rss / (1024**2), 2),
+                    "cpu_percent": process.cpu_percent(interval=None),
+                    "num_threads": process.num_threads()
+                }
+
+        try:
+            disk = shutil.disk_usage(self.disk_path)
+            sample["disk"] = {
+                "total_gb": _to_gb(disk.total),
+                "used_gb": _to_gb(disk.used),
+                "free_gb": _to_gb(disk.free),
+                "percent_used": round((disk.used / disk.total) * 100, 2) if disk.total else 0
+            }
+        except OSError as e:
+            logger.warning(f"Unable to get disk usage: {str(e)}")
+
+        with self._lock:
+            self._samples.append(sample)
+
+        return sample
+
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def latest_or_sample(self) -> dict:
+        """Sampel terakhir, atau ambil sampel baru jika buffer masih kosong"""
+        sample = self.latest()
+        if sample is None:
+            sample = self.sample_once()
+        return sample
+
+    def history(self, limit: int = 12) -> list:
+        with self._lock:
+            samples = list(self._samples)
+        if limit <= 0:
+            return []
+        return samples[-limit:]
+
+
+sampler = SystemMetricsSampler(
+    interval=SYSTEM_METRICS_INTERVAL,
+    history_size=SYSTEM_METRICS_HISTORY,
+    disk_path=SYSTEM_METRICS_DISK_PATH
+)
@@ -0,0 +1,144 @@
+"""
+Alokasi unit barang (item_units) yang aman di bawah request bersamaan.
+
+allocate_units() mereservasi N unit berstatus Tersedia secara atomik dengan
+SELECT ... FOR UPDATE SKIP LOCKED: transaksi lain yang sedang memegang unit
+tertentu dilewati (bukan ditunggu), jadi dua persetujuan tidak pernah
+mendapat unit yang sama dan peminjaman bersamaan tidak antre di satu baris.
+Deadlock / lock wait timeout di-retry dengan backoff terbatas.
+
+Alur peminjaman (PinjamRequest / VerifikasiUpdate):
+    ajukan    : allocate_units(..., to_status=Menunggu)
+    disetujui : transition_units(..., Menunggu -> Dipinjam)
+    ditolak   : transition_units(..., Menunggu -> Tersedia)
+    kembali   : transition_units(..., Dipinjam -> Tersedia)
+"""
+import os
+import time
+import random
+import logging
+from typing import List
+from mysql.connector import errors as mysql_errors
+from models.enums import StatusUnit
+from utils.item_availability import apply_status_changes
+
+logger = logging.getLogger(__name__)
+
+ALLOCATION_MAX_RETRIES = int(os.getenv("ALLOCATION_MAX_RETRIES", 3))
+ALLOCATION_RETRY_BASE_SECONDS = float(os.getenv("ALLOCATION_RETRY_BASE_SECONDS", 0.05))
+
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+ER_PARSE_ERROR = 1064
+RETRYABLE_ERRORS = {ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK}
+
+# MySQL < 8.0 / MariaDB < 10.6 tidak mengenal SKIP LOCKED; dideteksi sekali
+_skip_locked_supported = True
+
+
+class UnitAllocationError(Exception):
+    """Unit tersedia kurang dari yang diminta"""
+
+    def __init__(self, barang_id: int, requested: int, available: int):
+        super().__init__(
+            f"Unit tersedia untuk barang {barang_id} tidak cukup (diminta {requested}, tersedia {available})"
+        )
+        self.barang_id = barang_id
+        self.requested = requested
+        self.available = available
+
+
+def _select_available(cursor, barang_id: int, count: int, from_status: str) -> List[tuple]:
+    global _skip_locked_supported
+    query = """
+        SELECT id, kode FROM item_units
+        WHERE barang_id = %s AND status = %s
+        ORDER BY id ASC
+        LIMIT %s
+        FOR UPDATE
+    """
+    if _skip_locked_supported:
+        try:
+            cursor.execute(query + " SKIP LOCKED", (barang_id, from_status, count))
+            return cursor.fetchall()
+        except mysql_errors.ProgrammingError as e:
+            if e.errno != ER_PARSE_ERROR:
+                raise
+            _skip_locked_supported = False
+            logger.warning("Server MySQL tidak mendukung SKIP LOCKED, alokasi unit memakai FOR UPDATE biasa")
+    cursor.execute(query, (barang_id, from_status, count))
+    return cursor.fetchall()
+
+
+def _row_value(row, key: str, index: int):
+    return row[key] if isinstance(row, dict) else row[index]
+
+
+def transition_units(cursor, barang_id: int, unit_kodes: List[str], from_status: str, to_status: str) -> int:
+    """
+    Pindahkan status unit hanya jika statusnya masih `from_status` (UPDATE
+    bersyarat, tanpa baca-lalu-tulis). Counter item_availability ikut
+    digeser; commit diserahkan ke pemanggil. Mengembalikan jumlah unit
+    yang benar-benar berpindah.
+    """
+    if not unit_kodes or from_status == to_status:
+        return 0
+    placeholders = ", ".join(["%s"] * len(unit_kodes))
+    cursor.execute(
+        f"UPDATE item_units SET status = %s WHERE barang_id = %s AND status = %s AND kode IN ({placeholders})",
+        [to_status, barang_id, from_status] + list(unit_kodes)
+    )
+    moved = cursor.rowcount
+    apply_status_changes(cursor, barang_id, removed=[from_status] * moved, added=[to_status] * moved)
+    return moved
+
+
+def allocate_units(
+    connection,
+    barang_id: int,
+    count: int,
+    to_status: str = StatusUnit.MENUNGGU.value,
+    from_status: str = StatusUnit.TERSEDIA.value
+) -> List[str]:
+    """
+    Reservasi `count` unit `from_status` milik barang_id dan ubah ke `to_status`
+    dalam satu transaksi (di-commit di sini). Mengembalikan daftar kode unit.
+    Raise UnitAllocationError jika unit yang bisa diambil kurang.
+    """
+    if count < 1:
+        raise ValueError("Jumlah unit minimal 1")
+
+    cursor = connection.cursor()
+    attempt = 0
+    try:
+        while True:
+            try:
+                rows = _select_available(cursor, barang_id, count, from_status)
+                if len(rows) < count:
+                    connection.rollback()
+                    raise UnitAllocationError(barang_id, count, len(rows))
+
+                ids = [_row_value(row, "id", 0) for row in rows]
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(
+                    f"UPDATE item_units SET status = %s WHERE id IN ({placeholders})",
+                    [to_status] + ids
+                )
+                # Counter diupdate paling akhir agar lock baris ringkasan dipegang sesingkat mungkin
+                apply_status_changes(cursor, barang_id, removed=[from_status] * count, added=[to_status] * count)
+                connection.commit()
+                return [_row_value(row, "kode", 1) for row in rows]
+
+            except mysql_errors.DatabaseError as e:
+                connection.rollback()
+                if e.errno not in RETRYABLE_ERRORS or attempt >= ALLOCATION_MAX_RETRIES:
+                    raise
+                attempt += 1
+                delay = ALLOCATION_RETRY_BASE_SECONDS * (2 ** (attempt - 1)) * (1 + random.random())
+                logger.warning(
+                    f"Alokasi unit barang {barang_id} konflik (errno {e.errno}), "
+                    f"retry {attempt}/{ALLOCATION_MAX_RETRIES} dalam {delay * 1000:.0f}ms"
+                )
+                time.sleep(delay)
+    finally:
+        cursor.close()